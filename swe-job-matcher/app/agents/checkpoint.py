@@ -0,0 +1,165 @@
+import random
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from app.db import db
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Async LangGraph checkpointer on top of MongoDB.
+    Each checkpoint is stored whole (state is a few kilobytes per analysis),
+    pending writes of finished tasks next to it, so an interrupted run picks
+    up after the last completed node or job instead of starting over.
+    Only the async api is implemented, the graph is always run with astream.
+    """
+
+    def _load(self, typed: Dict) -> Any:
+        return self.serde.loads_typed((typed["type"], typed["data"]))
+
+    def _dump(self, value: Any) -> Dict:
+        type_, data = self.serde.dumps_typed(value)
+        return {"type": type_, "data": data}
+
+    async def _to_tuple(self, doc: Dict) -> CheckpointTuple:
+        writes = await db.checkpoints.get_writes(doc["thread_id"], doc["checkpoint_ns"], doc["checkpoint_id"])
+        return CheckpointTuple(
+            config=_config(doc["thread_id"], doc["checkpoint_ns"], doc["checkpoint_id"]),
+            checkpoint=self._load(doc["checkpoint"]),
+            metadata=self._load(doc["metadata"]),
+            parent_config=(
+                _config(doc["thread_id"], doc["checkpoint_ns"], doc["parent_checkpoint_id"])
+                if doc.get("parent_checkpoint_id") else None
+            ),
+            pending_writes=[(write["task_id"], write["channel"], self._load(write["value"])) for write in writes],
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        doc = await db.checkpoints.get(
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            get_checkpoint_id(config)
+        )
+        return await self._to_tuple(doc) if doc else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        query: Dict[str, Any] = {}
+        if config:
+            configurable = config["configurable"]
+            query["thread_id"] = configurable["thread_id"]
+            if configurable.get("checkpoint_ns") is not None:
+                query["checkpoint_ns"] = configurable["checkpoint_ns"]
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)) and "checkpoint_id" not in query:
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        # metadata is serialized, so filters are applied here
+        remaining = limit
+        for doc in await db.checkpoints.list(query, None if filter else limit):
+            if filter:
+                metadata = self._load(doc["metadata"])
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                remaining -= 1
+            yield await self._to_tuple(doc)
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        await db.checkpoints.put({
+            "_id": f"{thread_id}:{checkpoint_ns}:{checkpoint['id']}",
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"],
+            "parent_checkpoint_id": configurable.get("checkpoint_id"),
+            "checkpoint": self._dump(checkpoint),
+            "metadata": self._dump(get_checkpoint_metadata(config, metadata)),
+            "created_at": datetime.utcnow(),
+        })
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable["checkpoint_id"]
+
+        docs = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            docs.append({
+                "_id": f"{thread_id}:{checkpoint_ns}:{checkpoint_id}:{task_id}:{idx}",
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+                "task_id": task_id,
+                "task_path": task_path,
+                "idx": idx,
+                "channel": channel,
+                "value": self._dump(value),
+                "created_at": datetime.utcnow(),
+            })
+        # special writes (errors, interrupts) replace earlier ones, regular writes are kept
+        overwrite = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        await db.checkpoints.put_writes(docs, overwrite)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await db.checkpoints.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # same scheme as the in-memory saver: monotonic counter plus a random tiebreak
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+graph_checkpointer = MongoCheckpointSaver()
@@ -0,0 +1,174 @@
+import hashlib
+import re
+from typing import List, Optional
+import tiktoken
+
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6}\s+.+|\*\*[^*]{2,80}\*\*:?|__[^_]{2,80}__:?)\s*$")
+WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# (pattern, weight): what a section is about decides whether it is worth tokens
+SECTION_SIGNALS = [
+    (re.compile(r"\b(requirements?|qualifications?|what you.?ll need|you have|you.?ll bring|must have|required)\b", re.I), 6.0),
+    (re.compile(r"\b(preferred|nice to have|bonus points?|ideal candidate)\b", re.I), 4.0),
+    (re.compile(r"\b(responsibilit\w*|what you.?ll do|you will|the role|about the role|day to day)\b", re.I), 4.0),
+    (re.compile(r"\b(experience (with|in)|proficien\w*|familiar\w*|knowledge of|degree|pursuing|graduat\w*|years? of)\b", re.I), 3.0),
+    (re.compile(r"\b(tech stack|technologies|languages|frameworks|tools)\b", re.I), 2.0),
+    (re.compile(r"\b(intern(ship)?|new grad|junior|senior|staff|lead|principal)\b", re.I), 1.5),
+    (re.compile(r"\b(equal (employment )?opportunity|eeo|affirmative action|religion|sexual orientation|gender identity|national origin|veteran|disabilit\w*|accommodation)\b", re.I), -8.0),
+    (re.compile(r"\b(benefits|perks|401\(?k\)?|pto|paid time off|parental leave|health insurance|dental|wellness|stipend|equity package)\b", re.I), -5.0),
+    (re.compile(r"\b(privacy (policy|notice)|cookies?|terms of (use|service)|all rights reserved|sign in|log in|share this job|similar jobs|apply now|back to jobs)\b", re.I), -6.0),
+    (re.compile(r"\b(about us|our mission|our values|who we are|founded in)\b", re.I), -1.5),
+]
+
+TECH_TERMS = {
+    "python", "java", "javascript", "typescript", "go", "golang", "rust", "c++", "c#", "ruby", "kotlin", "swift",
+    "react", "next.js", "vue", "angular", "node", "node.js", "django", "flask", "fastapi", "spring", "rails",
+    "sql", "postgres", "postgresql", "mysql", "mongodb", "redis", "kafka", "spark", "airflow", "graphql",
+    "aws", "gcp", "azure", "docker", "kubernetes", "terraform", "linux", "git", "ci/cd",
+    "pytorch", "tensorflow", "ml", "machine learning", "llm", "nlp", "data structures", "algorithms",
+}
+
+_encoding = None
+
+
+def _get_encoding():
+    # the bpe file is downloaded on first use, without network we fall back to an estimate
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"tiktoken unavailable, estimating token counts: {e}")
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:budget * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[:budget])
+
+
+class Section:
+    __slots__ = ("index", "text", "score", "tokens")
+
+    def __init__(self, index: int, text: str):
+        self.index = index
+        self.text = text
+        self.score = 0.0
+        self.tokens = 0
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """
+    Splits the crawled markdown at headings (markdown or bold-only lines),
+    and splits very long heading-less stretches at blank lines.
+    """
+    blocks: List[List[str]] = [[]]
+    for line in markdown.splitlines():
+        if HEADING_PATTERN.match(line) and blocks[-1]:
+            blocks.append([])
+        blocks[-1].append(line)
+
+    sections = []
+    for block in blocks:
+        text = "\n".join(block).strip()
+        if not text:
+            continue
+        if len(text) > 4000:
+            for paragraph in re.split(r"\n\s*\n", text):
+                if paragraph.strip():
+                    sections.append(Section(len(sections), paragraph.strip()))
+        else:
+            sections.append(Section(len(sections), text))
+    return sections
+
+
+def _fingerprint(text: str) -> str:
+    normalized = " ".join(WORD_PATTERN.findall(text.lower()))
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def score_section(section: Section) -> float:
+    text = section.text
+    score = 0.0
+    for pattern, weight in SECTION_SIGNALS:
+        if pattern.search(text):
+            score += weight
+
+    words = set(WORD_PATTERN.findall(text.lower()))
+    score += 0.75 * min(len(words & TECH_TERMS), 8)
+
+    # navigation menus are many very short lines
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) >= 5 and sum(len(line) for line in lines) / len(lines) < 20:
+        score -= 4.0
+
+    # the top of the page usually carries the title, level and location
+    if section.index == 0:
+        score += 2.0
+    return score
+
+
+def compact_description(markdown: str, token_budget: int, min_score: float = 0.0) -> str:
+    """
+    Keeps the sections most likely to describe the role and its requirements,
+    drops repeated blocks and boilerplate (EEO, benefits, navigation), and
+    packs what is left into `token_budget` tokens in the original order.
+    """
+    sections = split_sections(markdown)
+
+    unique: List[Section] = []
+    seen = set()
+    for section in sections:
+        fingerprint = _fingerprint(section.text)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        section.score = score_section(section)
+        section.tokens = count_tokens(section.text)
+        unique.append(section)
+
+    chosen: List[Section] = []
+    remaining = token_budget
+    for section in sorted(unique, key=lambda s: (-s.score, s.index)):
+        if section.score < min_score or remaining <= 0:
+            break
+        if section.tokens > remaining:
+            # only the most relevant sections are worth cutting in half
+            if section.score < 4.0:
+                continue
+            section.text = truncate_to_tokens(section.text, remaining)
+            section.tokens = remaining
+        chosen.append(section)
+        remaining -= section.tokens
+
+    if not chosen:
+        # nothing looked relevant, fall back to the start of the page
+        return truncate_to_tokens(markdown, token_budget)
+
+    return "\n\n".join(section.text for section in sorted(chosen, key=lambda s: s.index))
+
+
+def compact_fields(markdown: str, token_budget: int) -> dict:
+    compact = compact_description(markdown, token_budget)
+    return {
+        "compact_markdown": compact,
+        "compact_budget": token_budget,
+        "compact_tokens": count_tokens(compact),
+    }
+
+
+def cached_compact(cached_job: dict, token_budget: int) -> Optional[str]:
+    if cached_job.get("compact_budget") == token_budget and cached_job.get("compact_markdown"):
+        return cached_job["compact_markdown"]
+    return None
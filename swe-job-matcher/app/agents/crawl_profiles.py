@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+# requests that never change the text of a posting
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+    "hotjar.com", "segment.io", "segment.com", "linkedin.com/px", "ads.linkedin.com",
+    "clarity.ms", "bat.bing.com", "newrelic.com", "nr-data.net", "fullstory.com",
+    "onetrust.com", "cookielaw.org", "qualtrics.com",
+)
+
+# the page has real text once the body holds more than a few hundred characters
+CONTENT_READY = "js:() => document.body && document.body.innerText.length > 600"
+
+
+class CrawlProfile:
+    """How to tell that a job posting has rendered for one kind of site."""
+
+    __slots__ = ("name", "wait_until", "wait_for", "delay")
+
+    def __init__(self, name: str, wait_until: str = "domcontentloaded", wait_for: Optional[str] = None, delay: float = 0.0):
+        self.name = name
+        self.wait_until = wait_until
+        self.wait_for = wait_for
+        self.delay = delay
+
+
+PROFILES: Dict[str, CrawlProfile] = {
+    profile.name: profile for profile in [
+        # server rendered boards, the description is in the first response
+        CrawlProfile("greenhouse", wait_for="css:#content, .job__description, #app_body, .job-post"),
+        CrawlProfile("lever", wait_for="css:.posting-page, .section-wrapper, .content"),
+        CrawlProfile("smartrecruiters", wait_for="css:.job-sections, [itemprop='description'], .job-details"),
+        # single page apps
+        CrawlProfile("ashby", wait_for="css:[class*='_descriptionText'], [class*='job-posting'], main h1"),
+        CrawlProfile("workday", wait_for="css:[data-automation-id='jobPostingDescription']"),
+        CrawlProfile("icims", wait_until="load", wait_for=CONTENT_READY),
+        CrawlProfile("content", wait_for=CONTENT_READY),
+        CrawlProfile("networkidle", wait_until="networkidle"),
+        # what every crawl used to do
+        CrawlProfile("fixed_delay", delay=3.0),
+    ]
+}
+
+ATS_HOSTS = [
+    ("greenhouse.io", "greenhouse"),
+    ("lever.co", "lever"),
+    ("ashbyhq.com", "ashby"),
+    ("myworkdayjobs.com", "workday"),
+    ("myworkdaysite.com", "workday"),
+    ("smartrecruiters.com", "smartrecruiters"),
+    ("icims.com", "icims"),
+]
+
+FALLBACK_ORDER = ["content", "networkidle", "fixed_delay"]
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def detect_ats(host: str) -> Optional[str]:
+    for suffix, name in ATS_HOSTS:
+        if host == suffix or host.endswith("." + suffix):
+            return name
+    return None
+
+
+def is_blocked(resource_type: str, url: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    return any(host in url for host in BLOCKED_HOSTS)
+
+
+class ProfileMemory:
+    """
+    The profile that last rendered a page for each host. Crawls of a known
+    host start with it, unknown hosts start with their ATS profile.
+    """
+
+    def __init__(self):
+        self._by_host: Dict[str, str] = {}
+
+    def load(self, docs: List[Dict]):
+        for doc in docs:
+            if doc.get("profile") in PROFILES:
+                self._by_host[doc["_id"]] = doc["profile"]
+
+    def candidates(self, host: str) -> List[CrawlProfile]:
+        names = []
+        for name in (self._by_host.get(host), detect_ats(host), *FALLBACK_ORDER):
+            if name and name not in names:
+                names.append(name)
+        return [PROFILES[name] for name in names]
+
+    def remember(self, host: str, profile: CrawlProfile) -> bool:
+        # true when the host switched profiles and should be saved
+        if self._by_host.get(host) == profile.name:
+            return False
+        self._by_host[host] = profile.name
+        return True
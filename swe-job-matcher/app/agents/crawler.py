@@ -0,0 +1,152 @@
+import asyncio
+import time
+import weakref
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from app.config import settings
+from app.db import db
+from app.agents.crawl_profiles import CrawlProfile, ProfileMemory, host_of, is_blocked
+
+
+class CrawlError(Exception):
+    """The page could not be rendered."""
+
+
+def _should_try_next(error: str) -> bool:
+    # only a page that did not render in time is worth another profile
+    return "Wait condition failed" in error or "Timeout" in error
+
+
+async def _block_or_continue(route):
+    request = route.request
+    if is_blocked(request.resource_type, request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class CrawlerPool:
+    """
+    One long-lived headless browser shared by every scrape.
+    Each slot is a crawl4ai session (a browser page) that is reused
+    across requests, so the pool size bounds the number of open pages.
+    Pages are read as soon as the posting has rendered, using the crawl
+    profile of the site's ATS (or the one that last worked for the host).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._crawler = None
+        self._sessions: asyncio.Queue = None
+        self._lock = asyncio.Lock()
+        self.profiles = ProfileMemory()
+        self._routed = weakref.WeakSet()
+
+    async def start(self):
+        async with self._lock:
+            if self._crawler is not None:
+                return
+
+            browser_config = BrowserConfig(
+                headless=True,
+                verbose=False,
+            )
+            crawler = AsyncWebCrawler(config=browser_config)
+            crawler.crawler_strategy.set_hook("on_page_context_created", self._on_page_context_created)
+            await crawler.start()
+            await self._load_profiles()
+
+            self._sessions = asyncio.Queue()
+            for i in range(self.size):
+                self._sessions.put_nowait(f"pool-{i}")
+
+            self._crawler = crawler
+            print(f"Crawler pool started with {self.size} pages")
+
+    async def close(self):
+        async with self._lock:
+            if self._crawler is None:
+                return
+            await self._crawler.close()
+            self._crawler = None
+            self._sessions = None
+            print("Crawler pool closed")
+
+    async def crawl(self, url: str) -> str:
+        # lazily start so the agent also works outside the fastapi app
+        if self._crawler is None:
+            await self.start()
+
+        host = host_of(url)
+        session_id = await self._sessions.get()
+        error = ""
+        try:
+            for profile in self.profiles.candidates(host):
+                started = time.perf_counter()
+                result = await self._crawler.arun(url=url, config=self._run_config(session_id, profile))
+                if result.success:
+                    await self._remember(host, profile, started)
+                    return result.markdown
+
+                # throw the page away so the next crawl starts from a clean one
+                await self._kill_session(session_id)
+                error = result.error_message or ""
+                if not _should_try_next(error):
+                    break
+                print(f"Crawl profile {profile.name} did not render {host} in time, trying the next one")
+
+        except Exception:
+            await self._kill_session(session_id)
+            raise
+
+        finally:
+            self._sessions.put_nowait(session_id)
+
+        raise CrawlError(f"Error scraping page: {error}")
+
+    def _run_config(self, session_id: str, profile: CrawlProfile) -> CrawlerRunConfig:
+        return CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,
+            session_id=session_id,
+            wait_until=profile.wait_until,
+            wait_for=profile.wait_for,
+            wait_for_timeout=settings.crawl_wait_timeout_ms,
+            page_timeout=settings.crawl_wait_timeout_ms * 2,
+            delay_before_return_html=profile.delay,
+            markdown_generator=DefaultMarkdownGenerator(
+                options={"ignore_links": True, "ignore_images": True}
+            )
+        )
+
+    async def _on_page_context_created(self, page, context=None, **kwargs):
+        # the hook runs for every crawl, a context only needs its route once
+        if settings.crawl_block_resources and context is not None and context not in self._routed:
+            self._routed.add(context)
+            await context.route("**/*", _block_or_continue)
+        return page
+
+    async def _load_profiles(self):
+        if db.crawl_profiles is None:
+            return
+        try:
+            self.profiles.load(await db.crawl_profiles.all())
+        except Exception as e:
+            print(f"Could not load crawl profiles: {e}")
+
+    async def _remember(self, host: str, profile: CrawlProfile, started: float):
+        if not self.profiles.remember(host, profile) or db.crawl_profiles is None:
+            return
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        try:
+            await db.crawl_profiles.record(host, profile.name, elapsed_ms)
+        except Exception as e:
+            print(f"Could not save crawl profile for {host}: {e}")
+
+    async def _kill_session(self, session_id: str):
+        try:
+            await self._crawler.crawler_strategy.kill_session(session_id)
+        except Exception as e:
+            print(f"Could not close crawler session {session_id}: {e}")
+
+
+crawler_pool = CrawlerPool(size=settings.crawler_pool_size)
@@ -0,0 +1,264 @@
+import asyncio
+import html
+import re
+import time
+import httpx
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional, Tuple
+from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from app.config import settings
+from app.agents.crawler import crawler_pool
+from app.agents.crawl_profiles import host_of
+from app.services.metrics import CRAWL_SECONDS, record, span
+
+_markdown = DefaultMarkdownGenerator(options={"ignore_links": True, "ignore_images": True})
+
+
+def html_to_markdown(fragment: str) -> str:
+    if not fragment:
+        return ""
+    return _markdown.generate_markdown(input_html=fragment, citations=False).raw_markdown.strip()
+
+
+def _posting_markdown(title: str, details: List[str], sections: List[str]) -> str:
+    # title and location first, compaction always keeps the top of the page
+    header = f"# {title}"
+    details = [detail for detail in details if detail]
+    if details:
+        header += "\n\n" + " | ".join(details)
+    return "\n\n".join([header] + [section for section in sections if section])
+
+
+class HostLimiter:
+    """
+    Per-host politeness: at most `concurrency` requests in flight to a host
+    and at least `interval` seconds between two requests starting.
+    """
+
+    def __init__(self, concurrency: int, interval: float):
+        self.concurrency = concurrency
+        self.interval = interval
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        semaphore = self._slots.setdefault(host, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+class ApiFetcher(ABC):
+    """
+    Reads a posting from an ATS's public JSON api instead of rendering its page.
+    `pattern` matches the posting urls the provider serves.
+    """
+
+    name = ""
+    pattern: re.Pattern = None
+
+    def match(self, url: str) -> Optional[re.Match]:
+        return self.pattern.match(url)
+
+    @abstractmethod
+    def api_host(self, match: re.Match) -> str:
+        """Host the api request goes to, the limiter keys on it."""
+
+    @abstractmethod
+    async def fetch(self, client: httpx.AsyncClient, match: re.Match) -> str:
+        """Returns the posting as markdown."""
+
+
+class GreenhouseFetcher(ApiFetcher):
+    name = "greenhouse"
+    pattern = re.compile(r"^https?://(?:boards|job-boards)(?:\.eu)?\.greenhouse\.io/([^/?#]+)/jobs/(\d+)", re.I)
+    api_base = "https://boards-api.greenhouse.io"
+
+    def api_host(self, match):
+        return host_of(self.api_base)
+
+    async def fetch(self, client, match):
+        board, job_id = match.groups()
+        response = await client.get(f"{self.api_base}/v1/boards/{board}/jobs/{job_id}")
+        response.raise_for_status()
+        job = response.json()
+        # the description comes html escaped
+        content = html_to_markdown(html.unescape(job.get("content") or ""))
+        return _posting_markdown(
+            job.get("title", ""),
+            [board, (job.get("location") or {}).get("name")],
+            [content]
+        )
+
+
+class LeverFetcher(ApiFetcher):
+    name = "lever"
+    pattern = re.compile(r"^https?://jobs\.(eu\.)?lever\.co/([^/?#]+)/([0-9a-f-]{36})", re.I)
+
+    def api_host(self, match):
+        return f"api.{match.group(1) or ''}lever.co"
+
+    async def fetch(self, client, match):
+        region, company, posting_id = match.groups()
+        response = await client.get(f"https://{self.api_host(match)}/v0/postings/{company}/{posting_id}")
+        response.raise_for_status()
+        posting = response.json()
+
+        categories = posting.get("categories") or {}
+        sections = [html_to_markdown(posting.get("description") or "")]
+        for block in posting.get("lists") or []:
+            sections.append(f"## {block.get('text', '')}\n\n{html_to_markdown(block.get('content') or '')}")
+        sections.append(html_to_markdown(posting.get("additional") or ""))
+
+        return _posting_markdown(
+            posting.get("text", ""),
+            [company, categories.get("location"), categories.get("team"), categories.get("commitment")],
+            sections
+        )
+
+
+class AshbyFetcher(ApiFetcher):
+    name = "ashby"
+    pattern = re.compile(r"^https?://jobs\.ashbyhq\.com/([^/?#]+)/([0-9a-f-]{36})", re.I)
+    # the api only lists a whole board, postings from the same board share one fetch
+    board_ttl_seconds = 300
+
+    def __init__(self):
+        self._boards: Dict[str, Tuple[float, Dict[str, Dict]]] = {}
+
+    def api_host(self, match):
+        return "api.ashbyhq.com"
+
+    async def _board(self, client, organization: str) -> Dict[str, Dict]:
+        cached = self._boards.get(organization)
+        if cached and time.monotonic() - cached[0] < self.board_ttl_seconds:
+            return cached[1]
+
+        response = await client.get(f"https://api.ashbyhq.com/posting-api/job-board/{organization}")
+        response.raise_for_status()
+        jobs = {job["id"]: job for job in response.json().get("jobs", []) if "id" in job}
+        self._boards[organization] = (time.monotonic(), jobs)
+        return jobs
+
+    async def fetch(self, client, match):
+        organization, job_id = match.groups()
+        job = (await self._board(client, organization)).get(job_id.lower())
+        if job is None:
+            raise LookupError(f"{job_id} is not on the {organization} Ashby board")
+
+        return _posting_markdown(
+            job.get("title", ""),
+            [organization, job.get("location"), job.get("employmentType")],
+            [html_to_markdown(job.get("descriptionHtml") or "") or job.get("descriptionPlain", "")]
+        )
+
+
+class SmartRecruitersFetcher(ApiFetcher):
+    name = "smartrecruiters"
+    pattern = re.compile(r"^https?://(?:jobs|careers)\.smartrecruiters\.com/([^/?#]+)/(\d+)", re.I)
+
+    def api_host(self, match):
+        return "api.smartrecruiters.com"
+
+    async def fetch(self, client, match):
+        company, posting_id = match.groups()
+        response = await client.get(f"https://api.smartrecruiters.com/v1/companies/{company}/postings/{posting_id}")
+        response.raise_for_status()
+        posting = response.json()
+
+        location = posting.get("location") or {}
+        sections = []
+        for section in ((posting.get("jobAd") or {}).get("sections") or {}).values():
+            text = html_to_markdown(section.get("text") or "")
+            if text:
+                sections.append(f"## {section.get('title', '')}\n\n{text}")
+
+        return _posting_markdown(
+            posting.get("name", ""),
+            [company, ", ".join(part for part in (location.get("city"), location.get("country")) if part)],
+            sections
+        )
+
+
+@contextmanager
+def _timed_crawl(host: str, method: str):
+    start = time.perf_counter()
+    outcome = "error"
+    with span("crawl", host=host, method=method):
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            seconds = time.perf_counter() - start
+            CRAWL_SECONDS.observe(seconds, host=host, method=method, outcome=outcome)
+            record("crawl", seconds)
+
+
+class JobFetcher:
+    """
+    Gets the text of a job posting as markdown.
+    Postings on an ATS with a public api are read over one pooled http client;
+    everything else, and any api call that fails, goes through the browser pool.
+    Both paths are rate limited per host.
+    """
+
+    def __init__(self, fetchers: List[ApiFetcher], limiter: HostLimiter):
+        self.fetchers = list(fetchers)
+        self.limiter = limiter
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def register(self, fetcher: ApiFetcher):
+        # later registrations win, so a provider can be overridden
+        self.fetchers.insert(0, fetcher)
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.fetch_timeout_seconds,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                headers={"Accept": "application/json"},
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _find(self, url: str) -> Tuple[Optional[ApiFetcher], Optional[re.Match]]:
+        for fetcher in self.fetchers:
+            match = fetcher.match(url)
+            if match:
+                return fetcher, match
+        return None, None
+
+    async def fetch(self, url: str) -> str:
+        fetcher, match = self._find(url)
+        if fetcher is not None:
+            await self.start()
+            try:
+                host = fetcher.api_host(match)
+                async with self.limiter.slot(host):
+                    with _timed_crawl(host, "api"):
+                        markdown = await fetcher.fetch(self._client, match)
+                if markdown.strip():
+                    return markdown
+            except Exception as e:
+                print(f"{fetcher.name} api failed for {url}, using the browser: {e}")
+
+        host = host_of(url)
+        async with self.limiter.slot(host):
+            with _timed_crawl(host, "browser"):
+                return await crawler_pool.crawl(url)
+
+
+job_fetcher = JobFetcher(
+    [GreenhouseFetcher(), LeverFetcher(), AshbyFetcher(), SmartRecruitersFetcher()],
+    HostLimiter(settings.fetch_host_concurrency, settings.fetch_host_interval_seconds),
+)
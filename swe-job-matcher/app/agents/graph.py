@@ -1,38 +1,192 @@
-from app.agents.tools import scan_for_jobs
-from typing import TypedDict, List
+import asyncio
+import operator
+from app.config import settings
+from app.agents.tools import select_jobs, describe_job, prescore_job, process_job_batch
+from app.agents.resume_profile import extract_resume_profile, profile_document
+from app.agents.checkpoint import graph_checkpointer
+from app.services.metrics import timed_async
+from typing import Annotated, TypedDict, List, Optional
 from langchain_core.messages import BaseMessage
+from langchain_community.tools import TavilySearchResults
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 
 class AgentState(TypedDict):
     resume_text: str
-    matches: List[dict]
+    # compact structured resume, extracted once per resume and reused for every match
+    profile: Optional[dict]
+    jobs: List[dict]
+    # filled by parallel scrape and score tasks, each one appends its own part
+    scraped: Annotated[List[dict], operator.add]
+    matches: Annotated[List[dict], operator.add]
+    high_matches: List[dict]
     research_notes: dict
     messages: List[BaseMessage]
 
+class ScrapeTask(TypedDict):
+    job: dict
+    candidate_text: str
+
+class ScoreTask(TypedDict):
+    batch: List[dict]
+    candidate_text: str
+
+# per node caps, on top of the crawler pool and llm limits shared by every analysis
+_scrape_limiter = asyncio.Semaphore(settings.graph_scrape_concurrency)
+_score_limiter = asyncio.Semaphore(settings.graph_score_concurrency)
+
+def _candidate_text(state: AgentState) -> str:
+    profile = state.get("profile")
+    return profile["text"] if profile else state["resume_text"]
+
+def _research_key(company: str) -> str:
+    # company names become mongo field names
+    return company.replace(".", "_").replace("$", "_")
+
 # define nodes in graph
-async def scanner_node(state: AgentState):
-    results = await scan_for_jobs.ainvoke(state["resume_text"])
+@timed_async("node_profiler")
+async def profiler_node(state: AgentState):
+    if state.get("profile"):
+        return {}
+
+    try:
+        profile = profile_document(await extract_resume_profile(state["resume_text"]))
+    except Exception as e:
+        # matching still works on the raw resume text
+        print(f"Resume profile extraction failed, matching the raw resume: {e}")
+        return {"profile": None}
+
+    # saved on the resume by the caller, so a retried run does not extract it again
+    get_stream_writer()({"profile": profile})
+    return {"profile": profile}
+
+@timed_async("node_fetch")
+async def fetch_node(state: AgentState):
+    # the full resume ranks the board, the compact profile is what gets scored
+    jobs = await select_jobs(state["resume_text"])
+    if not jobs or "Error" in jobs[0]:
+        print("Failed to fetch jobs list.")
+        jobs = []
+    return {"jobs": jobs}
+
+def route_scrapes(state: AgentState):
+    if not state["jobs"]:
+        return "aggregate"
+    candidate_text = _candidate_text(state)
+    return [Send("scrape", {"job": job, "candidate_text": candidate_text}) for job in state["jobs"]]
+
+@timed_async("node_scrape")
+async def scrape_node(task: ScrapeTask):
+    job = task["job"]
+    async with _scrape_limiter:
+        try:
+            description = await describe_job(job)
+        except Exception as e:
+            print(f"Error processing {job.get('company')}: {e}")
+            description = f"Error scraping job posting: {str(e)}"
+
+    prescored = prescore_job(job, description, task["candidate_text"])
+    if prescored is not None:
+        get_stream_writer()({"match": prescored})
+        return {"matches": [prescored]}
+    return {"scraped": [{"job": job, "description": description}]}
+
+@timed_async("node_collect")
+async def collect_node(state: AgentState):
+    # runs once after every scrape task has finished
+    return {}
+
+def route_scores(state: AgentState):
+    scraped = state.get("scraped", [])
+    if not scraped:
+        return "aggregate"
+    size = max(1, settings.match_batch_size)
+    candidate_text = _candidate_text(state)
+    return [
+        Send("score", {"batch": scraped[i:i + size], "candidate_text": candidate_text})
+        for i in range(0, len(scraped), size)
+    ]
+
+@timed_async("node_score")
+async def score_node(task: ScoreTask):
+    scraped = [(item["job"], item["description"]) for item in task["batch"]]
+    async with _score_limiter:
+        results = await process_job_batch(scraped, task["candidate_text"])
+
+    # each finished batch is emitted on the "custom" stream while the others still run
+    writer = get_stream_writer()
+    for result in results:
+        writer({"match": result})
     return {"matches": results}
 
+@timed_async("node_aggregate")
+async def aggregate_node(state: AgentState):
+    ranked = sorted(state.get("matches", []), key=lambda m: m["match_details"]["score"], reverse=True)
+    high_matches = [m for m in ranked if m["match_details"]["score"] > settings.research_min_score]
+    return {"high_matches": high_matches}
+
+@timed_async("node_supervisor")
 async def supervisor_node(state: AgentState):
-    matches = state["matches"]
-    research_notes = state.get("research_notes", {})
-    high_matches = []
-    for m in matches:
-        if m["match_details"]["score"] > 80:
-            high_matches.append(m)
-            
-    return {"next": "end"}
+    print(f"Supervisor: {len(state.get('high_matches', []))} high matches out of {len(state.get('matches', []))}")
+    return {}
+
+def route_supervisor(state: AgentState) -> str:
+    # strong matches get company research, once per run
+    if settings.research_enabled and state.get("high_matches") and not state.get("research_notes"):
+        return "research"
+    return "end"
+
+@timed_async("node_research")
+async def research_node(state: AgentState):
+    targets = {}
+    for match in state["high_matches"]:
+        company = match.get("company") or "Unknown"
+        if company not in targets and len(targets) < settings.research_max_companies:
+            targets[company] = match
+
+    search = TavilySearchResults(max_results=3, tavily_api_key=settings.tavily_api_key)
+
+    async def research(company: str, match: dict):
+        query = f"{company} {match.get('role', '')} engineering team tech stack and interview process"
+        try:
+            results = await search.ainvoke({"query": query})
+        except Exception as e:
+            print(f"Research failed for {company}: {e}")
+            return company, []
+        if not isinstance(results, list):
+            return company, []
+        return company, [
+            {"title": r.get("title"), "url": r.get("url"), "content": (r.get("content") or "")[:500]}
+            for r in results if isinstance(r, dict)
+        ]
+
+    found = await asyncio.gather(*(research(company, match) for company, match in targets.items()))
+    return {"research_notes": {_research_key(company): notes for company, notes in found if notes}}
 
 # build the graph
 workflow = StateGraph(AgentState)
 # add nodes and entry point
-workflow.add_node("scanner", scanner_node)
+workflow.add_node("profiler", profiler_node)
+workflow.add_node("fetch", fetch_node)
+workflow.add_node("scrape", scrape_node)
+workflow.add_node("collect", collect_node)
+workflow.add_node("score", score_node)
+workflow.add_node("aggregate", aggregate_node)
 workflow.add_node("supervisor", supervisor_node)
+workflow.add_node("research", research_node)
 
-workflow.set_entry_point("scanner")
+workflow.set_entry_point("profiler")
 
-workflow.add_edge("scanner", "supervisor")
-workflow.add_edge("supervisor", END)
+workflow.add_edge("profiler", "fetch")
+# one scrape task per job, then one score task per batch of scraped jobs
+workflow.add_conditional_edges("fetch", route_scrapes, ["scrape", "aggregate"])
+workflow.add_edge("scrape", "collect")
+workflow.add_conditional_edges("collect", route_scores, ["score", "aggregate"])
+workflow.add_edge("score", "aggregate")
+workflow.add_edge("aggregate", "supervisor")
+workflow.add_conditional_edges("supervisor", route_supervisor, {"research": "research", "end": END})
+workflow.add_edge("research", END)
 
-app = workflow.compile()
\ No newline at end of file
+# every step is checkpointed under thread_id = resume id, a retried analysis resumes from there
+app = workflow.compile(checkpointer=graph_checkpointer)
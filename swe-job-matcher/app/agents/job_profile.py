@@ -0,0 +1,89 @@
+import hashlib
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel
+from langchain_core.prompts import ChatPromptTemplate
+from app.agents.matching import MATCH_MODEL, MAX_JOB_CHARS, get_llm, invoke_llm
+
+MAX_JOB_PROFILE_CHARS = 1500
+
+Level = Literal["intern", "new_grad", "junior", "mid", "senior", "staff", "unknown"]
+
+JOB_PROFILE_PROMPT = """
+    You are preparing a job posting for technical screening. Extract a compact, factual requirements profile.
+    Only use what the posting states. Do not invent requirements.
+
+    - level: one of intern, new_grad, junior, mid, senior, staff, or unknown when the posting does not say.
+    - required_skills: concrete technologies and skills the posting says are required (must have).
+    - preferred_skills: ones it lists as preferred, a plus or nice to have.
+    - min_years: the smallest number of years of experience it asks for, null when it asks for none.
+    - education: the degree or enrollment it asks for, empty when none.
+    - location and remote: where the job is and whether it is onsite, hybrid or remote.
+    - responsibilities: at most three short phrases on what the person will do.
+
+    JOB POSTING:
+    {job_description}
+    """
+
+# bumps whenever the extraction prompt or model changes, so cached profiles are rebuilt
+JOB_PROFILE_VERSION = hashlib.sha256(f"{MATCH_MODEL}:{JOB_PROFILE_PROMPT}".encode()).hexdigest()[:12]
+
+
+class JobProfile(BaseModel):
+    title: str
+    level: Level
+    required_skills: List[str] = []
+    preferred_skills: List[str] = []
+    min_years: Optional[int] = None
+    education: str = ""
+    location: str = ""
+    remote: Literal["onsite", "hybrid", "remote", "unknown"] = "unknown"
+    responsibilities: List[str] = []
+
+
+_job_profile_prompt = ChatPromptTemplate.from_template(JOB_PROFILE_PROMPT)
+
+
+async def extract_job_profile(job_description: str) -> JobProfile:
+    chain = _job_profile_prompt | get_llm().with_structured_output(JobProfile)
+    return await invoke_llm("job_profile", chain, {"job_description": job_description[:MAX_JOB_CHARS]})
+
+
+def render_job_profile(profile: JobProfile) -> str:
+    """
+    The text matching sees instead of the job description: level, experience,
+    required and preferred skills. Phrased so the local prescore rules can
+    read the years and technologies from it as well.
+    """
+    lines = [f"ROLE: {profile.title} (level: {profile.level})"]
+
+    location = ", ".join(part for part in (profile.location, profile.remote if profile.remote != "unknown" else "") if part)
+    if location:
+        lines.append(f"LOCATION: {location}")
+
+    if profile.min_years:
+        lines.append(f"EXPERIENCE: {profile.min_years}+ years of professional experience required")
+    else:
+        lines.append("EXPERIENCE: no minimum years of experience stated")
+
+    if profile.education:
+        lines.append(f"EDUCATION: {profile.education}")
+    if profile.required_skills:
+        lines.append(f"REQUIRED: {', '.join(profile.required_skills)}")
+    if profile.preferred_skills:
+        lines.append(f"PREFERRED (nice to have): {', '.join(profile.preferred_skills)}")
+
+    if profile.responsibilities:
+        lines.append("RESPONSIBILITIES:")
+        lines.extend(f"- {item}" for item in profile.responsibilities[:3])
+
+    return "\n".join(lines)[:MAX_JOB_PROFILE_CHARS]
+
+
+def job_profile_document(profile: JobProfile, source_hash: str) -> Dict:
+    # source_hash is the hash of the description the profile was read from
+    return {
+        "version": JOB_PROFILE_VERSION,
+        "source_hash": source_hash,
+        "data": profile.model_dump(),
+        "text": render_job_profile(profile),
+    }
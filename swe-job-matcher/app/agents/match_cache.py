@@ -0,0 +1,96 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.db import db
+from app.services.metrics import CACHE_LOOKUPS
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU with a per-entry time to live.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class MatchCache:
+    """
+    Caches match_resume_to_job results in memory with MongoDB behind it.
+    Keys combine the prompt version with hashes of the exact resume and job
+    text sent to the llm, so any change to either side is a miss.
+    """
+
+    def __init__(self, prompt_version: str):
+        self.prompt_version = prompt_version
+        self._memory = LRUCache(
+            maxsize=settings.match_cache_memory_size,
+            ttl_seconds=settings.match_cache_ttl_seconds,
+        )
+
+    def make_key(self, job_description: str, resume_text: str) -> str:
+        return f"{self.prompt_version}:{content_hash(resume_text)}:{content_hash(job_description)}"
+
+    async def get(self, key: str) -> Optional[Dict]:
+        result = self._memory.get(key)
+        if result is not None:
+            CACHE_LOOKUPS.inc(cache="match", result="memory")
+            return result
+
+        doc = await db.match_cache.get(key)
+        if not doc:
+            CACHE_LOOKUPS.inc(cache="match", result="miss")
+            return None
+
+        CACHE_LOOKUPS.inc(cache="match", result="db")
+        self._memory.set(key, doc["result"])
+        return doc["result"]
+
+    async def set(self, key: str, result: Dict):
+        self._memory.set(key, result)
+        await db.match_cache.upsert(key, result, self.prompt_version)
+
+    async def ensure_indexes(self):
+        await db.match_cache.ensure_indexes(settings.match_cache_ttl_seconds)
+        await self.invalidate_stale_versions()
+
+    async def invalidate_stale_versions(self) -> int:
+        # results scored by an older prompt or model are never read again
+        self._memory.clear()
+        deleted = await db.match_cache.delete_other_versions(self.prompt_version)
+        if deleted:
+            print(f"Invalidated {deleted} match results from older prompts")
+        return deleted
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import openai
+from typing import Dict, List, Optional
+from pydantic import BaseModel, field_validator
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+from app.config import settings
+from app.services import metrics
+from app.agents.compaction import count_tokens
+from app.agents.match_cache import MatchCache
+from app.agents.scheduler import llm_scheduler
+from app.agents.singleflight import SingleFlight
+
+MATCH_MODEL = "gpt-4o-mini"
+
+MAX_JOB_CHARS = 20000
+MAX_RESUME_CHARS = 5000
+# rules, instructions and the answer, on top of the inputs, when reserving a call's tokens
+PROMPT_OVERHEAD_TOKENS = 1200
+
+MATCH_RULES = """
+    You are a Cynical Engineering Manager. You are skeptical of resumes and strictly evaluate candidates based on PROVEN experience, not just keyword mentions.
+
+    YOUR GOAL: Find the gaps. Do not gloss over missing skills.
+
+    CRITICAL RULES FOR SCORING:
+    1. **Experience Level Match (Crucial):**
+       - If the Job is "Senior/Lead" and the Resume is "Student/Intern" -> INSTANT FAIL (Score < 50).
+       - Even if they have the keywords (React, Python), a student cannot lead a senior team.
+       - If Job is "Internship", judge based on potential and project complexity.
+
+    2. **Professional vs. Academic:**
+       - Professional Experience > Personal Projects > Class Projects.
+       - If a job asks for "Production Experience" and the candidate only has "Personal Projects", deduct points.
+
+    3. **Technical Equivalencies (Keep this):**
+       - Tailwind = CSS (Match)
+       - Supabase = SQL/Database (Match)
+       - Git = GitHub (Match)
+
+    4. **Scoring Rubric (Be Harsh):**
+       - 100: Impossible (Reserved for perfection).
+       - 90-99: "Unicorn" Candidate. Exceeds requirements, has live production apps with users, perfectly matches stack.
+       - 80-89: Strong Match. Meets all MUST-HAVES. Maybe misses a "Nice-to-have".
+       - 70-79: Good Match. Meets core tech but lacks specific domain knowledge or depth.
+       - 60-69: Okay. Has the language (e.g., Python) but wrong framework or context.
+       - < 60: Mismatch. Junior applying for Senior, or completely different stack.
+
+"""
+
+EVIDENCE_INSTRUCTIONS = """
+    INSTRUCTIONS FOR EVIDENCE:
+    - Cite the specific project type (Internship vs Project).
+    - Example: "Job requires AWS -> Candidate used AWS in 'NRVE' (Internship) to build serverless backend." (Strong Evidence)
+    - Example: "Job requires AWS -> Candidate used AWS in 'MeteorMate' (Personal Project)." (Weaker Evidence)
+
+"""
+
+MATCH_PROMPT = MATCH_RULES + """
+    JOB DESCRIPTION:
+    {job_description}
+
+    CANDIDATE RESUME:
+    {resume_text}
+    """ + EVIDENCE_INSTRUCTIONS + """
+    OUTPUT JSON ONLY:
+    {{
+        "score": <int 0-100>,
+        "reason": "Candidate matches [Seniority Level]. Strongest match is [Skill], weakest area is [Gap].",
+        "evidence": [
+            "Job requires [Req] -> Match: [Evidence]",
+            "Job requires [Req] -> Match: [Evidence]"
+        ],
+        "missing_skills": ["<List Gaps Here>"]
+    }}
+    """
+
+BATCH_MATCH_PROMPT = MATCH_RULES + """
+    CANDIDATE RESUME:
+    {resume_text}
+
+    Score the candidate against EACH job below on its own. Do not compare the jobs with each other.
+
+    {jobs}
+    """ + EVIDENCE_INSTRUCTIONS + """
+    Return exactly one result per job and copy its id into `job_id`.
+    The `reason` follows the form: "Candidate matches [Seniority Level]. Strongest match is [Skill], weakest area is [Gap]."
+    """
+
+# bumps whenever a prompt or the model changes, so cached scores from older versions are dropped
+PROMPT_VERSION = hashlib.sha256(f"{MATCH_MODEL}:{MATCH_PROMPT}:{BATCH_MATCH_PROMPT}".encode()).hexdigest()[:12]
+
+match_cache = MatchCache(PROMPT_VERSION)
+
+
+class MatchResult(BaseModel):
+    score: int
+    reason: str
+    evidence: List[str] = []
+    missing_skills: List[str] = []
+
+    @field_validator("score")
+    @classmethod
+    def clamp_score(cls, score: int) -> int:
+        return max(0, min(100, score))
+
+
+class JobMatchResult(MatchResult):
+    job_id: str
+
+
+class BatchMatchResult(BaseModel):
+    results: List[JobMatchResult]
+
+
+_match_prompt = ChatPromptTemplate.from_template(MATCH_PROMPT)
+_batch_prompt = ChatPromptTemplate.from_template(BATCH_MATCH_PROMPT)
+
+_llm: Optional[ChatOpenAI] = None
+_match_flight = SingleFlight()
+
+
+def get_llm() -> ChatOpenAI:
+    # one client for the process, so its http connections are reused across calls
+    global _llm
+    if _llm is None:
+        _llm = ChatOpenAI(
+            model=MATCH_MODEL,
+            temperature=0,
+            base_url=settings.openai_base_url or None,
+            # retries go through the scheduler, which honours the rate limit reset hints
+            max_retries=0,
+        )
+    return _llm
+
+
+async def invoke_llm(kind: str, chain, inputs: Dict):
+    """
+    Runs one llm chain through the process wide scheduler (concurrency,
+    tokens per minute, rate limit retries), recording its latency, outcome
+    and the token usage the OpenAI response reports.
+    """
+    estimated = sum(count_tokens(str(value)) for value in inputs.values()) + PROMPT_OVERHEAD_TOKENS
+
+    async def attempt():
+        usage = UsageMetadataCallbackHandler()
+        outcome = "error"
+        try:
+            with metrics.timed("llm", kind=kind):
+                result = await chain.ainvoke(inputs, config={"callbacks": [usage]})
+            outcome = "ok"
+        except openai.RateLimitError:
+            outcome = "rate_limited"
+            raise
+        finally:
+            metrics.LLM_REQUESTS.inc(kind=kind, outcome=outcome)
+            used = 0
+            for model_usage in usage.usage_metadata.values():
+                metrics.record_tokens(kind, model_usage.get("input_tokens", 0), model_usage.get("output_tokens", 0))
+                used += model_usage.get("total_tokens", 0)
+        return result, used
+
+    return await llm_scheduler.run(attempt, estimated)
+
+
+def _error_result(e: Exception) -> Dict:
+    return {
+        "score": 0,
+        "reason": f"Error: {str(e)}",
+        "evidence": [],
+        "missing_skills": []
+    }
+
+
+async def match_resume_to_job(job_description: str, resume_text: str) -> Dict:
+    job_description = job_description[:MAX_JOB_CHARS]
+    resume_text = resume_text[:MAX_RESUME_CHARS]
+
+    cache_key = match_cache.make_key(job_description, resume_text)
+    cached_result = await match_cache.get(cache_key)
+    if cached_result is not None:
+        print("CACHE HIT (MATCH): Reusing previous score.")
+        return cached_result
+
+    # the same resume scored against the same posting twice at once only calls the llm once
+    return await _match_flight.do(
+        cache_key,
+        lambda: _score_single(cache_key, job_description, resume_text)
+    )
+
+
+async def _score_single(cache_key: str, job_description: str, resume_text: str) -> Dict:
+    chain = _match_prompt | get_llm() | JsonOutputParser()
+
+    try:
+        raw = await invoke_llm("single", chain, {
+            "job_description": job_description,
+            "resume_text": resume_text
+        })
+        result = MatchResult.model_validate(raw).model_dump()
+        await match_cache.set(cache_key, result)
+        return result
+
+    except Exception as e:
+        return _error_result(e)
+
+
+async def match_resume_to_jobs(job_descriptions: List[str], resume_text: str) -> List[Dict]:
+    """
+    Scores one resume against several jobs, in the same order.
+    Cached scores are reused, the rest are sent in batches of `match_batch_size`
+    jobs per request (the rules and resume are sent once per batch). Any job a
+    batch fails to return a valid result for is rescored on its own.
+    """
+    resume_text = resume_text[:MAX_RESUME_CHARS]
+    descriptions = [d[:MAX_JOB_CHARS] for d in job_descriptions]
+    keys = [match_cache.make_key(d, resume_text) for d in descriptions]
+
+    results: List[Optional[Dict]] = [None] * len(descriptions)
+    to_batch: Dict[str, int] = {}
+    for i, key in enumerate(keys):
+        cached_result = await match_cache.get(key)
+        if cached_result is not None:
+            results[i] = cached_result
+        elif key not in to_batch and not _match_flight.in_flight(key):
+            to_batch[key] = i
+
+    pending = list(to_batch.values())
+    size = max(1, settings.match_batch_size)
+    chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+    batches = await asyncio.gather(*(
+        _score_batch(chunk, keys, descriptions, resume_text) for chunk in chunks if len(chunk) > 1
+    ))
+    for scored in batches:
+        for i, result in scored.items():
+            results[i] = result
+
+    # duplicates share the result of their first occurrence
+    for i, key in enumerate(keys):
+        if results[i] is None and key in to_batch and results[to_batch[key]] is not None:
+            results[i] = results[to_batch[key]]
+
+    # single jobs, in-flight keys and anything the batch dropped
+    missing = [i for i, result in enumerate(results) if result is None]
+    singles = await asyncio.gather(*(
+        match_resume_to_job(descriptions[i], resume_text) for i in missing
+    ))
+    for i, result in zip(missing, singles):
+        results[i] = result
+
+    return results
+
+
+async def _score_batch(indices: List[int], keys: List[str], descriptions: List[str], resume_text: str) -> Dict[int, Dict]:
+    jobs_block = "\n\n".join(
+        f"JOB [job-{i}]:\n{descriptions[i]}" for i in indices
+    )
+    chain = _batch_prompt | get_llm().with_structured_output(BatchMatchResult)
+
+    try:
+        batch = await invoke_llm("batch", chain, {"resume_text": resume_text, "jobs": jobs_block})
+    except Exception as e:
+        print(f"Batch scoring failed, scoring {len(indices)} jobs one by one: {e}")
+        return {}
+
+    by_id = {item.job_id: item for item in batch.results}
+    scored = {}
+    for i in indices:
+        item = by_id.get(f"job-{i}")
+        if item is None:
+            continue
+        result = MatchResult.model_validate(item.model_dump(exclude={"job_id"})).model_dump()
+        await match_cache.set(keys[i], result)
+        scored[i] = result
+
+    return scored
@@ -0,0 +1,157 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional
+
+# job levels read from the posting title, the description mentions "senior engineers" too often
+JOB_LEVELS = [
+    (re.compile(r"\b(intern(ship)?|co-?op)\b", re.I), "intern"),
+    (re.compile(r"\b(director|head of|vp|principal|staff|distinguished)\b", re.I), "staff"),
+    (re.compile(r"\b(senior|sr\.?|lead|manager|architect)\b", re.I), "senior"),
+    (re.compile(r"\b(new grad(uate)?|entry[- ]level|early career|university grad(uate)?|junior|jr\.?|associate)\b", re.I), "entry"),
+]
+
+# no digits between the figure and "experience", so "5+ years preferred, 2 years of experience" reads the 2
+YEARS_PATTERN = re.compile(
+    r"\b(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years?|yrs?)\b[^.\n\d]{0,40}?\bexperience\b", re.I
+)
+# a figure in the same clause as one of these is a wish, not a requirement
+PREFERRED_WORDS = re.compile(r"\b(preferred|nice[- ]to[- ]have|bonus|a plus)\b", re.I)
+CLAUSE_BEFORE = re.compile(r"[^.;,\n\d]*$")
+CLAUSE_AFTER = re.compile(r"[^.;\n\d]*")
+PROFILE_SENIORITY = re.compile(r"^SENIORITY:\s*(\w+)", re.M)
+GRADUATION_YEAR = re.compile(r"\b(?:expected|anticipated|graduat\w*|class of|b\.?s\.?|b\.?a\.?|bachelor\w*)\b[^\n]{0,60}?\b(20\d{2})\b", re.I)
+STUDENT_WORDS = re.compile(r"\b(gpa|coursework|undergraduate|expected graduation|student)\b", re.I)
+
+# canonical technology -> pattern, ambiguous words (go, rust, spring) need context.
+# the equivalencies from the matching prompt are folded in: tailwind counts as css,
+# supabase and postgres as sql, github as git
+TECH_PATTERNS = {
+    "python": r"\bpython\b", "java": r"\bjava\b(?!script)", "javascript": r"\bjavascript\b|\bjs\b",
+    "typescript": r"\btypescript\b|\bts\b", "go": r"\bgolang\b|\bgo\b(?= ?(?:,|/|\)|lang|programming|developer|services))",
+    "rust": r"\brust\b(?= ?(?:,|/|\)|programming|developer|lang))", "c++": r"\bc\+\+", "c#": r"\bc#|\.net\b",
+    "ruby": r"\bruby\b", "kotlin": r"\bkotlin\b", "swift": r"\bswift\b", "scala": r"\bscala\b",
+    "react": r"\breact(\.js)?\b", "angular": r"\bangular\b", "vue": r"\bvue(\.js)?\b", "node": r"\bnode(\.js)?\b",
+    "django": r"\bdjango\b", "flask": r"\bflask\b", "fastapi": r"\bfastapi\b", "rails": r"\bruby on rails\b|\brails\b",
+    "spring": r"\bspring ?boot\b", "css": r"\bcss\b|\btailwind\b", "sql": r"\bsql\b|\bpostgres(ql)?\b|\bmysql\b|\bsupabase\b",
+    "mongodb": r"\bmongo(db)?\b", "redis": r"\bredis\b", "kafka": r"\bkafka\b", "spark": r"\bspark\b",
+    "aws": r"\baws\b|\bamazon web services\b", "gcp": r"\bgcp\b|\bgoogle cloud\b", "azure": r"\bazure\b",
+    "docker": r"\bdocker\b", "kubernetes": r"\bkubernetes\b|\bk8s\b", "terraform": r"\bterraform\b",
+    "git": r"\bgit(hub|lab)?\b", "linux": r"\blinux\b", "graphql": r"\bgraphql\b",
+    "pytorch": r"\bpytorch\b", "tensorflow": r"\btensorflow\b", "machine learning": r"\bmachine learning\b|\bml\b",
+    "ios": r"\bios\b", "android": r"\bandroid\b", "embedded": r"\bembedded\b|\bfirmware\b|\bfpga\b|\bverilog\b",
+}
+TECH_REGEX = {name: re.compile(pattern, re.I) for name, pattern in TECH_PATTERNS.items()}
+
+SENIOR_JOB_SCORE = 35
+YEARS_GAP_SCORE = 40
+STACK_MISMATCH_SCORE = 45
+MIN_JOB_TECHS_FOR_MISMATCH = 5
+
+
+def technologies(text: str) -> FrozenSet[str]:
+    return frozenset(name for name, pattern in TECH_REGEX.items() if pattern.search(text))
+
+
+def job_level(title: str) -> str:
+    for pattern, level in JOB_LEVELS:
+        if pattern.search(title or ""):
+            return level
+    return "unknown"
+
+
+def _preferred(description: str, match: re.Match) -> bool:
+    # the clause runs from the previous sentence break, comma or figure to the next break or figure
+    before = CLAUSE_BEFORE.search(description, 0, match.start()).group(0)
+    after = CLAUSE_AFTER.match(description, match.end()).group(0)
+    return PREFERRED_WORDS.search(before + match.group(0) + after) is not None
+
+
+def required_years(description: str) -> Optional[int]:
+    # preferred experience is skipped, of the required figures the smallest wins
+    years = [
+        int(match.group(1)) for match in YEARS_PATTERN.finditer(description) if not _preferred(description, match)
+    ]
+    years = [y for y in years if 0 < y <= 20]
+    return min(years) if years else None
+
+
+class CandidateFacts:
+    __slots__ = ("level", "skills")
+
+    def __init__(self, level: str, skills: FrozenSet[str]):
+        self.level = level
+        self.skills = skills
+
+
+@lru_cache(maxsize=256)
+def candidate_facts(candidate_text: str) -> CandidateFacts:
+    """
+    Reads level and skills from the rendered resume profile, or from raw
+    resume text when there is no profile. The level is `early` only when
+    the text clearly says student or recent graduate.
+    """
+    level = "unknown"
+    seniority = PROFILE_SENIORITY.search(candidate_text)
+    if seniority:
+        level = "early" if seniority.group(1).lower() in ("student", "new_grad", "intern") else seniority.group(1).lower()
+    else:
+        years = [int(y) for y in GRADUATION_YEAR.findall(candidate_text)]
+        if years and max(years) >= datetime.utcnow().year - 1 and STUDENT_WORDS.search(candidate_text):
+            level = "early"
+    return CandidateFacts(level, technologies(candidate_text))
+
+
+# reason of the stand-in result for a posting that could not be scraped
+UNREADABLE_REASON = "Could not read the job posting, so it was not scored."
+
+
+def _fail(score: int, reason: str, evidence: List[str], missing: List[str]) -> Dict:
+    return {
+        "score": score,
+        "reason": reason,
+        "evidence": evidence,
+        "missing_skills": missing,
+        "prescored": True,
+    }
+
+
+def prescore(job_title: str, job_description: str, candidate_text: str) -> Optional[Dict]:
+    """
+    Applies the hard rules of the matching prompt locally. Returns a finished
+    match result for clear mismatches and None for anything the llm should judge.
+    """
+    if job_description.startswith(("Error scraping", "No link provided")):
+        return _fail(0, UNREADABLE_REASON, [], [])
+
+    candidate = candidate_facts(candidate_text)
+    level = job_level(job_title)
+
+    if candidate.level == "early" and level in ("senior", "staff"):
+        return _fail(
+            SENIOR_JOB_SCORE,
+            f"Candidate matches Student/New Grad level. The role is {level.title()} level, which is an automatic mismatch.",
+            [f"Job requires {level.title()} level -> Candidate is a student or recent graduate"],
+            [f"{level.title()}-level professional experience"],
+        )
+
+    years = required_years(job_description)
+    if candidate.level == "early" and level != "intern" and years is not None and years >= 3:
+        return _fail(
+            YEARS_GAP_SCORE,
+            f"Candidate matches Student/New Grad level. The role asks for {years}+ years of experience.",
+            [f"Job requires {years}+ years of experience -> Candidate is a student or recent graduate"],
+            [f"{years}+ years of professional experience"],
+        )
+
+    job_techs = technologies(job_description)
+    if len(job_techs) >= MIN_JOB_TECHS_FOR_MISMATCH and candidate.skills and not (job_techs & candidate.skills):
+        missing = sorted(job_techs)
+        return _fail(
+            STACK_MISMATCH_SCORE,
+            f"Candidate has none of the technologies this role uses. Weakest area is {', '.join(missing[:3])}.",
+            [f"Job requires {', '.join(missing[:5])} -> No match on the resume"],
+            missing,
+        )
+
+    return None
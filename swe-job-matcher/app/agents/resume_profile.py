@@ -0,0 +1,111 @@
+import hashlib
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel
+from langchain_core.prompts import ChatPromptTemplate
+from app.agents.matching import MATCH_MODEL, MAX_RESUME_CHARS, get_llm, invoke_llm
+
+MAX_PROFILE_CHARS = 2500
+
+Evidence = Literal["professional", "internship", "research", "project", "class", "listed"]
+
+PROFILE_PROMPT = """
+    You are preparing a resume for technical screening. Extract a compact, factual profile.
+    Only use what the resume states. Do not infer skills that are not written down.
+
+    - seniority: one of student, new_grad, junior, mid, senior, staff.
+    - education: each degree with school, field and graduation year (or expected year).
+    - experiences: each internship, job, research position or notable project, with at most
+      two short highlights (what was built, scale, impact). `kind` is how it was done.
+    - skills: each concrete technology or skill with the strongest evidence the resume gives for it
+      (professional > internship > research > project > class > listed only in a skills section)
+      and where that evidence comes from (company or project name).
+
+    RESUME:
+    {resume_text}
+    """
+
+# bumps whenever the extraction prompt or model changes, so stored profiles are rebuilt
+PROFILE_VERSION = hashlib.sha256(f"{MATCH_MODEL}:{PROFILE_PROMPT}".encode()).hexdigest()[:12]
+
+
+class Education(BaseModel):
+    school: str
+    degree: str = ""
+    field: str = ""
+    graduation: str = ""
+
+
+class Experience(BaseModel):
+    title: str
+    organization: str
+    kind: Evidence
+    highlights: List[str] = []
+
+
+class Skill(BaseModel):
+    name: str
+    evidence: Evidence
+    source: str = ""
+
+
+class ResumeProfile(BaseModel):
+    seniority: str
+    education: List[Education] = []
+    experiences: List[Experience] = []
+    skills: List[Skill] = []
+
+
+_profile_prompt = ChatPromptTemplate.from_template(PROFILE_PROMPT)
+
+
+async def extract_resume_profile(resume_text: str) -> ResumeProfile:
+    chain = _profile_prompt | get_llm().with_structured_output(ResumeProfile)
+    return await invoke_llm("profile", chain, {"resume_text": resume_text[:MAX_RESUME_CHARS]})
+
+
+def render_profile(profile: ResumeProfile) -> str:
+    """
+    The text matching sees instead of the raw resume: seniority, education,
+    experience by kind and every skill with its strongest evidence.
+    """
+    lines = [f"SENIORITY: {profile.seniority}"]
+
+    if profile.education:
+        lines.append("EDUCATION:")
+        for education in profile.education:
+            degree = " ".join(part for part in (education.degree, education.field) if part)
+            graduation = f" ({education.graduation})" if education.graduation else ""
+            lines.append(f"- {degree or 'Degree'}, {education.school}{graduation}")
+
+    if profile.experiences:
+        lines.append("EXPERIENCE:")
+        for experience in profile.experiences:
+            highlights = "; ".join(experience.highlights[:2])
+            lines.append(
+                f"- {experience.title} @ {experience.organization} ({experience.kind})"
+                + (f": {highlights}" if highlights else "")
+            )
+
+    if profile.skills:
+        lines.append("SKILLS (strongest evidence):")
+        for skill in profile.skills:
+            source = f" in {skill.source}" if skill.source else ""
+            lines.append(f"- {skill.name}: {skill.evidence}{source}")
+
+    return "\n".join(lines)[:MAX_PROFILE_CHARS]
+
+
+def stored_profile(resume: Dict) -> Optional[Dict]:
+    # a profile saved by an older prompt or model is extracted again
+    profile = resume.get("profile")
+    if profile and profile.get("version") == PROFILE_VERSION:
+        return profile
+    return None
+
+
+def profile_document(profile: ResumeProfile) -> Dict:
+    return {
+        "version": PROFILE_VERSION,
+        "data": profile.model_dump(),
+        "text": render_profile(profile),
+    }
@@ -0,0 +1,214 @@
+import asyncio
+import re
+import time
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
+from app.config import settings
+from app.db import db
+from app.agents.urls import normalize_job_url
+from app.services.readme_parser import JobRecord
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+class HashingEncoder:
+    """
+    Offline fallback encoder: hashed bag of words with sublinear term frequency.
+    No vocabulary is kept, so new postings can be encoded on their own and
+    appended to the matrix without re-encoding the rest of the board.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def tokens(self, text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def bucket_ids(self, text: str) -> np.ndarray:
+        return np.fromiter(
+            (zlib.crc32(token.encode()) % self.dim for token in self.tokens(text)),
+            dtype=np.int64
+        )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            ids = self.bucket_ids(text)
+            if ids.size:
+                np.add.at(matrix[row], ids, 1.0)
+        np.log1p(matrix, out=matrix)
+        return _normalize(matrix)
+
+    def query_weights(self, matrix: np.ndarray) -> Optional[np.ndarray]:
+        # idf over the indexed jobs, so words every posting shares barely count
+        df = np.count_nonzero(matrix, axis=0)
+        return (np.log((1 + matrix.shape[0]) / (1 + df)) + 1).astype(np.float32)
+
+
+class SentenceTransformerEncoder:
+    """
+    Local embedding model, used when sentence-transformers is installed and
+    EMBEDDING_MODEL is set. Model files are read from the local cache.
+    """
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+    def query_weights(self, matrix: np.ndarray) -> Optional[np.ndarray]:
+        return None
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _job_text(job: JobRecord, description: Optional[str]) -> str:
+    text = f"{job.role} {job.company} {job.location}"
+    if description:
+        text += " " + description[:settings.retrieval_description_chars]
+    return text
+
+
+class JobIndex:
+    """
+    Job vectors for the open postings on the board, one row per posting, kept
+    in a NumPy matrix. `sync` applies a new board snapshot incrementally: rows
+    for removed or closed postings are dropped, rows without a link (closed on
+    the board) are never added, only new postings are encoded, and postings
+    whose description reached jobs_cache since they were encoded are encoded
+    again with it. Pre-warm crawls land after a snapshot was indexed, so the
+    cache is checked again every `refresh_seconds` even when the board did not
+    change.
+    """
+
+    def __init__(self, encoder, refresh_seconds: float):
+        self.encoder = encoder
+        self.refresh_seconds = refresh_seconds
+        self.version: Optional[str] = None
+        self._jobs: List[JobRecord] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._weights: Optional[np.ndarray] = None
+        # job key -> content hash of the description its row was encoded with
+        self._described: Dict[str, Optional[str]] = {}
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _due(self, snapshot) -> bool:
+        return snapshot.version != self.version or time.monotonic() - self._checked_at >= self.refresh_seconds
+
+    async def sync(self, snapshot):
+        if not self._due(snapshot):
+            return
+
+        async with self._lock:
+            if not self._due(snapshot):
+                return
+
+            jobs = list({job.key: job for job in snapshot.jobs if job.link != "No link"}.values())
+            states = await self._cache_states(jobs)
+            jobs = [job for job in jobs if not states.get(job.link, {}).get("closed")]
+
+            current = {job.key: row for row, job in enumerate(self._jobs)}
+            to_encode = []
+            for job in jobs:
+                description_hash = states.get(job.link, {}).get("content_hash")
+                if job.key not in current:
+                    to_encode.append(job)
+                elif description_hash is not None and description_hash != self._described.get(job.key):
+                    # crawled (or changed) since its row was encoded
+                    to_encode.append(job)
+
+            descriptions = await self._cached_descriptions(
+                [job for job in to_encode if states.get(job.link, {}).get("content_hash")]
+            )
+
+            texts = [_job_text(job, descriptions.get(job.link)) for job in to_encode]
+            new_rows = await asyncio.to_thread(self.encoder.encode, texts) if texts else None
+
+            # keep rows in snapshot order, reusing vectors that are still up to date
+            new_row_for = {job.key: i for i, job in enumerate(to_encode)}
+            rows = []
+            for job in jobs:
+                if job.key in new_row_for:
+                    rows.append(new_rows[new_row_for[job.key]])
+                else:
+                    rows.append(self._matrix[current[job.key]])
+
+            described = dict(self._described)
+            for job in to_encode:
+                described[job.key] = states[job.link].get("content_hash") if job.link in descriptions else None
+            self._described = {job.key: described.get(job.key) for job in jobs}
+
+            matrix = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+            self._weights = self.encoder.query_weights(matrix) if rows else None
+            self._matrix = matrix
+            self._jobs = jobs
+            self.version = snapshot.version
+            self._checked_at = time.monotonic()
+            print(
+                f"Job index synced to {snapshot.version}: {len(to_encode)} encoded, "
+                f"{len(descriptions)} with descriptions, {len(self._jobs)} open postings"
+            )
+
+    async def _cache_states(self, jobs: List[JobRecord]) -> Dict[str, Dict]:
+        # closed flag and description hash of every posting, without the descriptions themselves
+        keys = {normalize_job_url(job.link): job.link for job in jobs}
+        if not keys:
+            return {}
+
+        try:
+            docs = await db.jobs_cache.find_many(list(keys), ["closed", "content_hash"])
+        except Exception as e:
+            print(f"Could not load jobs_cache state for the job index: {e}")
+            return {}
+
+        return {keys[doc["_id"]]: doc for doc in docs}
+
+    async def _cached_descriptions(self, jobs: List[JobRecord]) -> Dict[str, str]:
+        keys = {normalize_job_url(job.link): job.link for job in jobs}
+        if not keys:
+            return {}
+
+        try:
+            docs = await db.jobs_cache.find_many(list(keys), ["markdown"])
+        except Exception as e:
+            print(f"Could not load cached descriptions for the job index: {e}")
+            return {}
+
+        return {keys[doc["_id"]]: doc["markdown"] for doc in docs if doc.get("markdown")}
+
+    def top_k(self, resume_text: str, k: int) -> List[Dict]:
+        jobs, matrix, weights = self._jobs, self._matrix, self._weights
+        if not jobs:
+            return []
+
+        query = self.encoder.encode([resume_text])[0]
+        if weights is not None:
+            query = query * weights
+        # rows are unit length, so this is cosine similarity up to a constant
+        scores = matrix @ query
+
+        k = min(k, len(jobs))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [jobs[i].to_dict() for i in best]
+
+
+def create_encoder():
+    if settings.embedding_model:
+        try:
+            return SentenceTransformerEncoder(settings.embedding_model)
+        except Exception as e:
+            print(f"Embedding model unavailable, using hashed bag of words: {e}")
+    return HashingEncoder(settings.retrieval_hash_dim)
+
+
+job_index = JobIndex(create_encoder(), settings.retrieval_refresh_seconds)
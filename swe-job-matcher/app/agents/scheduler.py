@@ -0,0 +1,152 @@
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+import openai
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from app.config import settings
+from app.services import metrics
+
+T = TypeVar("T")
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    # openai reset headers look like "1s", "6m0s" or "250ms"
+    parts = DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(number) * UNIT_SECONDS[unit] for number, unit in parts)
+
+
+def retry_hint(error: BaseException) -> Optional[float]:
+    """Seconds the api asked us to wait before the next request, if it said."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, TypeError, ValueError):
+            pass
+    resets = [parse_duration(headers.get(name)) for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, openai.RateLimitError):
+        # an exhausted quota does not come back by waiting
+        return getattr(error, "code", None) != "insufficient_quota"
+    return isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+
+class TokenBucket:
+    """
+    Tokens per minute budget that refills continuously. Callers reserve an
+    estimate up front and settle with the real usage afterwards; waiters are
+    served in arrival order.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int) -> float:
+        """Waits until `tokens` are available, takes them and returns how many were reserved."""
+        # a request larger than the whole budget waits for a full bucket, not forever
+        tokens = min(float(tokens), self.capacity)
+        async with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # taken up front, even into debt, so later callers queue behind this one
+            self.tokens -= tokens
+            wait = max(-self.tokens / self.rate, self._paused_until - now)
+        # sleep outside the lock so settle, pause and other callers are never held up
+        try:
+            while wait > 0:
+                await asyncio.sleep(wait)
+                # a pause that came in while sleeping applies too
+                wait = self._paused_until - time.monotonic()
+        except asyncio.CancelledError:
+            self.settle(tokens, 0)
+            raise
+        return tokens
+
+    def settle(self, reserved: float, used: int):
+        self._refill(time.monotonic())
+        self.tokens = min(self.capacity, self.tokens + reserved - used)
+
+    def pause(self, seconds: float):
+        # the api said stop, so every caller waits, not just the one that got the 429
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class LLMScheduler:
+    """
+    Admission for every llm call in the process: at most `concurrency` in
+    flight, estimated tokens per minute kept under budget, and rate limit or
+    transient api errors retried after the wait the api asks for (exponential
+    backoff when it does not say).
+    """
+
+    def __init__(self, concurrency: int, tokens_per_minute: int, max_retries: int, max_wait: float):
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self._slots = asyncio.Semaphore(concurrency)
+        self.budget = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._backoff = wait_exponential_jitter(initial=1, max=max_wait)
+
+    def _wait(self, retry_state) -> float:
+        error = retry_state.outcome.exception()
+        hint = retry_hint(error)
+        delay = min(hint, self.max_wait) if hint is not None else self._backoff(retry_state)
+        if isinstance(error, openai.RateLimitError) and self.budget is not None:
+            self.budget.pause(delay)
+        print(f"LLM call failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    async def _once(self, attempt: Callable[[], Awaitable[Tuple[T, int]]], estimated_tokens: int) -> T:
+        start = time.perf_counter()
+        reserved = 0.0
+        if self.budget is not None:
+            reserved = await self.budget.acquire(estimated_tokens)
+        async with self._slots:
+            metrics.record("llm_wait", time.perf_counter() - start)
+            used = 0
+            try:
+                result, used = await attempt()
+                return result
+            finally:
+                # failed calls give their reservation back
+                if self.budget is not None:
+                    self.budget.settle(reserved, used)
+
+    async def run(self, attempt: Callable[[], Awaitable[Tuple[T, int]]], estimated_tokens: int) -> T:
+        """`attempt` makes one call and returns its result and the tokens it used."""
+        async for retry in AsyncRetrying(
+            retry=retry_if_exception(_retryable),
+            wait=self._wait,
+            stop=stop_after_attempt(self.max_retries + 1),
+            reraise=True,
+        ):
+            with retry:
+                return await self._once(attempt, estimated_tokens)
+
+
+llm_scheduler = LLMScheduler(
+    settings.llm_max_concurrency,
+    settings.llm_tokens_per_minute,
+    settings.llm_max_retries,
+    settings.llm_max_retry_wait_seconds,
+)
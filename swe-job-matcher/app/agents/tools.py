@@ -1,25 +1,22 @@
-import requests
 import asyncio
 import re
-import nest_asyncio
-import json
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
-from bs4 import BeautifulSoup
-from langchain.tools import tool
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import JsonOutputParser
 from langchain.agents import create_agent
-from langchain_community.tools import TavilySearchResults
-from typing import List, Dict
-from app.config import jobs_cache_collection 
-from datetime import datetime
-
-# allows crawl4ai to work with fastapi
-nest_asyncio.apply()
-
-GITHUB_URL = "https://raw.githubusercontent.com/SimplifyJobs/Summer2026-Internships/dev/README.md"
+from typing import List, Dict, Optional, Tuple
+from app.config import settings
+from app.db import db
+from app.agents.fetchers import job_fetcher
+from app.agents.singleflight import SingleFlight
+from app.agents.urls import normalize_job_url
+from app.agents.compaction import compact_fields, cached_compact
+from app.agents.match_cache import LRUCache, content_hash
+from app.agents.job_profile import JOB_PROFILE_VERSION, extract_job_profile, job_profile_document
+from app.agents.matching import match_resume_to_job, match_resume_to_jobs
+from app.agents.prescore import UNREADABLE_REASON, prescore
+from app.agents.retrieval import job_index
+from app.services.job_board import job_board
+from app.services.metrics import CACHE_LOOKUPS, timed
+from datetime import datetime, timedelta
 
 NOISE_PATTERNS = [
     re.compile(r'Skip to main content.*?(?=\n)', re.IGNORECASE),
@@ -29,70 +26,16 @@ NOISE_PATTERNS = [
     re.compile(r'Follow Us.*', re.IGNORECASE),
 ]
 
-def get_github_jobs(limit: int=3) -> List[Dict]:
+_scrape_flight = SingleFlight()
+_profile_flight = SingleFlight()
+# job profile texts by description hash, most analyses match the same top postings
+_job_profiles = LRUCache(maxsize=settings.job_profile_memory_size, ttl_seconds=settings.jobs_cache_fresh_seconds)
+# background refreshes of stale entries, referenced so they are not garbage collected
+_revalidations = set()
+
+async def get_github_jobs(limit: int=3) -> List[Dict]:
     try:
-        r = requests.get(GITHUB_URL, timeout=10)
-        # checks for any errors
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, 'html.parser')
-
-        # find table
-        table = soup.find('table')
-
-        if not table:
-            return {"Error": "No table found"}
-        
-        body = table.find("tbody")
-        rows = body.find_all("tr")
-        
-        jobs = []
-        last_company = ""
-
-        # for each table row, we need to extract the data from each column, td
-        for row in rows:
-            if len(jobs) >= limit:
-                break
-                
-            cells = row.find_all("td")
-            # check if any rows are bad
-            if len(cells) < 4:
-                continue
-            
-            raw_company = cells[0].get_text(strip=True)
-            
-            # Skip rows with the arrow icon (sub-listings)
-            if '↳' in raw_company:
-                continue
-            
-            # Skip if company name is empty
-            if not raw_company:
-                continue
-            
-            # Set the company name
-            company = raw_company
-
-            # extract the role
-            role = cells[1].get_text(strip=True)
-
-            # extract the location
-            location = cells[2].get_text(strip=True)
-
-            # extract the link
-            link_tag = cells[3].find("a")
-            if link_tag:
-                link = link_tag["href"]
-            else:
-                link = "No link"
-
-            jobs.append({
-                "company": company,
-                "role": role,
-                "location": location,
-                "link": link
-            })
-            
-        return jobs
-        
+        return await job_board.get_jobs(limit=limit)
     except Exception as e:
         return [{"Error": f"Failed to fetch jobs: {str(e)}"}]
 
@@ -105,125 +48,186 @@ def _clean_job_description(markdown_text: str) -> str:
     
     return cleaned.strip()
 
-# crawl4ai setup
+# ats json apis when the host has one, otherwise the shared crawler pool
 async def _crawl_async(url: str) -> str:
-    # create browser config
-    browser_config = BrowserConfig(
-        headless=True,
-        verbose=False,
-    )
-    # create crawler config to wait for sites like workday to load
-    run_config = CrawlerRunConfig(
-        cache_mode=CacheMode.BYPASS,
-        delay_before_return_html=3.0,
-        markdown_generator=DefaultMarkdownGenerator(
-            options={"ignore_links": True, "ignore_images": True}
-        )
+    return await job_fetcher.fetch(url)
+
+def _expires_in(seconds: int) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+def _scrape_error(error: str) -> str:
+    return f"Error scraping job posting: {error}"
+
+# the text to match and whether the crawl itself worked
+async def _scrape_and_cache(url: str, cache_key: str, previous: Optional[Dict] = None) -> Tuple[str, bool]:
+    print(f"CACHE MISS: Scraping {url}..." if previous is None else f"REVALIDATING: Scraping {url}...")
+    now = datetime.utcnow()
+    try:
+        raw_markdown = await _crawl_async(url)
+        with timed("clean"):
+            cleaned_text = _clean_job_description(raw_markdown)
+        if not cleaned_text:
+            raise ValueError("page has no text")
+
+    except Exception as e:
+        try:
+            if previous is not None:
+                # keep serving the copy we have, try again after the error ttl
+                await db.jobs_cache.upsert(previous["_id"], {"fresh_until": _expires_in(settings.jobs_cache_error_ttl_seconds)})
+                return cached_compact(previous, settings.job_description_token_budget) or _scrape_error(str(e)), False
+
+            # failures are cached briefly so a broken page is not crawled on every request
+            await db.jobs_cache.upsert(cache_key, {
+                "status": "error",
+                "error": str(e),
+                "url": url,
+                "fetched_at": now,
+                "expires_at": _expires_in(settings.jobs_cache_error_ttl_seconds)
+            })
+        except Exception as db_error:
+            print(f"Could not cache scrape failure for {url}: {db_error}")
+        return _scrape_error(str(e)), False
+
+    fields = {
+        "status": "ok",
+        "error": None,
+        "url": url,
+        "content_hash": content_hash(cleaned_text),
+        "fetched_at": now,
+        "last_accessed": now,
+        "fresh_until": _expires_in(settings.jobs_cache_fresh_seconds),
+        "expires_at": _expires_in(settings.jobs_cache_ttl_seconds)
+    }
+    compact = None
+    if previous is not None and previous["_id"] == cache_key and previous.get("content_hash") == fields["content_hash"]:
+        # unchanged posting, only the timestamps move
+        compact = cached_compact(previous, settings.job_description_token_budget)
+    if compact is None:
+        # the raw markdown is kept, matching reads the compact form
+        with timed("compact"):
+            compact_job = compact_fields(cleaned_text, settings.job_description_token_budget)
+        fields.update({"markdown": cleaned_text, **compact_job})
+        compact = compact_job["compact_markdown"]
+
+    try:
+        await db.jobs_cache.upsert(cache_key, fields)
+    except Exception as e:
+        print(f"Could not cache {url}: {e}")
+    return compact, True
+
+def _revalidate(url: str, cache_key: str, cached_job: Dict):
+    if _scrape_flight.in_flight(cache_key):
+        return
+    task = asyncio.create_task(
+        _scrape_flight.do(cache_key, lambda: _scrape_and_cache(url, cache_key, cached_job))
     )
-    # create instance of async web crawler
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        # Run the crawler on a URL
-        result = await crawler.arun(url=url, config=run_config)
-        if result.success:
-            return result.markdown
-        else:
-            return f"Error scraping page: {result.error_message}"
+    _revalidations.add(task)
+    task.add_done_callback(_revalidations.discard)
+
+async def _touch(cached_job: Dict, now: datetime):
+    # hot entries keep sliding their expiry, at most one write per touch interval
+    last_accessed = cached_job.get("last_accessed")
+    if last_accessed and (now - last_accessed).total_seconds() < settings.jobs_cache_touch_seconds:
+        return
+    try:
+        await db.jobs_cache.touch(cached_job["_id"], _expires_in(settings.jobs_cache_ttl_seconds))
+    except Exception as e:
+        print(f"Could not touch cached job {cached_job['_id']}: {e}")
+
+async def scrape_job_posting(url: str) -> str:
+    cache_key = normalize_job_url(url)
+    # older entries were stored under the raw url
+    with timed("cache_lookup"):
+        cached_job = await db.jobs_cache.find_any([cache_key, url])
+    now = datetime.utcnow()
+
+    if cached_job and cached_job.get("expires_at") and cached_job["expires_at"] <= now:
+        # expired, the ttl monitor just has not removed it yet
+        cached_job = None
+
+    if cached_job and cached_job.get("status") == "error":
+        print(f"CACHE HIT (DB): {url} failed recently, not scraping it again yet.")
+        CACHE_LOOKUPS.inc(cache="jobs", result="negative")
+        return _scrape_error(cached_job.get("error", "unknown error"))
 
-def scrape_job_posting(url: str) -> str:
-    cached_job = jobs_cache_collection.find_one({"_id": url})
-    
     if cached_job:
         print(f"CACHE HIT (DB): Fetching {url} from MongoDB.")
-        return cached_job["markdown"]
+        compact = cached_compact(cached_job, settings.job_description_token_budget)
+        if compact is None:
+            # entry from before compaction or from a different token budget
+            with timed("compact"):
+                fields = compact_fields(cached_job["markdown"], settings.job_description_token_budget)
+            await db.jobs_cache.upsert(cached_job["_id"], fields)
+            compact = fields["compact_markdown"]
+
+        await _touch(cached_job, now)
+        # stale while revalidate: answer from the cache, refresh in the background
+        fresh_until = cached_job.get("fresh_until")
+        stale = not cached_job.get("closed") and (fresh_until is None or fresh_until <= now)
+        CACHE_LOOKUPS.inc(cache="jobs", result="stale" if stale else "hit")
+        if stale:
+            _revalidate(url, cache_key, cached_job)
+        return compact
+
+    CACHE_LOOKUPS.inc(cache="jobs", result="miss")
+    # only one crawl per posting is in flight, concurrent callers share its result
+    text, _ = await _scrape_flight.do(cache_key, lambda: _scrape_and_cache(url, cache_key))
+    return text
+
+def is_scrape_error(description: str) -> bool:
+    return description.startswith("Error scraping")
+
+async def refresh_job_posting(url: str) -> bool:
+    # crawls the posting again now, a failed crawl keeps serving the copy we have; returns whether it worked
+    cache_key = normalize_job_url(url)
+    cached_job = await db.jobs_cache.find_any([cache_key, url])
+    if cached_job is not None and cached_job.get("status") == "error":
+        cached_job = None
+    _, crawled = await _scrape_flight.do(cache_key, lambda: _scrape_and_cache(url, cache_key, cached_job))
+    return crawled
 
-    print(f"CACHE MISS: Scraping {url}...")
+async def _extract_and_store_profile(keys: List[str], source_hash: str, description: str) -> str:
+    document = job_profile_document(await extract_job_profile(description), source_hash)
     try:
-        raw_markdown = asyncio.run(_crawl_async(url))
-        cleaned_text = _clean_job_description(raw_markdown)
-
-        jobs_cache_collection.insert_one({
-            "_id": url,
-            "markdown": cleaned_text,
-            "created_at": datetime.now()
-        })
-        return cleaned_text
-        
+        await db.jobs_cache.set_job_profile(keys, document)
     except Exception as e:
-        return f"Error scraping job posting: {str(e)}"
-
-def match_resume_to_job(job_description: str, resume_text: str) -> Dict:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
-    prompt = ChatPromptTemplate.from_template(
-        """
-        You are a Cynical Engineering Manager. You are skeptical of resumes and strictly evaluate candidates based on PROVEN experience, not just keyword mentions.
-        
-        YOUR GOAL: Find the gaps. Do not gloss over missing skills.
-        
-        CRITICAL RULES FOR SCORING:
-        1. **Experience Level Match (Crucial):**
-           - If the Job is "Senior/Lead" and the Resume is "Student/Intern" -> INSTANT FAIL (Score < 50).
-           - Even if they have the keywords (React, Python), a student cannot lead a senior team.
-           - If Job is "Internship", judge based on potential and project complexity.
-
-        2. **Professional vs. Academic:**
-           - Professional Experience > Personal Projects > Class Projects.
-           - If a job asks for "Production Experience" and the candidate only has "Personal Projects", deduct points.
-
-        3. **Technical Equivalencies (Keep this):**
-           - Tailwind = CSS (Match)
-           - Supabase = SQL/Database (Match)
-           - Git = GitHub (Match)
-        
-        4. **Scoring Rubric (Be Harsh):**
-           - 100: Impossible (Reserved for perfection).
-           - 90-99: "Unicorn" Candidate. Exceeds requirements, has live production apps with users, perfectly matches stack.
-           - 80-89: Strong Match. Meets all MUST-HAVES. Maybe misses a "Nice-to-have".
-           - 70-79: Good Match. Meets core tech but lacks specific domain knowledge or depth.
-           - 60-69: Okay. Has the language (e.g., Python) but wrong framework or context.
-           - < 60: Mismatch. Junior applying for Senior, or completely different stack.
-
-        JOB DESCRIPTION:
-        {job_description}
-        
-        CANDIDATE RESUME:
-        {resume_text}
-        
-        INSTRUCTIONS FOR EVIDENCE:
-        - Cite the specific project type (Internship vs Project). 
-        - Example: "Job requires AWS -> Candidate used AWS in 'NRVE' (Internship) to build serverless backend." (Strong Evidence)
-        - Example: "Job requires AWS -> Candidate used AWS in 'MeteorMate' (Personal Project)." (Weaker Evidence)
-        
-        OUTPUT JSON ONLY:
-        {{
-            "score": <int 0-100>,
-            "reason": "Candidate matches [Seniority Level]. Strongest match is [Skill], weakest area is [Gap].",
-            "evidence": [
-                "Job requires [Req] -> Match: [Evidence]",
-                "Job requires [Req] -> Match: [Evidence]"
-            ],
-            "missing_skills": ["<List Gaps Here>"]
-        }}
-        """
-    )
-    
-    chain = prompt | llm | JsonOutputParser()
-    
+        print(f"Could not cache job profile for {keys[0]}: {e}")
+    return document["text"]
+
+async def profile_job_posting(url: str, description: str) -> str:
+    """
+    The requirements profile of a posting, extracted by the llm once per
+    distinct description and shared by every analysis. Falls back to the
+    description when profiles are off or extraction fails.
+    """
+    if not settings.job_profile_enabled or description.startswith(("Error scraping", "No link provided")):
+        return description
+
+    source_hash = content_hash(description)
+    text = _job_profiles.get(source_hash)
+    if text is not None:
+        CACHE_LOOKUPS.inc(cache="job_profile", result="memory")
+        return text
+
     try:
-        result = chain.invoke({
-            "job_description": job_description[:20000],
-            "resume_text": resume_text[:5000]
-        })
-        return result
-        
+        stored = await db.jobs_cache.find_job_profile(source_hash, JOB_PROFILE_VERSION)
+        if stored is not None:
+            CACHE_LOOKUPS.inc(cache="job_profile", result="db")
+            text = stored["text"]
+        else:
+            CACHE_LOOKUPS.inc(cache="job_profile", result="miss")
+            keys = [normalize_job_url(url), url]
+            # many analyses reach a new posting at once, only one of them asks the llm
+            text = await _profile_flight.do(
+                source_hash,
+                lambda: _extract_and_store_profile(keys, source_hash, description)
+            )
     except Exception as e:
-        return {
-            "score": 0, 
-            "reason": f"Error: {str(e)}",
-            "evidence": [],
-            "missing_skills": []
-        }
-    
+        print(f"Job profile extraction failed for {url}, matching the description: {e}")
+        return description
+
+    _job_profiles.set(source_hash, text)
+    return text
 
 def create_job_agent():
     llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, max_tokens=5000)
@@ -263,60 +267,64 @@ def create_job_agent():
     
     return agent
 
-# helper function to process one job
-async def process_single_job(job: Dict, resume_text: str) -> Dict:
-    try:
-        company = job.get("company")
-        role = job.get("role")
-        link = job.get("link")
+async def describe_job(job: Dict) -> str:
+    link = job.get("link")
+    # in mongodb
+    if link and link != "No link":
+        # the compact requirements profile is what gets matched, not the whole posting
+        return await profile_job_posting(link, await scrape_job_posting(link))
+    return "No link provided, cannot analyze."
 
-        # in mongodb
-        if link and link != "No link":
-            description = await asyncio.to_thread(scrape_job_posting, link)
-        else:
-            description = "No link provided, cannot analyze."
-        
-        match_result = await asyncio.to_thread(
-            match_resume_to_job,
-            description,
-            resume_text
-        )
-
-        return {
-            "company": company,
-            "role": role,
-            "link": link,
-            "match_details": match_result
-        }
-    
-    except Exception as e:
-        print(f"Error processing {job.get('company')}: {e}")
-        return {
-            "company": job.get("company", "Unknown"),
-            "role": job.get("role", "Unknown"),
-            "link": job.get("link", "#"),
-            "match_details": {
-                "score": 0, 
-                "reason": "Error during processing", 
-                "evidence": [], 
-                "missing_skills": []
-            }
+def _job_result(job: Dict, match_result: Dict) -> Dict:
+    return {
+        "company": job.get("company"),
+        "role": job.get("role"),
+        "link": job.get("link"),
+        "match_details": match_result
+    }
+
+def _error_job_result(job: Dict) -> Dict:
+    return {
+        "company": job.get("company", "Unknown"),
+        "role": job.get("role", "Unknown"),
+        "link": job.get("link", "#"),
+        "match_details": {
+            "score": 0, 
+            "reason": "Error during processing", 
+            "evidence": [], 
+            "missing_skills": []
         }
-    
-async def find_and_match_jobs(resume_text: str) -> List[Dict]:
-    jobs = get_github_jobs(limit=3)
+    }
 
-    if not jobs or "Error" in jobs[0]:
-        print("Failed to fetch jobs list.")
-        return []
-    
-    tasks = []
-    for job in jobs:
-        tasks.append(process_single_job(job, resume_text))
+# stand-ins for a failed scrape or llm call, scored 0 instead of raising
+def is_failed_match(result: Dict) -> bool:
+    reason = result.get("match_details", {}).get("reason", "")
+    return reason.startswith(("Error", UNREADABLE_REASON))
+
+# clear mismatches are decided by local rules, everything else goes to the llm
+def prescore_job(job: Dict, description: str, resume_text: str) -> Optional[Dict]:
+    if not settings.prescore_enabled:
+        return None
+    verdict = prescore(job.get("role", ""), description, resume_text)
+    return _job_result(job, verdict) if verdict is not None else None
 
-    results = await asyncio.gather(*tasks)
-    return results
+# scores a group of already scraped jobs with as few llm requests as possible
+async def process_job_batch(scraped: List[tuple], resume_text: str) -> List[Dict]:
+    jobs = [job for job, _ in scraped]
+    try:
+        matches = await match_resume_to_jobs([description for _, description in scraped], resume_text)
+        return [_job_result(job, match) for job, match in zip(jobs, matches)]
 
-@tool(description="Scans the github repo, scrapes the top jobs, and matches them against the resume. Returns a list of job matches with scores.")
-async def scan_for_jobs(resume_text: str):
-    return await find_and_match_jobs(resume_text)
\ No newline at end of file
+    except Exception as e:
+        print(f"Error scoring batch of {len(jobs)} jobs: {e}")
+        return [_error_job_result(job) for job in jobs]
+
+# rank the whole board against the resume, only the best few are scraped and scored
+async def select_jobs(resume_text: str) -> List[Dict]:
+    try:
+        snapshot = await job_board.get_snapshot()
+        await job_index.sync(snapshot)
+        return await asyncio.to_thread(job_index.top_k, resume_text, settings.match_top_k)
+    except Exception as e:
+        print(f"Job ranking failed, using the newest postings: {e}")
+        return await get_github_jobs(limit=settings.match_top_k)
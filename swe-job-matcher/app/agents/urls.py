@@ -0,0 +1,13 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# tracking params added by the job board, they do not change the posting
+TRACKING_PARAMS = {"ref", "source", "gh_src"}
+
+def normalize_job_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
@@ -1,6 +1,5 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
-from pymongo import MongoClient
 from clerk_backend_api import Clerk
 
 load_dotenv()
@@ -9,26 +8,102 @@ class Settings(BaseSettings):
     openai_api_key: str
     mongo_uri: str
     mongo_db_name: str
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 0
     clerk_secret_key: str
     tavily_api_key: str
+    crawler_pool_size: int = 4
+    # longest a crawl waits for the posting to render before trying the next profile
+    crawl_wait_timeout_ms: int = 15000
+    crawl_block_resources: bool = True
+    # politeness towards each job site, shared by the api fast path and the browser
+    fetch_host_concurrency: int = 4
+    fetch_host_interval_seconds: float = 0.25
+    fetch_timeout_seconds: float = 10.0
+    # scraped postings: unused entries expire, entries older than fresh are refreshed in the background
+    jobs_cache_ttl_seconds: int = 60 * 60 * 24 * 30
+    jobs_cache_fresh_seconds: int = 60 * 60 * 24 * 3
+    jobs_cache_error_ttl_seconds: int = 60 * 15
+    jobs_cache_touch_seconds: int = 60 * 60
+    match_cache_ttl_seconds: int = 60 * 60 * 24 * 7
+    match_cache_memory_size: int = 2048
+    job_board_url: str = "https://raw.githubusercontent.com/SimplifyJobs/Summer2026-Internships/dev/README.md"
+    job_board_refresh_seconds: int = 300
+    # workers crawl newly posted roles into jobs_cache whenever the board changes
+    prewarm_enabled: bool = True
+    prewarm_concurrency: int = 2
+    prewarm_initial_limit: int = 50
+    # a worker that stops renewing this lease mid pre-warm leaves the rest to another worker
+    prewarm_lease_seconds: int = 300
+    # failed pre-warm crawls are tried again on later claims, up to this many times
+    prewarm_max_attempts: int = 3
+    clerk_jwks_url: str = "https://full-bee-63.clerk.accounts.dev/.well-known/jwks.json"
+    jwks_default_max_age_seconds: int = 3600
+    jwks_min_refetch_seconds: int = 30
+    analysis_worker_concurrency: int = 2
+    # workers started inside the api process, 0 means analyses only run in `python -m app.worker`
+    analysis_embedded_workers: int = 0
+    analysis_lease_seconds: int = 120
+    analysis_heartbeat_seconds: int = 30
+    analysis_poll_seconds: float = 2.0
+    analysis_max_attempts: int = 3
+    analysis_retry_base_seconds: int = 30
+    # backpressure: uploads get a 429 once this many analyses wait, or a user already has this many queued or running
+    analysis_queue_max: int = 200
+    analysis_max_pending_per_user: int = 3
+    analysis_queue_retry_after_seconds: int = 30
+    # fair share: a worker skips users that already have this many analyses running
+    analysis_max_running_per_user: int = 1
+    openai_base_url: str = ""
+    # every llm call in a process shares these: calls in flight, tokens per minute (0 is unlimited), retries on 429
+    llm_max_concurrency: int = 8
+    llm_tokens_per_minute: int = 150_000
+    llm_max_retries: int = 5
+    llm_max_retry_wait_seconds: float = 60.0
+    # jobs scored per llm request, 1 scores every job on its own
+    match_batch_size: int = 3
+    match_top_k: int = 3
+    # agent graph: parallel scrape and score tasks per analysis, checkpoints kept for retries
+    graph_max_concurrency: int = 8
+    graph_scrape_concurrency: int = 4
+    graph_score_concurrency: int = 2
+    graph_checkpoint_ttl_seconds: int = 60 * 60 * 24 * 7
+    # company research for strong matches
+    research_enabled: bool = True
+    research_min_score: int = 80
+    research_max_companies: int = 3
+    # skip the llm for jobs the matching rules reject outright (senior roles for students, ...)
+    prescore_enabled: bool = True
+    # requirements profile read from each job description once and shared by every analysis
+    job_profile_enabled: bool = True
+    job_profile_memory_size: int = 1024
+    # job descriptions are compacted to this many tokens before matching
+    job_description_token_budget: int = 1500
+    # sentence-transformers model name, empty uses the hashed bag of words encoder
+    embedding_model: str = ""
+    retrieval_hash_dim: int = 2048
+    retrieval_description_chars: int = 2000
+    # the job index picks up closed postings and newly crawled descriptions this often
+    retrieval_refresh_seconds: int = 300
+    # resume pdf extraction, runs in a process pool
+    resume_extract_workers: int = 2
+    resume_extract_timeout_seconds: float = 10.0
+    resume_max_bytes: int = 5 * 1024 * 1024
+    resume_max_pages: int = 10
+    resume_max_chars: int = 100_000
+    # auto, pypdfium2 or pdfplumber
+    resume_pdf_backend: str = "auto"
+    resume_stream_idle_seconds: float = 15.0
+    # only used when mongo has no change streams (standalone server)
+    resume_stream_poll_seconds: float = 1.0
+    # prometheus metrics of `python -m app.worker` on this port, 0 turns it off (the api serves /api/metrics)
+    worker_metrics_port: int = 0
     
     class Config:
         env_file = ".env"
 
 settings = Settings()
 
-try:
-    client = MongoClient(settings.mongo_uri)
-    db = client[settings.mongo_db_name]
-    resumes_collection = db["resumes"]
-    users_collection = db["users"]
-    jobs_cache_collection = db["jobs_cache"]
-    
-    print("Connected to MongoDB")
-
-except Exception as e:
-    print(f"Could not connect to MongoDB: {e}")
-
 try:
     clerk = Clerk(bearer_auth=settings.clerk_secret_key)
     print("Clerk initialized")
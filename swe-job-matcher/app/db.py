@@ -0,0 +1,686 @@
+import asyncio
+import zstandard
+from bson import Binary
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from pymongo import AsyncMongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo.asynchronous.collection import AsyncCollection
+from app.config import settings
+from app.services.metrics import MongoCommandMetrics
+
+_compressor = zstandard.ZstdCompressor(level=6)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+class ResumeChangeFeed:
+    """
+    One change stream on the resumes collection per process, fanned out in
+    memory to everyone watching a resume. It is opened by the first
+    subscriber and closed after the last one leaves, so any number of open
+    SSE clients hold a single pooled connection between them. Each change to
+    a watched resume is read once and handed to all of its subscribers.
+    """
+
+    # handed to subscribers when the stream dies, their watch ends and clients reconnect
+    CLOSED = object()
+
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+        self._subscribers: Dict[Any, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._opened: Optional[asyncio.Future] = None
+
+    async def subscribe(self, resume_id) -> asyncio.Queue:
+        """Queue receiving the resume document after every change. Raises OperationFailure without change streams."""
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(resume_id, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._opened = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._run(self._opened))
+        try:
+            await asyncio.shield(self._opened)
+        except BaseException:
+            self.unsubscribe(resume_id, queue)
+            raise
+        return queue
+
+    def unsubscribe(self, resume_id, queue: asyncio.Queue):
+        queues = self._subscribers.get(resume_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[resume_id]
+        if not self._subscribers and self._task is not None:
+            # nobody is watching, give the connection back to the pool
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, opened: asyncio.Future):
+        try:
+            stream = await self.collection.watch([{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}])
+        except Exception as e:
+            opened.set_exception(e)
+            return
+        opened.set_result(None)
+
+        try:
+            async with stream:
+                async for change in stream:
+                    resume_id = change["documentKey"]["_id"]
+                    if resume_id not in self._subscribers:
+                        continue
+                    resume = await self.collection.find_one({"_id": resume_id})
+                    for queue in self._subscribers.get(resume_id, ()):
+                        queue.put_nowait(resume)
+        except Exception as e:
+            print(f"Resume change stream closed: {e}")
+            for queues in self._subscribers.values():
+                for queue in queues:
+                    queue.put_nowait(self.CLOSED)
+
+
+class ResumeRepository:
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+        self._changes = ResumeChangeFeed(collection)
+
+    async def get(self, resume_id) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": resume_id})
+
+    async def find_latest_for_user(self, user_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"user_id": user_id},
+            sort=[("uploaded_at", -1)]
+        )
+
+    async def find_by_file_hash(self, file_hash: str) -> Optional[Dict]:
+        return await self.collection.find_one({"file_hash": file_hash}, projection=["content"])
+
+    async def insert(self, resume: Dict):
+        result = await self.collection.insert_one(resume)
+        return result.inserted_id
+
+    async def find_completed_analysis(self, analysis_key: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"analysis_key": analysis_key, "status": "completed"},
+            projection=["matches", "research", "profile"],
+            sort=[("uploaded_at", -1)]
+        )
+
+    async def update(self, resume_id, fields: Dict):
+        await self.collection.update_one({"_id": resume_id}, {"$set": fields})
+
+    # uploads linked to a running analysis (same resume, same board) follow every update to it
+    @staticmethod
+    def _analysis_group(resume_id) -> Dict:
+        return {"$or": [{"_id": resume_id}, {"linked_to": resume_id}]}
+
+    async def update_analysis(self, resume_id, fields: Dict):
+        await self.collection.update_many(self._analysis_group(resume_id), {"$set": fields})
+
+    async def push_match(self, resume_id, match: Dict):
+        await self.collection.update_many(self._analysis_group(resume_id), {"$push": {"matches": match}})
+
+    async def watch(self, resume_id, idle_seconds: float, poll_seconds: float) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yields the resume document now and after every change to it, or None
+        when nothing changed for `idle_seconds`. Changes come from the shared
+        change feed, and are polled for when the server does not support
+        change streams (standalone mongod).
+        """
+        try:
+            updates = await self._changes.subscribe(resume_id)
+        except OperationFailure:
+            updates = None
+
+        if updates is None:
+            last_seen = None
+            idle = 0.0
+            while True:
+                resume = await self.get(resume_id) or {}
+                seen = (resume.get("status"), len(resume.get("matches", [])))
+                if seen != last_seen:
+                    last_seen = seen
+                    idle = 0.0
+                    yield resume
+                elif idle >= idle_seconds:
+                    idle = 0.0
+                    yield None
+                await asyncio.sleep(poll_seconds)
+                idle += poll_seconds
+
+        try:
+            # read after subscribing so no update falls in between
+            yield await self.get(resume_id)
+            while True:
+                try:
+                    resume = await asyncio.wait_for(updates.get(), idle_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                # every update is the whole document, only the newest one matters
+                while not updates.empty():
+                    resume = updates.get_nowait()
+                if resume is ResumeChangeFeed.CLOSED:
+                    return
+                if resume is not None:
+                    yield resume
+        finally:
+            self._changes.unsubscribe(resume_id, updates)
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("user_id", 1), ("uploaded_at", -1)])
+        await self.collection.create_index([("analysis_key", 1), ("status", 1)], sparse=True)
+        await self.collection.create_index("linked_to", sparse=True)
+        await self.collection.create_index("file_hash", sparse=True)
+
+
+class UserRepository:
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    async def get(self, user_id: str) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": user_id})
+
+    async def insert(self, user: Dict):
+        await self.collection.insert_one(user)
+
+
+class JobsCacheRepository:
+    """
+    Scraped job descriptions keyed by normalized url.
+    Full markdown is stored zstd compressed and decompressed on read, so
+    callers only ever see a `markdown` field. The extracted requirements
+    profile sits next to it under `job_profile`. Every entry carries an
+    `expires_at` that a TTL index enforces: long for good pages, short for
+    failed scrapes.
+    """
+
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    @staticmethod
+    def _encode(fields: Dict) -> Dict:
+        if "markdown" in fields:
+            fields = dict(fields)
+            fields["markdown_zstd"] = Binary(_compressor.compress(fields.pop("markdown").encode("utf-8")))
+        return fields
+
+    @staticmethod
+    def _decode(doc: Optional[Dict]) -> Optional[Dict]:
+        if doc and "markdown_zstd" in doc:
+            doc["markdown"] = _decompressor.decompress(doc.pop("markdown_zstd")).decode("utf-8")
+        return doc
+
+    async def find_any(self, keys: List[str]) -> Optional[Dict]:
+        return self._decode(await self.collection.find_one({"_id": {"$in": keys}}))
+
+    async def find_many(self, keys: List[str], fields: List[str]) -> List[Dict]:
+        if "markdown" in fields:
+            fields = fields + ["markdown_zstd"]
+        cursor = self.collection.find({"_id": {"$in": keys}}, projection=fields)
+        return [self._decode(doc) for doc in await cursor.to_list()]
+
+    async def upsert(self, key: str, fields: Dict):
+        # upsert so a write racing with another process never hits a duplicate key
+        # older uncompressed markdown is dropped once the compressed copy is written
+        update = {"$set": self._encode(fields)}
+        if "markdown" in fields:
+            update["$unset"] = {"markdown": ""}
+        await self.collection.update_one({"_id": key}, update, upsert=True)
+
+    async def touch(self, key: str, expires_at: datetime):
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {"last_accessed": datetime.utcnow(), "expires_at": expires_at}}
+        )
+
+    async def find_job_profile(self, source_hash: str, version: str) -> Optional[Dict]:
+        # any posting with the same description will do, reposted roles often change urls
+        doc = await self.collection.find_one(
+            {"job_profile.source_hash": source_hash, "job_profile.version": version},
+            projection=["job_profile"]
+        )
+        return doc["job_profile"] if doc else None
+
+    async def set_job_profile(self, keys: List[str], job_profile: Dict):
+        await self.collection.update_many({"_id": {"$in": keys}}, {"$set": {"job_profile": job_profile}})
+
+    async def set_closed(self, keys: List[str], closed: bool) -> int:
+        fields = {"closed": closed, "closed_at": datetime.utcnow() if closed else None}
+        result = await self.collection.update_many({"_id": {"$in": keys}}, {"$set": fields})
+        return result.modified_count
+
+    async def ensure_indexes(self):
+        # expires_at holds the exact expiry of each entry
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        await self.collection.create_index("job_profile.source_hash", sparse=True)
+
+    async def add_expiry(self, ttl_seconds: int):
+        # entries from before expiry existed: error pages go, the rest revalidate on their next hit
+        await self.collection.delete_many({"markdown": {"$regex": "^Error scraping"}})
+        now = datetime.utcnow()
+        await self.collection.update_many(
+            {"expires_at": {"$exists": False}},
+            {"$set": {"status": "ok", "fresh_until": now, "expires_at": now + timedelta(seconds=ttl_seconds)}}
+        )
+
+
+class MatchCacheRepository:
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": key})
+
+    async def upsert(self, key: str, result: Dict, prompt_version: str):
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "result": result,
+                "prompt_version": prompt_version,
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+    async def delete_other_versions(self, prompt_version: str) -> int:
+        result = await self.collection.delete_many({"prompt_version": {"$ne": prompt_version}})
+        return result.deleted_count
+
+    async def ensure_indexes(self, ttl_seconds: int):
+        # mongo drops entries on its own once they are older than the ttl
+        await self.collection.create_index("created_at", expireAfterSeconds=ttl_seconds)
+
+
+class BoardStateRepository:
+    """
+    The last job board snapshot that was ingested, as (key, location) rows,
+    and the postings still to pre-warm for it. Moving it to a new version is
+    a compare-and-swap, so with several workers only one of them processes
+    each README change. The pre-warm list is leased: a worker that dies
+    mid-crawl leaves the rest to the next one that claims it.
+    """
+
+    STATE_ID = "simplify"
+
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    async def get(self) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": self.STATE_ID})
+
+    async def advance(
+        self,
+        previous_version: Optional[str],
+        version: str,
+        rows: List[List[str]],
+        prewarm: List[Dict],
+        lease_seconds: int
+    ) -> bool:
+        now = datetime.utcnow()
+        fields = {
+            "version": version,
+            "rows": rows,
+            "updated_at": now,
+            # the worker that advances owns the pre-warm
+            "prewarm": prewarm,
+            "prewarm_lease_until": now + timedelta(seconds=lease_seconds),
+        }
+        if previous_version is None:
+            try:
+                await self.collection.insert_one({"_id": self.STATE_ID, **fields})
+                return True
+            except DuplicateKeyError:
+                return False
+
+        result = await self.collection.update_one(
+            {"_id": self.STATE_ID, "version": previous_version},
+            {"$set": fields}
+        )
+        return result.modified_count == 1
+
+    async def claim_prewarm(self, lease_seconds: int) -> List[Dict]:
+        now = datetime.utcnow()
+        doc = await self.collection.find_one_and_update(
+            {
+                "_id": self.STATE_ID,
+                "prewarm.0": {"$exists": True},
+                "$or": [{"prewarm_lease_until": {"$lte": now}}, {"prewarm_lease_until": None}],
+            },
+            {"$set": {"prewarm_lease_until": now + timedelta(seconds=lease_seconds)}},
+            projection=["prewarm"]
+        )
+        return doc["prewarm"] if doc else []
+
+    async def retry_prewarm(self, link: str, max_attempts: int, lease_seconds: int):
+        # a failed crawl stays in the list for a later claim, until it has failed max_attempts times
+        await self.collection.update_one(
+            {"_id": self.STATE_ID, "prewarm.link": link},
+            {
+                "$inc": {"prewarm.$.attempts": 1},
+                "$set": {"prewarm_lease_until": datetime.utcnow() + timedelta(seconds=lease_seconds)},
+            }
+        )
+        await self.collection.update_one(
+            {"_id": self.STATE_ID},
+            {"$pull": {"prewarm": {"link": link, "attempts": {"$gte": max_attempts}}}}
+        )
+
+    async def finish_prewarm(self, links: List[str], lease_seconds: int):
+        # every finished crawl also extends the lease of the worker doing them
+        await self.collection.update_one(
+            {"_id": self.STATE_ID},
+            {
+                "$pull": {"prewarm": {"link": {"$in": links}}},
+                "$set": {"prewarm_lease_until": datetime.utcnow() + timedelta(seconds=lease_seconds)},
+            }
+        )
+
+
+class MigrationRepository:
+    """
+    One-off data migrations that already ran, so a full collection scan runs
+    once per database instead of on every api and worker start.
+    """
+
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    async def run_once(self, name: str, migration: Callable[[], Awaitable[None]]):
+        if await self.collection.find_one({"_id": name}) is not None:
+            return
+        # workers starting together may both run it, every migration is idempotent
+        await migration()
+        await self.collection.update_one(
+            {"_id": name},
+            {"$setOnInsert": {"applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        print(f"Applied migration {name}")
+
+
+class CrawlProfileRepository:
+    """The crawl profile that last worked for each job site host."""
+
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    async def all(self) -> List[Dict]:
+        return await self.collection.find({}).to_list(None)
+
+    async def record(self, host: str, profile: str, elapsed_ms: int):
+        await self.collection.update_one(
+            {"_id": host},
+            {
+                "$set": {"profile": profile, "elapsed_ms": elapsed_ms, "updated_at": datetime.utcnow()},
+                "$inc": {"successes": 1}
+            },
+            upsert=True
+        )
+
+
+class CheckpointRepository:
+    """
+    LangGraph checkpoints and pending task writes, one thread per analysis.
+    Checkpoint ids sort by creation time, so the newest is the largest.
+    """
+
+    def __init__(self, checkpoints: AsyncCollection, writes: AsyncCollection):
+        self.checkpoints = checkpoints
+        self.writes = writes
+
+    async def put(self, doc: Dict):
+        await self.checkpoints.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+
+    async def get(self, thread_id: str, checkpoint_ns: str, checkpoint_id: Optional[str]) -> Optional[Dict]:
+        query = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+        if checkpoint_id:
+            query["checkpoint_id"] = checkpoint_id
+        return await self.checkpoints.find_one(query, sort=[("checkpoint_id", -1)])
+
+    async def list(self, query: Dict, limit: Optional[int]) -> List[Dict]:
+        cursor = self.checkpoints.find(query, sort=[("checkpoint_id", -1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list()
+
+    async def put_writes(self, docs: List[Dict], overwrite: bool):
+        # a task that is retried writes the same (task, idx) again, the first write wins
+        operations = [
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": doc} if overwrite else {"$setOnInsert": doc},
+                upsert=True
+            )
+            for doc in docs
+        ]
+        if operations:
+            await self.writes.bulk_write(operations, ordered=False)
+
+    async def get_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Dict]:
+        cursor = self.writes.find(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id},
+            sort=[("task_id", 1), ("idx", 1)]
+        )
+        return await cursor.to_list()
+
+    async def delete_thread(self, thread_id: str):
+        await self.checkpoints.delete_many({"thread_id": thread_id})
+        await self.writes.delete_many({"thread_id": thread_id})
+
+    async def ensure_indexes(self, ttl_seconds: int):
+        await self.checkpoints.create_index([("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)])
+        await self.writes.create_index([("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", 1)])
+        # threads of analyses that were given up on are not kept forever
+        await self.checkpoints.create_index("created_at", expireAfterSeconds=ttl_seconds)
+        await self.writes.create_index("created_at", expireAfterSeconds=ttl_seconds)
+
+
+class AnalysisJobRepository:
+    """
+    Durable queue of resume analyses.
+    Workers lease a job for a fixed time and keep extending the lease while
+    they run it; a job whose lease runs out (crashed worker, deploy) is
+    claimable again.
+    """
+
+    def __init__(self, collection: AsyncCollection):
+        self.collection = collection
+
+    async def enqueue(self, resume_id, user_id: str, max_attempts: int, dedup_key: Optional[str] = None):
+        """
+        Raises DuplicateKeyError when a queued or running job already has `dedup_key`.
+        """
+        now = datetime.utcnow()
+        job = {
+            "resume_id": resume_id,
+            "user_id": user_id,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "run_at": now,
+            "created_at": now,
+        }
+        if dedup_key is not None:
+            # unique among active jobs, cleared when the job completes or fails
+            job.update({"dedup_key": dedup_key, "active": True})
+        result = await self.collection.insert_one(job)
+        return result.inserted_id
+
+    async def find_active(self, dedup_key: str) -> Optional[Dict]:
+        return await self.collection.find_one({"dedup_key": dedup_key, "active": True})
+
+    async def busy_users(self, max_running: int) -> List[str]:
+        cursor = await self.collection.aggregate([
+            {"$match": {"status": "running", "lease_until": {"$gte": datetime.utcnow()}}},
+            {"$group": {"_id": "$user_id", "running": {"$sum": 1}}},
+            {"$match": {"running": {"$gte": max_running}}},
+        ])
+        return [doc["_id"] async for doc in cursor]
+
+    async def count_waiting(self) -> int:
+        return await self.collection.count_documents({"status": "queued", "run_at": {"$lte": datetime.utcnow()}})
+
+    async def count_pending_for_user(self, user_id: str) -> int:
+        return await self.collection.count_documents({"user_id": user_id, "status": {"$in": ["queued", "running"]}})
+
+    async def claim(self, worker_id: str, lease_seconds: int, max_running_per_user: int = 0) -> Optional[Dict]:
+        """
+        Leases the oldest runnable job. With `max_running_per_user`, users who
+        already have that many jobs running are skipped while anyone else
+        waits, so one user's burst of uploads does not hold every worker.
+        """
+        if max_running_per_user > 0:
+            busy = await self.busy_users(max_running_per_user)
+            if busy:
+                job = await self._claim(worker_id, lease_seconds, {"user_id": {"$nin": busy}})
+                if job is not None:
+                    return job
+        return await self._claim(worker_id, lease_seconds, {})
+
+    async def _claim(self, worker_id: str, lease_seconds: int, extra: Dict) -> Optional[Dict]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}, **extra},
+                # stale lease left behind by a worker that died mid-run
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_owner": worker_id,
+                    "lease_until": now + timedelta(seconds=lease_seconds),
+                    "started_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def heartbeat(self, job_id, worker_id: str, lease_seconds: int) -> bool:
+        result = await self.collection.update_one(
+            {"_id": job_id, "status": "running", "lease_owner": worker_id},
+            {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=lease_seconds)}}
+        )
+        # false means another worker took the job over
+        return result.matched_count == 1
+
+    async def complete(self, job_id, worker_id: str):
+        await self.collection.update_one(
+            {"_id": job_id, "lease_owner": worker_id},
+            {"$set": {"status": "done", "finished_at": datetime.utcnow()}, "$unset": {"lease_until": "", "active": ""}}
+        )
+
+    async def retry(self, job_id, worker_id: str, delay_seconds: float, error: str):
+        await self.collection.update_one(
+            {"_id": job_id, "lease_owner": worker_id},
+            {
+                "$set": {
+                    "status": "queued",
+                    "run_at": datetime.utcnow() + timedelta(seconds=delay_seconds),
+                    "last_error": error,
+                },
+                "$unset": {"lease_until": "", "lease_owner": ""},
+            }
+        )
+
+    async def release(self, job_id, worker_id: str):
+        # hand a job back untouched, the attempt does not count
+        await self.collection.update_one(
+            {"_id": job_id, "lease_owner": worker_id},
+            {
+                "$set": {"status": "queued", "run_at": datetime.utcnow()},
+                "$inc": {"attempts": -1},
+                "$unset": {"lease_until": "", "lease_owner": ""},
+            }
+        )
+
+    async def fail(self, job_id, error: str):
+        await self.collection.update_one(
+            {"_id": job_id},
+            {
+                "$set": {"status": "failed", "last_error": error, "finished_at": datetime.utcnow()},
+                "$unset": {"lease_until": "", "active": ""},
+            }
+        )
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", 1), ("run_at", 1)])
+        await self.collection.create_index([("status", 1), ("lease_until", 1)])
+        await self.collection.create_index("resume_id")
+        await self.collection.create_index([("user_id", 1), ("status", 1)])
+        await self.collection.create_index(
+            "dedup_key",
+            unique=True,
+            partialFilterExpression={"active": True, "dedup_key": {"$exists": True}}
+        )
+
+
+class Database:
+    """
+    Async MongoDB access for the api and the agent.
+    The client is opened by the app lifespan (or a worker) through `connect`,
+    never at import time, and exposes one repository per collection.
+    """
+
+    def __init__(self):
+        self.client: Optional[AsyncMongoClient] = None
+        self.resumes: Optional[ResumeRepository] = None
+        self.users: Optional[UserRepository] = None
+        self.jobs_cache: Optional[JobsCacheRepository] = None
+        self.match_cache: Optional[MatchCacheRepository] = None
+        self.analysis_jobs: Optional[AnalysisJobRepository] = None
+        self.board_state: Optional[BoardStateRepository] = None
+        self.crawl_profiles: Optional[CrawlProfileRepository] = None
+        self.migrations: Optional[MigrationRepository] = None
+        self.checkpoints: Optional[CheckpointRepository] = None
+
+    async def connect(self):
+        if self.client is not None:
+            return
+
+        client = AsyncMongoClient(
+            settings.mongo_uri,
+            maxPoolSize=settings.mongo_max_pool_size,
+            minPoolSize=settings.mongo_min_pool_size,
+            # round trip histograms per command, see /api/metrics
+            event_listeners=[MongoCommandMetrics()],
+        )
+        database = client[settings.mongo_db_name]
+
+        self.resumes = ResumeRepository(database["resumes"])
+        self.users = UserRepository(database["users"])
+        self.jobs_cache = JobsCacheRepository(database["jobs_cache"])
+        self.match_cache = MatchCacheRepository(database["match_cache"])
+        self.analysis_jobs = AnalysisJobRepository(database["analysis_jobs"])
+        self.board_state = BoardStateRepository(database["job_board_state"])
+        self.crawl_profiles = CrawlProfileRepository(database["crawl_profiles"])
+        self.migrations = MigrationRepository(database["migrations"])
+        self.checkpoints = CheckpointRepository(database["graph_checkpoints"], database["graph_writes"])
+        self.client = client
+
+        try:
+            await client.admin.command("ping")
+            await self.resumes.ensure_indexes()
+            await self.analysis_jobs.ensure_indexes()
+            await self.jobs_cache.ensure_indexes()
+            await self.migrations.run_once(
+                "jobs_cache_expiry",
+                lambda: self.jobs_cache.add_expiry(settings.jobs_cache_ttl_seconds)
+            )
+            await self.checkpoints.ensure_indexes(settings.graph_checkpoint_ttl_seconds)
+            print("Connected to MongoDB")
+        except Exception as e:
+            print(f"Could not connect to MongoDB: {e}")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+
+db = Database()
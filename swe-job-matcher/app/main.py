@@ -1,9 +1,53 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.config import settings
-from app.routes import resume, auth, github_jobs
+from app.db import db
+from app.routes import resume, auth, github_jobs, metrics
+from app.agents.crawler import crawler_pool
+from app.agents.fetchers import job_fetcher
+from app.agents.matching import match_cache
+from app.services.job_board import job_board
+from app.services.jwks import jwks_cache
+from app.services.resume_extraction import resume_extractor
+from app.worker import AnalysisWorker
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await db.connect()
+    try:
+        await match_cache.ensure_indexes()
+    except Exception as e:
+        print(f"Could not prepare match cache: {e}")
+
+    # loads the job board snapshot and keeps it fresh in the background
+    await job_board.start()
+    # signing keys are fetched once here instead of on every authenticated request
+    await jwks_cache.start()
+    # pdf parsing runs in worker processes, never on the event loop
+    resume_extractor.start()
+
+    # optional in-process workers for local development
+    worker = None
+    if settings.analysis_embedded_workers > 0:
+        # one browser for the whole process instead of one per scrape
+        await crawler_pool.start()
+        await job_fetcher.start()
+        worker = AnalysisWorker(settings.analysis_embedded_workers)
+        await worker.start()
+
+    yield
+
+    if worker is not None:
+        await worker.stop()
+    resume_extractor.close()
+    await jwks_cache.stop()
+    await job_board.stop()
+    await job_fetcher.close()
+    await crawler_pool.close()
+    await db.close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +60,7 @@ app.add_middleware(
 app.include_router(resume.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(github_jobs.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 @app.get("/api/health")
 def health_check():
@@ -1,32 +1,21 @@
-import urllib.request
-import json
 import jwt
-from jwt.algorithms import RSAAlgorithm
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.config import users_collection, clerk
+from app.config import clerk
+from app.db import db
+from app.services.jwks import jwks_cache
 
 router = APIRouter()
 security = HTTPBearer()
 
-CLERK_JWKS_URL = "https://full-bee-63.clerk.accounts.dev/.well-known/jwks.json"
-
-def get_clerk_public_key(token: str):
+async def get_clerk_public_key(token: str):
     try:
         # Extract the Key ID (kid) from the token header
         header = jwt.get_unverified_header(token)
         kid = header['kid']
 
-        # Fetch valid keys from Clerk
-        with urllib.request.urlopen(CLERK_JWKS_URL) as response:
-            jwks = json.loads(response.read())
-
-        # Find the matching key
-        for key in jwks['keys']:
-            if key['kid'] == kid:
-                return RSAAlgorithm.from_jwk(json.dumps(key))
-        
-        raise Exception("Public key not found")
+        # Keys are cached and pre-parsed, this only hits Clerk on an unknown kid
+        return await jwks_cache.get_key(kid)
     except Exception as e:
         print(f"Key Fetch Error: {e}")
         raise HTTPException(status_code=401, detail="Invalid token signature")
@@ -37,7 +26,7 @@ async def get_user_id(token: HTTPAuthorizationCredentials = Depends(security)):
     """
     try:
         jwt_token = token.credentials
-        public_key = get_clerk_public_key(jwt_token)
+        public_key = await get_clerk_public_key(jwt_token)
 
         # Decode & Verify
         payload = jwt.decode(
@@ -58,13 +47,13 @@ async def get_user_id(token: HTTPAuthorizationCredentials = Depends(security)):
 @router.post("/sync-user")
 async def sync_user(user_id: str = Depends(get_user_id)):
     # Check if user already exists in Mongo DB
-    user = users_collection.find_one({"_id": user_id})
+    user = await db.users.get(user_id)
     if user:
         return {"ok": True, "status": "EXISTS"}
 
     try:
         # Correct syntax for the Python SDK (v4+)
-        user_data = clerk.users.get(user_id=user_id)
+        user_data = await clerk.users.get_async(user_id=user_id)
         
         # Safely get the primary email
         email = ""
@@ -79,7 +68,7 @@ async def sync_user(user_id: str = Depends(get_user_id)):
             "last_name": user_data.last_name,
         }
         
-        users_collection.insert_one(new_user)
+        await db.users.insert(new_user)
         return {"ok": True, "status": "CREATED"}
 
     except Exception as e:
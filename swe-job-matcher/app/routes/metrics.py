@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+@router.get("/metrics")
+def get_metrics():
+    # prometheus text format, scraped from /api/metrics
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
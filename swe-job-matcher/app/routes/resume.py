@@ -1,22 +1,24 @@
-import pdfplumber
-import io
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends, BackgroundTasks
-from app.config import resumes_collection
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.db import db
 from datetime import datetime
 from typing import Dict
 
+from app.config import settings
 from app.routes.auth import get_user_id
-from app.agents.tools import find_and_match_jobs
-from app.agents.graph import app as agent_graph
+from app.agents.match_cache import content_hash
+from app.services.analysis import AnalysisQueueFull, submit_resume
+from app.services.pdf_text import ResumeExtractionError
+from app.services.resume_extraction import file_hash, resume_extractor
 
 router = APIRouter()
 
 @router.get("/resume-status")
 async def get_resume_status(user_id: str = Depends(get_user_id)):
-    resume = resumes_collection.find_one(
-        {"user_id": user_id},
-        sort=[("uploaded_at", -1)] 
-    )
+    resume = await db.resumes.find_latest_for_user(user_id)
 
     if not resume:
         raise HTTPException(status_code=404, detail="No resume found")
@@ -29,85 +31,110 @@ async def get_resume_status(user_id: str = Depends(get_user_id)):
         "uploaded_at": resume.get("uploaded_at")
     }
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def _resume_events(request: Request, resume_id):
+    sent = 0
+    last_status = None
+
+    async with aclosing(db.resumes.watch(
+        resume_id,
+        idle_seconds=settings.resume_stream_idle_seconds,
+        poll_seconds=settings.resume_stream_poll_seconds
+    )) as updates:
+        async for resume in updates:
+            if await request.is_disconnected():
+                break
+
+            if resume is None:
+                # keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            matches = resume.get("matches", [])
+            if len(matches) < sent:
+                # the analysis was retried and started over
+                sent = 0
+                yield _sse("reset", {})
+
+            for match in matches[sent:]:
+                yield _sse("match", match)
+            sent = len(matches)
+
+            resume_status = resume.get("status", "pending")
+            if resume_status != last_status:
+                last_status = resume_status
+                yield _sse("status", {"status": resume_status})
+
+            if resume_status in ("completed", "failed"):
+                yield _sse("done", {"status": resume_status, "error": resume.get("error")})
+                break
+
+@router.get("/resume-stream")
+async def stream_resume(request: Request, user_id: str = Depends(get_user_id)):
+    """
+    Server-sent events for the latest resume: one `match` event per scored job
+    as soon as it is saved, `status` on every status change, then `done`.
+    """
+    resume = await db.resumes.find_latest_for_user(user_id)
+
+    if not resume:
+        raise HTTPException(status_code=404, detail="No resume found")
+
+    return StreamingResponse(
+        _resume_events(request, resume["_id"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/upload-resume")
-async def upload_resume(background_tasks: BackgroundTasks, file: UploadFile = File(...), user_id: str = Depends(get_user_id)) -> Dict:
+async def upload_resume(file: UploadFile = File(...), user_id: str = Depends(get_user_id)) -> Dict:
     # validate file
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pdf files are allowed")
 
+    # one byte over the limit is enough to reject it without reading the rest
+    file_content = await file.read(settings.resume_max_bytes + 1)
+    if len(file_content) > settings.resume_max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"PDF is larger than {settings.resume_max_bytes // 1024} KB")
+
+    digest = file_hash(file_content)
     try:
-        file_content = await file.read()
-        text_content = read_pdf_plumber(file_content)
+        text_content = await resume_extractor.extract(file_content, digest)
+    except ResumeExtractionError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while reading pdf: {str(e)}")
 
+    try:
         resume_data = {
             "user_id": user_id,
             "filename": file.filename,
             "content": text_content,
+            "file_hash": digest,
+            "text_hash": content_hash(text_content),
             "uploaded_at": datetime.utcnow(),
             "content_type": file.content_type,
             "status": "pending", 
             "matches": []
         }
 
-        result = resumes_collection.insert_one(resume_data)
-        resume_id = result.inserted_id
-
-        background_tasks.add_task(process_resume_background, user_id, text_content, resume_id)
+        # queued for an analysis worker (survives api restarts), or linked to an
+        # analysis of the same resume text against the same job board
+        resume_id, deduplicated = await submit_resume(resume_data)
 
         return {
             "message": "Resume uploaded successfully",
-            "id": str(result.inserted_id),
-            "filename": file.filename
+            "id": str(resume_id),
+            "filename": file.filename,
+            "deduplicated": deduplicated
         }
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while reading pdf: {str(e)}")
-
-def read_pdf_plumber(file_bytes):
-    text = ""
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
-
-async def process_resume_background(user_id: str, resume_text: str, resume_id: str):
-    print(f"Starting ai analysis for user {user_id}...")
-    
-    try:
-        resumes_collection.update_one(
-            {"_id": resume_id}, 
-            {"$set": {"status": "processing"}}
+    except AnalysisQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
-
-        initial_state = {"resume_text": resume_text}
-
-        # invoke graph
-        final_state = await agent_graph.ainvoke(initial_state)
-
-        matches = final_state.get("matches", [])
-
-        research_notes = final_state.get("research_notes", {})
-        print(f"Graph Finished. Research collected for: {list(research_notes.keys())}")
-        
-        # Save the actual results to MongoDB
-        resumes_collection.update_one(
-            {"_id": resume_id}, 
-            {
-                "$set": {
-                    "status": "completed", 
-                    "matches": matches,
-                    "research": research_notes,
-                    "completed_at": datetime.utcnow()
-                }
-            }
-        )
-        print(f"AI Agent finished for user {user_id}")
-
     except Exception as e:
-        print(f"ERROR in Background Task: {e}")
-        # Save failure results so frontend stops spinning
-        resumes_collection.update_one(
-            {"_id": resume_id}, 
-            {"$set": {"status": "failed", "error": str(e)}}
-        )
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while saving resume: {str(e)}")
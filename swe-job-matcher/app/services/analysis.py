@@ -0,0 +1,207 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.db import db
+from app.agents.graph import app as agent_graph
+from app.agents.job_profile import JOB_PROFILE_VERSION
+from app.agents.matching import PROMPT_VERSION
+from app.agents.resume_profile import PROFILE_VERSION, stored_profile
+from app.agents.tools import is_failed_match
+from app.services import metrics
+from app.services.job_board import job_board
+
+
+def graph_config(resume_id) -> dict:
+    # one checkpoint thread per resume, so a retried analysis finds the previous run
+    return {
+        "configurable": {"thread_id": str(resume_id)},
+        "max_concurrency": settings.graph_max_concurrency,
+    }
+
+
+class AnalysisQueueFull(Exception):
+    """Too many analyses are waiting, overall or for this user; try again after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+async def _admit(user_id: str):
+    # backpressure: refuse new work instead of letting the queue and llm rate limits absorb a spike
+    if await db.analysis_jobs.count_pending_for_user(user_id) >= settings.analysis_max_pending_per_user:
+        raise AnalysisQueueFull("You already have analyses in progress", settings.analysis_queue_retry_after_seconds)
+    if await db.analysis_jobs.count_waiting() >= settings.analysis_queue_max:
+        raise AnalysisQueueFull("The analysis queue is full", settings.analysis_queue_retry_after_seconds)
+
+
+def analysis_key(text_hash: str, board_version: str) -> str:
+    # everything an analysis result depends on: resume text, board snapshot, prompts and how many jobs are matched
+    parts = [text_hash, board_version, PROMPT_VERSION, PROFILE_VERSION, JOB_PROFILE_VERSION, str(settings.match_top_k)]
+    return hashlib.sha256(":".join(parts).encode()).hexdigest()
+
+
+async def _board_version() -> Optional[str]:
+    try:
+        return (await job_board.get_snapshot()).version
+    except Exception as e:
+        # without a board version the upload is simply analysed on its own
+        print(f"Could not read the job board version, not deduplicating: {e}")
+        return None
+
+
+def _copied_results(source: Dict) -> Dict:
+    return {
+        "status": "completed",
+        "matches": source.get("matches", []),
+        "research": source.get("research", {}),
+        "profile": source.get("profile"),
+        "completed_at": datetime.utcnow(),
+    }
+
+
+async def submit_resume(resume: Dict) -> Tuple[object, bool]:
+    """
+    Stores an uploaded resume and gets it analysed. A resume whose text was
+    already analysed against the same job board snapshot reuses that result:
+    a finished analysis is copied right away, a queued or running one is
+    joined and its updates reach this upload too. Only one analysis per key
+    is ever queued, so a double-click does not start two runs.
+    Returns the resume id and whether an earlier analysis was reused.
+    Raises AnalysisQueueFull when a new analysis would be needed but the
+    queue, or this user's share of it, is full.
+    """
+    board_version = await _board_version()
+    key = analysis_key(resume["text_hash"], board_version) if board_version else None
+
+    if key is not None:
+        finished = await db.resumes.find_completed_analysis(key)
+        if finished:
+            print(f"Resume text already analysed against board {board_version}, reusing {finished['_id']}")
+            resume_id = await db.resumes.insert({
+                **resume, **_copied_results(finished),
+                "analysis_key": key, "board_version": board_version, "deduplicated_from": finished["_id"],
+            })
+            return resume_id, True
+
+    # joining an analysis that is already queued or running costs nothing
+    if key is None or await db.analysis_jobs.find_active(key) is None:
+        await _admit(resume["user_id"])
+
+    resume_id = await db.resumes.insert({**resume, "analysis_key": key, "board_version": board_version})
+
+    # two attempts: the analysis we joined may fail right before we link to it
+    for _ in range(2):
+        try:
+            await db.analysis_jobs.enqueue(resume_id, resume["user_id"], settings.analysis_max_attempts, dedup_key=key)
+            return resume_id, False
+        except DuplicateKeyError:
+            if await _join_running_analysis(resume_id, key):
+                return resume_id, True
+
+    await db.analysis_jobs.enqueue(resume_id, resume["user_id"], settings.analysis_max_attempts)
+    return resume_id, False
+
+
+async def _join_running_analysis(resume_id, key: str) -> bool:
+    job = await db.analysis_jobs.find_active(key)
+    if job is None:
+        # it finished in the meantime
+        finished = await db.resumes.find_completed_analysis(key)
+        if finished:
+            await db.resumes.update(resume_id, {**_copied_results(finished), "deduplicated_from": finished["_id"]})
+            return True
+        return False
+
+    source_id = job["resume_id"]
+    await db.resumes.update(resume_id, {"linked_to": source_id})
+    # catch up on what the analysis saved before we linked, and on a finish that raced with the link
+    source = await db.resumes.get(source_id) or {}
+    if source.get("status") == "completed":
+        await db.resumes.update(resume_id, {**_copied_results(source), "deduplicated_from": source_id})
+    elif source.get("status") == "failed":
+        await db.resumes.update(resume_id, {"linked_to": None})
+        return False
+    else:
+        await db.resumes.update(resume_id, {"status": source.get("status", "pending"), "matches": source.get("matches", [])})
+    print(f"Upload {resume_id} joined the running analysis of {source_id}")
+    return True
+
+
+async def run_analysis(resume_id, user_id: str):
+    """
+    Runs the agent graph for one uploaded resume and stores the results.
+    A run that was interrupted (worker crash, lost lease, error) continues
+    from its last checkpoint instead of starting over.
+    Errors are raised to the worker, which decides between retrying and failing.
+    """
+    print(f"Starting ai analysis for user {user_id}...")
+    # every stage timed inside this run also lands in its breakdown, saved on the resume
+    with metrics.track_run() as run, metrics.span("analysis", resume_id=str(resume_id)):
+        outcome = "error"
+        try:
+            await _run_graph(resume_id, user_id, run)
+            outcome = "ok"
+        finally:
+            metrics.ANALYSIS_SECONDS.observe(run.elapsed(), outcome=outcome)
+
+
+async def _run_graph(resume_id, user_id: str, run: metrics.RunTimings):
+    resume = await db.resumes.get(resume_id)
+    if not resume:
+        raise ValueError(f"Resume {resume_id} not found")
+
+    config = graph_config(resume_id)
+    previous = await agent_graph.aget_state(config)
+
+    final_state = {}
+    if previous.values and not previous.next:
+        # the graph finished but its results were never saved
+        print(f"Analysis {resume_id} already finished, saving its results")
+        final_state = previous.values
+    else:
+        graph_input = None
+        if previous.values:
+            print(f"Resuming analysis {resume_id} before {list(previous.next)}")
+            matches = previous.values.get("matches", [])
+        else:
+            graph_input = {"resume_text": resume["content"], "profile": stored_profile(resume)}
+            matches = []
+        # a retried run starts from what its checkpoint already has
+        await db.resumes.update_analysis(resume_id, {"status": "processing", "matches": matches})
+
+        # stream the graph so every match is saved as soon as it is scored
+        async for mode, chunk in agent_graph.astream(graph_input, config, stream_mode=["custom", "values"]):
+            if mode == "custom" and "match" in chunk:
+                await db.resumes.push_match(resume_id, chunk["match"])
+            elif mode == "custom" and "profile" in chunk:
+                await db.resumes.update_analysis(resume_id, {"profile": chunk["profile"]})
+            elif mode == "values":
+                final_state = chunk
+
+    matches = final_state.get("matches", [])
+
+    research_notes = final_state.get("research_notes", {})
+    print(f"Graph Finished. Research collected for: {list(research_notes.keys())}")
+
+    results = {
+        "status": "completed",
+        "matches": matches,
+        "research": research_notes,
+        "timings": run.to_dict(),
+        "completed_at": datetime.utcnow()
+    }
+    failed = sum(1 for match in matches if is_failed_match(match))
+    if failed:
+        # like error results in the match cache, a partly failed analysis is never reused by later uploads
+        print(f"Analysis {resume_id} has {failed} failed matches, not offering it for reuse")
+        results["analysis_key"] = None
+
+    # Save the actual results to MongoDB
+    await db.resumes.update_analysis(resume_id, results)
+    print(f"Analysis {resume_id} timings: {run.to_dict()['stages']}")
+    # results are saved, the checkpoints are not needed anymore
+    await agent_graph.checkpointer.adelete_thread(str(resume_id))
+    print(f"AI Agent finished for user {user_id}")
@@ -0,0 +1,173 @@
+import asyncio
+from typing import Dict, List, Optional
+from app.config import settings
+from app.db import db
+from app.agents.tools import is_scrape_error, refresh_job_posting, scrape_job_posting
+from app.agents.urls import normalize_job_url
+from app.services.job_board import JobBoardSnapshot
+from app.services.readme_parser import JobRecord
+
+
+class BoardDiff:
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self, added: List[JobRecord], removed: List[str], changed: List[JobRecord]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+
+def diff_rows(previous: Optional[List[List[str]]], jobs) -> BoardDiff:
+    """
+    Compares the stored (key, location) rows of the last ingested snapshot
+    with the jobs of the new one. Keys are company + role + link.
+    """
+    old = {key: location for key, location in previous or []}
+    new_keys = set()
+    added, changed = [], []
+
+    for job in jobs:
+        if job.key in new_keys:
+            continue
+        new_keys.add(job.key)
+        if job.key not in old:
+            added.append(job)
+        elif old[job.key] != job.location:
+            changed.append(job)
+
+    removed = [key for key in old if key not in new_keys]
+    return BoardDiff(added, removed, changed)
+
+
+def _link_of(key: str) -> str:
+    return key.rsplit("|", 1)[-1]
+
+
+class BoardIngestor:
+    """
+    Reacts to every new job board snapshot: crawls newly posted roles into
+    jobs_cache ahead of any user asking for them (bounded concurrency),
+    crawls roles whose row changed again, and marks postings that left the
+    board as closed. The postings still to crawl are stored with the board
+    state, so a worker that dies mid-crawl leaves them to the next one: a
+    background check claims them once the lease has expired.
+    """
+
+    def __init__(self, concurrency: int, initial_limit: int, lease_seconds: int, max_attempts: int):
+        self.concurrency = concurrency
+        self.initial_limit = initial_limit
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._prewarm = set()
+        self._reclaimer: Optional[asyncio.Task] = None
+
+    async def on_snapshot(self, snapshot: JobBoardSnapshot):
+        state = await db.board_state.get()
+        previous_version = state["version"] if state else None
+        if previous_version == snapshot.version:
+            # e.g. a worker starting up after another one died mid pre-warm
+            if not self._prewarm:
+                self._start(await db.board_state.claim_prewarm(self.lease_seconds))
+            return
+
+        diff = diff_rows(state["rows"] if state else None, snapshot.jobs)
+
+        to_crawl = diff.added
+        if state is None:
+            # first run: the board is newest first, only warm the top of it
+            to_crawl = to_crawl[:self.initial_limit]
+
+        # what an earlier pre-warm did not get to is carried over, unless it left the board
+        links = {job.link for job in snapshot.jobs}
+        pending = {entry["link"]: entry for entry in (state or {}).get("prewarm", []) if entry["link"] in links}
+        for job in to_crawl:
+            if job.link != "No link":
+                pending.setdefault(job.link, {"link": job.link, "refresh": False})
+        for job in diff.changed:
+            # an edited row (usually its locations) often means an edited posting
+            if job.link != "No link":
+                pending[job.link] = {"link": job.link, "refresh": True}
+        prewarm = list(pending.values())
+
+        rows = [[job.key, job.location] for job in snapshot.jobs]
+        if not await db.board_state.advance(previous_version, snapshot.version, rows, prewarm, self.lease_seconds):
+            # another worker already ingested this change
+            return
+
+        print(
+            f"Job board {previous_version} -> {snapshot.version}: "
+            f"{len(diff.added)} new, {len(diff.removed)} removed, {len(diff.changed)} changed"
+        )
+
+        removed_links = [normalize_job_url(_link_of(key)) for key in diff.removed if _link_of(key) != "No link"]
+        if removed_links:
+            await db.jobs_cache.set_closed(removed_links, True)
+
+        new_links = [job.link for job in to_crawl if job.link != "No link"]
+        if new_links:
+            # a posting that comes back after being removed is open again
+            await db.jobs_cache.set_closed([normalize_job_url(link) for link in new_links], False)
+
+        self._start(prewarm)
+
+    def _start(self, prewarm: List[Dict]):
+        if not prewarm:
+            return
+        task = asyncio.create_task(self._crawl_all(prewarm))
+        self._prewarm.add(task)
+        task.add_done_callback(self._prewarm.discard)
+
+    async def _crawl_all(self, prewarm: List[Dict]):
+        limiter = asyncio.Semaphore(self.concurrency)
+
+        async def crawl(entry: Dict) -> bool:
+            async with limiter:
+                if entry["refresh"] or entry.get("attempts"):
+                    # a retry crawls again instead of reading the failure that was just cached
+                    crawled = await refresh_job_posting(entry["link"])
+                else:
+                    # scrape_job_posting skips anything already cached
+                    crawled = not is_scrape_error(await scrape_job_posting(entry["link"]))
+
+                if crawled:
+                    await db.board_state.finish_prewarm([entry["link"]], self.lease_seconds)
+                else:
+                    # stays in the list for the next claim, a few times at most
+                    await db.board_state.retry_prewarm(entry["link"], self.max_attempts, self.lease_seconds)
+                return crawled
+
+        results = await asyncio.gather(*(crawl(entry) for entry in prewarm), return_exceptions=True)
+        done = sum(1 for result in results if result is True)
+        print(f"Pre-warmed {done} postings, {len(prewarm) - done} failed and are left for a later claim")
+
+    async def _reclaim(self):
+        # leftovers of a worker that died are picked up once its lease expires, even if the board never changes
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            if self._prewarm:
+                continue
+            try:
+                self._start(await db.board_state.claim_prewarm(self.lease_seconds))
+            except Exception as e:
+                print(f"Could not claim pending pre-warm crawls: {e}")
+
+    def start(self):
+        if self._reclaimer is None:
+            self._reclaimer = asyncio.create_task(self._reclaim())
+
+    async def stop(self):
+        tasks = list(self._prewarm)
+        if self._reclaimer is not None:
+            tasks.append(self._reclaimer)
+            self._reclaimer = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+board_ingestor = BoardIngestor(
+    concurrency=settings.prewarm_concurrency,
+    initial_limit=settings.prewarm_initial_limit,
+    lease_seconds=settings.prewarm_lease_seconds,
+    max_attempts=settings.prewarm_max_attempts,
+)
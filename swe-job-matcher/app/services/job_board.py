@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import httpx
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.readme_parser import JobRecord, iter_jobs
+from app.services.metrics import timed
+
+
+class JobBoardSnapshot:
+    """
+    Parsed, immutable view of the README at one point in time.
+    `version` is a hash of the README body, so it only changes with the content.
+    """
+
+    __slots__ = ("version", "etag", "fetched_at", "jobs")
+
+    def __init__(self, version: str, etag: Optional[str], fetched_at: datetime, jobs: Tuple[JobRecord, ...]):
+        self.version = version
+        self.etag = etag
+        self.fetched_at = fetched_at
+        self.jobs = jobs
+
+
+def parse_jobs(readme: str) -> List[JobRecord]:
+    jobs = list(iter_jobs(readme))
+    if not jobs:
+        raise ValueError("No jobs found in README table")
+    return jobs
+
+
+class JobBoard:
+    """
+    Keeps the latest SimplifyJobs snapshot in memory.
+    The README is fetched with If-None-Match, so an unchanged board costs a 304
+    and no parsing; a background task refreshes it on a fixed interval.
+    """
+
+    def __init__(self, url: str, refresh_seconds: int):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[JobBoardSnapshot] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[JobBoardSnapshot], Awaitable[None]]] = []
+
+    def add_listener(self, listener: Callable[[JobBoardSnapshot], Awaitable[None]]):
+        # called with every new snapshot version, after it is in place
+        self._listeners.append(listener)
+
+    @property
+    def snapshot(self) -> Optional[JobBoardSnapshot]:
+        return self._snapshot
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def refresh(self) -> JobBoardSnapshot:
+        async with self._lock:
+            if self._client is None:
+                self._client = httpx.AsyncClient(timeout=10)
+
+            headers = {}
+            if self._snapshot and self._snapshot.etag:
+                headers["If-None-Match"] = self._snapshot.etag
+
+            with timed("readme_fetch"):
+                r = await self._client.get(self.url, headers=headers)
+            if r.status_code == 304 and self._snapshot:
+                return self._snapshot
+            r.raise_for_status()
+
+            readme = r.text
+            version = hashlib.sha256(readme.encode("utf-8")).hexdigest()[:12]
+            if self._snapshot and self._snapshot.version == version:
+                # same content served without an etag match
+                return self._snapshot
+
+            # parsing a few thousand rows is cpu bound, keep it off the event loop
+            with timed("readme_parse"):
+                jobs = await asyncio.to_thread(parse_jobs, readme)
+            self._snapshot = JobBoardSnapshot(
+                version=version,
+                etag=r.headers.get("ETag"),
+                fetched_at=datetime.utcnow(),
+                jobs=tuple(jobs),
+            )
+            print(f"Job board refreshed: version {version}, {len(jobs)} jobs")
+
+            for listener in self._listeners:
+                asyncio.create_task(self._notify(listener, self._snapshot))
+            return self._snapshot
+
+    async def _notify(self, listener, snapshot: JobBoardSnapshot):
+        try:
+            await listener(snapshot)
+        except Exception as e:
+            print(f"Job board listener failed: {e}")
+
+    async def get_snapshot(self) -> JobBoardSnapshot:
+        if self._snapshot is None:
+            return await self.refresh()
+        return self._snapshot
+
+    async def get_jobs(self, limit: int) -> List[Dict]:
+        snapshot = await self.get_snapshot()
+        return [job.to_dict() for job in snapshot.jobs[:limit]]
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # keep serving the last good snapshot
+                print(f"Job board refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+
+job_board = JobBoard(settings.job_board_url, settings.job_board_refresh_seconds)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import re
+import time
+import httpx
+from jwt.algorithms import RSAAlgorithm
+from typing import Dict, Optional
+from app.config import settings
+from app.services.metrics import timed
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """
+    Pre-parsed signing keys from the Clerk JWKS endpoint, keyed by `kid`.
+    Keys live for the Cache-Control max-age of the response and are refreshed
+    in the background before they expire. An unknown `kid` (key rotation) or
+    expired keys trigger a refetch, at most once per `min_refetch_seconds`.
+    """
+
+    def __init__(self, url: str, default_max_age: int, min_refetch_seconds: int):
+        self.url = url
+        self.default_max_age = default_max_age
+        self.min_refetch_seconds = min_refetch_seconds
+        self._keys: Dict[str, object] = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"JWKS prefetch failed: {e}")
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def refresh(self):
+        async with self._lock:
+            await self._fetch()
+
+    async def _fetch(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=5)
+
+        self._last_fetch = time.monotonic()
+        with timed("jwks_fetch"):
+            r = await self._client.get(self.url)
+        r.raise_for_status()
+
+        keys = {}
+        for key in r.json()["keys"]:
+            if key.get("kty") == "RSA" and "kid" in key:
+                keys[key["kid"]] = RSAAlgorithm.from_jwk(json.dumps(key))
+
+        match = MAX_AGE_PATTERN.search(r.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else self.default_max_age
+
+        self._keys = keys
+        self._expires_at = time.monotonic() + max_age
+
+    async def get_key(self, kid: str):
+        key = self._keys.get(kid)
+        if key is not None and time.monotonic() < self._expires_at:
+            return key
+
+        async with self._lock:
+            # another request may have refreshed while we waited
+            key = self._keys.get(kid)
+            if key is not None and time.monotonic() < self._expires_at:
+                return key
+
+            if time.monotonic() - self._last_fetch >= self.min_refetch_seconds:
+                try:
+                    await self._fetch()
+                except Exception as e:
+                    # fall back to the keys we already have
+                    print(f"JWKS fetch failed: {e}")
+
+            key = self._keys.get(kid)
+            if key is None:
+                raise KeyError(f"Public key {kid} not found")
+            return key
+
+    async def _refresh_loop(self):
+        while True:
+            # refresh shortly before the keys expire
+            delay = max(self._expires_at - time.monotonic() - 30, self.min_refetch_seconds)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # keep the current keys, get_key refetches once they expire
+                print(f"JWKS refresh failed: {e}")
+
+
+jwks_cache = JWKSCache(
+    settings.clerk_jwks_url,
+    default_max_age=settings.jwks_default_max_age_seconds,
+    min_refetch_seconds=settings.jwks_min_refetch_seconds,
+)
@@ -0,0 +1,287 @@
+"""
+In-process metrics in the Prometheus text format, per-run timing breakdowns
+and optional OpenTelemetry spans.
+
+    with timed("readme_parse"):
+        ...
+
+records the duration in the `pipeline_stage_seconds` histogram, adds it to
+the timing breakdown of the analysis run in progress (if any) and opens a
+span when opentelemetry is installed. Keyword arguments become span attributes.
+"""
+import asyncio
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Optional, Tuple
+from pymongo import monitoring
+
+try:
+    from opentelemetry import trace as _otel_trace
+    _tracer = _otel_trace.get_tracer("swe-job-matcher")
+except ImportError:
+    _tracer = None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_label_text(self.labels, key)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((key, (list(series[0]), series[1], series[2])) for key, series in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _label_text(self.labels, key, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{le} {cumulative}"
+            le = _label_text(self.labels, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{le} {count}"
+            yield f"{self.name}_sum{_label_text(self.labels, key)} {total}"
+            yield f"{self.name}_count{_label_text(self.labels, key)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "pipeline_stage_seconds", "Time spent per pipeline stage.", ["stage"]
+)
+CRAWL_SECONDS = registry.histogram(
+    "crawl_seconds", "Time to fetch one job posting, per host and method (api or browser).",
+    ["host", "method", "outcome"]
+)
+CACHE_LOOKUPS = registry.counter(
+    "cache_lookups_total", "Cache lookups by cache and result.", ["cache", "result"]
+)
+LLM_REQUESTS = registry.counter(
+    "llm_requests_total", "LLM requests by kind and outcome.", ["kind", "outcome"]
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "Tokens reported by the OpenAI api.", ["kind", "direction"]
+)
+MONGO_SECONDS = registry.histogram(
+    "mongo_command_seconds", "MongoDB command round trips by command.", ["command", "outcome"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+ANALYSIS_SECONDS = registry.histogram(
+    "analysis_seconds", "End to end duration of resume analyses.", ["outcome"]
+)
+
+
+async def serve(host: str, port: int) -> asyncio.Server:
+    """
+    Minimal http server answering every request with the registry, for
+    processes without an api (`python -m app.worker`).
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            body = registry.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                + f"Content-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+class RunTimings:
+    """Seconds and call counts per stage for one analysis run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.tokens: Dict[str, int] = {"input": 0, "output": 0}
+
+    def add(self, stage: str, seconds: float):
+        entry = self.stages.setdefault(stage, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_dict(self) -> Dict:
+        return {
+            "total_seconds": round(self.elapsed(), 3),
+            # tasks run in parallel, so stage seconds add up to more than the total
+            "stages": {
+                stage: {"count": entry["count"], "seconds": round(entry["seconds"], 3)}
+                for stage, entry in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"])
+            },
+            "tokens": dict(self.tokens),
+        }
+
+
+# the run of the analysis this task belongs to, copied into every task it starts
+_current_run: contextvars.ContextVar[Optional[RunTimings]] = contextvars.ContextVar("current_run", default=None)
+
+
+@contextmanager
+def track_run():
+    run = RunTimings()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def record(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    run = _current_run.get()
+    if run is not None:
+        run.add(stage, seconds)
+
+
+def record_tokens(kind: str, input_tokens: int, output_tokens: int):
+    LLM_TOKENS.inc(input_tokens, kind=kind, direction="input")
+    LLM_TOKENS.inc(output_tokens, kind=kind, direction="output")
+    run = _current_run.get()
+    if run is not None:
+        run.tokens["input"] += input_tokens
+        run.tokens["output"] += output_tokens
+
+
+def span(name: str, **attributes):
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes or None)
+
+
+@contextmanager
+def timed(stage: str, **attributes):
+    start = time.perf_counter()
+    with span(stage, **attributes):
+        try:
+            yield
+        finally:
+            record(stage, time.perf_counter() - start)
+
+
+def timed_async(stage: str):
+    """Decorator form of `timed` for coroutine functions (graph nodes, pipeline steps)."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with timed(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB round trip; writes also count as the `mongo_write` stage."""
+
+    WRITES = {"insert", "update", "delete", "findAndModify", "bulkWrite"}
+
+    def __init__(self):
+        self._started: Dict[Tuple, float] = {}
+
+    def started(self, event):
+        self._started[(event.connection_id, event.request_id)] = time.perf_counter()
+
+    def _finish(self, event, outcome: str):
+        start = self._started.pop((event.connection_id, event.request_id), None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        MONGO_SECONDS.observe(seconds, command=event.command_name, outcome=outcome)
+        if event.command_name in self.WRITES:
+            record("mongo_write", seconds)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
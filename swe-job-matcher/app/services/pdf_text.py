@@ -0,0 +1,105 @@
+"""
+PDF text backends. This module runs inside the extraction process pool, so
+it only imports the pdf libraries and nothing from the app settings.
+"""
+import io
+from typing import Tuple
+
+BACKENDS = ("pypdfium2", "pdfplumber")
+
+# a text layer this thin usually means scanned pages or glyphs pdfium could not map
+MIN_CHARS_PER_PAGE = 40
+MAX_REPLACEMENT_RATIO = 0.05
+
+
+class ResumeExtractionError(ValueError):
+    """The file is not a usable pdf or breaks the extraction limits."""
+
+
+def extract_pypdfium2(data: bytes, max_pages: int) -> Tuple[str, int]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(data)
+    try:
+        page_count = len(pdf)
+        if page_count > max_pages:
+            raise ResumeExtractionError(f"PDF has {page_count} pages, the limit is {max_pages}")
+
+        texts = []
+        for index in range(page_count):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                texts.append(textpage.get_text_bounded())
+            finally:
+                textpage.close()
+                page.close()
+        return "\n".join(text.replace("\r\n", "\n") for text in texts if text), page_count
+    finally:
+        pdf.close()
+
+
+def extract_pdfplumber(data: bytes, max_pages: int) -> Tuple[str, int]:
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        page_count = len(pdf.pages)
+        if page_count > max_pages:
+            raise ResumeExtractionError(f"PDF has {page_count} pages, the limit is {max_pages}")
+
+        texts = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                texts.append(page_text)
+            # drop the parsed layout objects as soon as the page is done
+            page.close()
+        return "\n".join(texts), page_count
+
+
+def _looks_broken(text: str, page_count: int) -> bool:
+    stripped = text.strip()
+    if len(stripped) < MIN_CHARS_PER_PAGE * max(page_count, 1):
+        return True
+    return stripped.count("�") / len(stripped) > MAX_REPLACEMENT_RATIO
+
+
+def extract_text(data: bytes, max_pages: int, max_chars: int, backend: str = "auto") -> Tuple[str, str]:
+    """
+    Returns (text, backend used). `auto` reads the text layer with pypdfium2
+    and only falls back to pdfplumber when that fails or looks broken.
+    """
+    if backend == "pdfplumber":
+        try:
+            text, _ = extract_pdfplumber(data, max_pages)
+        except ResumeExtractionError:
+            raise
+        except Exception as e:
+            raise ResumeExtractionError(f"Could not read pdf: {e}")
+        return text[:max_chars], "pdfplumber"
+
+    try:
+        text, page_count = extract_pypdfium2(data, max_pages)
+    except ResumeExtractionError:
+        raise
+    except Exception as e:
+        if backend == "pypdfium2":
+            raise ResumeExtractionError(f"Could not read pdf: {e}")
+        text, page_count = "", 0
+
+    if backend == "pypdfium2" or (page_count and not _looks_broken(text, page_count)):
+        return text[:max_chars], "pypdfium2"
+
+    try:
+        fallback, _ = extract_pdfplumber(data, max_pages)
+    except ResumeExtractionError:
+        raise
+    except Exception as e:
+        if not text.strip():
+            raise ResumeExtractionError(f"Could not read pdf: {e}")
+        fallback = ""
+
+    # keep whichever backend found more text
+    if len(fallback.strip()) > len(text.strip()):
+        return fallback[:max_chars], "pdfplumber"
+    return text[:max_chars], "pypdfium2"
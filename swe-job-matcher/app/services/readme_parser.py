@@ -0,0 +1,110 @@
+from typing import Dict, Iterable, Iterator, Optional, Union
+from lxml import etree
+
+# how much of the README is handed to the parser at a time
+CHUNK_SIZE = 64 * 1024
+
+
+class JobRecord:
+    __slots__ = ("company", "role", "location", "link")
+
+    def __init__(self, company: str, role: str, location: str, link: str):
+        self.company = company
+        self.role = role
+        self.location = location
+        self.link = link
+
+    @property
+    def key(self) -> str:
+        # stable identity of a posting across README versions
+        return f"{self.company}|{self.role}|{self.link}"
+
+    def to_dict(self) -> Dict:
+        return {
+            "company": self.company,
+            "role": self.role,
+            "location": self.location,
+            "link": self.link,
+        }
+
+
+def _cell_text(cell) -> str:
+    # same result as BeautifulSoup's get_text(strip=True)
+    return "".join(part.strip() for part in cell.itertext())
+
+
+def _chunks(readme: Union[str, Iterable[str]]) -> Iterator[str]:
+    if isinstance(readme, str):
+        for i in range(0, len(readme), CHUNK_SIZE):
+            yield readme[i:i + CHUNK_SIZE]
+    else:
+        yield from readme
+
+
+def iter_jobs(readme: Union[str, Iterable[str]], limit: Optional[int] = None) -> Iterator[JobRecord]:
+    """
+    Streams job rows out of the first table in the README.
+    Rows are yielded as soon as their closing </tr> is parsed and then freed,
+    and parsing stops once `limit` rows have been produced.
+    Sub-listing rows (company cell is "↳") inherit the previous company.
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    produced = 0
+    table_depth = 0
+    in_body = False
+    last_company = ""
+
+    for chunk in _chunks(readme):
+        parser.feed(chunk)
+
+        for event, element in parser.read_events():
+            tag = element.tag
+
+            if tag == "table":
+                if event == "start":
+                    table_depth += 1
+                else:
+                    table_depth -= 1
+                    if table_depth == 0:
+                        # only the first table holds the listings we care about
+                        return
+                continue
+
+            if table_depth != 1:
+                continue
+
+            if tag == "tbody":
+                in_body = event == "start"
+                continue
+
+            if not in_body or tag != "tr" or event != "end":
+                continue
+
+            cells = element.findall("td")
+            if len(cells) >= 4:
+                raw_company = _cell_text(cells[0])
+                company = last_company if "↳" in raw_company else raw_company
+
+                if company:
+                    last_company = company
+                    link_tag = cells[3].find(".//a")
+                    link = link_tag.get("href") if link_tag is not None else None
+
+                    yield JobRecord(
+                        company,
+                        _cell_text(cells[1]),
+                        _cell_text(cells[2]),
+                        link or "No link",
+                    )
+                    produced += 1
+                    if limit is not None and produced >= limit:
+                        return
+
+            # drop parsed rows so memory stays flat across thousands of rows. the row itself
+            # stays attached, libxml2 may still append to it and freeing it corrupts the heap
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set
+from app.config import settings
+from app.db import db
+from app.agents.match_cache import LRUCache
+from app.services.pdf_text import ResumeExtractionError, extract_text
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeExtractor:
+    """
+    Turns uploaded resume pdfs into text without blocking the event loop.
+    Parsing runs in a small process pool with page, size and time limits.
+    A pdf that runs over the time limit retires its pool: new uploads go to a
+    fresh one and the old pool is killed once its other parses are done.
+    Text is cached by file hash, in memory and through the resumes collection,
+    so uploading the same file again skips parsing.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._memory = LRUCache(maxsize=256, ttl_seconds=60 * 60)
+        # parses still expected to finish, per pool
+        self._live: Dict[ProcessPoolExecutor, Set[asyncio.Future]] = {}
+        self._retiring: Set[ProcessPoolExecutor] = set()
+
+    def start(self):
+        if self._pool is None:
+            # spawned workers do not inherit the api's event loop, threads or sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=100,
+            )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        for pool in list(self._retiring):
+            self._kill_pool(pool)
+        self._live.clear()
+
+    def _kill_pool(self, pool: ProcessPoolExecutor):
+        # a running task cannot be cancelled, only its process can be stopped
+        self._retiring.discard(pool)
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _retire(self, pool: ProcessPoolExecutor):
+        if self._pool is pool:
+            self._pool = None
+        self._retiring.add(pool)
+
+    async def _parse(self, data: bytes) -> str:
+        self.start()
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            pool, extract_text, data,
+            settings.resume_max_pages, settings.resume_max_chars, settings.resume_pdf_backend
+        )
+        live = self._live.setdefault(pool, set())
+        live.add(future)
+        try:
+            text, backend = await asyncio.wait_for(future, timeout=settings.resume_extract_timeout_seconds)
+        except asyncio.TimeoutError:
+            # the other uploads on this pool are left to finish, killing it now would break them too
+            self._retire(pool)
+            raise ResumeExtractionError(
+                f"PDF took longer than {settings.resume_extract_timeout_seconds}s to read"
+            )
+        except BrokenProcessPool:
+            # a crashed worker, the next call starts a new pool
+            if self._pool is pool:
+                self._pool = None
+            raise
+        finally:
+            live.discard(future)
+            if not live and pool is not self._pool:
+                self._live.pop(pool, None)
+                if pool in self._retiring:
+                    self._kill_pool(pool)
+        print(f"Extracted {len(text)} characters with {backend}")
+        return text
+
+    async def extract(self, data: bytes, digest: Optional[str] = None) -> str:
+        if len(data) > settings.resume_max_bytes:
+            raise ResumeExtractionError(f"PDF is larger than {settings.resume_max_bytes // 1024} KB")
+
+        digest = digest or file_hash(data)
+        text = self._memory.get(digest)
+        if text is not None:
+            return text
+
+        try:
+            previous = await db.resumes.find_by_file_hash(digest)
+        except Exception as e:
+            print(f"Could not look up resume text by hash: {e}")
+            previous = None
+        if previous and previous.get("content"):
+            print("CACHE HIT (RESUME): Reusing extracted text.")
+            self._memory.set(digest, previous["content"])
+            return previous["content"]
+
+        try:
+            text = await self._parse(data)
+        except BrokenProcessPool:
+            text = await self._parse(data)
+
+        if not text.strip():
+            raise ResumeExtractionError("No text found in PDF, scanned resumes are not supported")
+
+        self._memory.set(digest, text)
+        return text
+
+
+resume_extractor = ResumeExtractor(workers=settings.resume_extract_workers)
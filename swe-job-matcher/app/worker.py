@@ -0,0 +1,163 @@
+"""
+Resume analysis worker.
+
+    python -m app.worker
+
+Claims queued analyses from MongoDB, runs the agent graph and keeps the job
+lease alive while it runs. Any number of workers can run next to the api.
+"""
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from app.config import settings
+from app.db import db
+from app.agents.crawler import crawler_pool
+from app.agents.fetchers import job_fetcher
+from app.services.job_board import job_board
+from app.services.analysis import run_analysis
+from app.services.ingestion import board_ingestor
+from app.services import metrics
+
+
+class AnalysisWorker:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks = []
+
+    async def start(self):
+        for slot in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._loop(slot)))
+        print(f"Analysis worker {self.worker_id} started with {self.concurrency} slots")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, slot: int):
+        while True:
+            try:
+                job = await db.analysis_jobs.claim(
+                    self.worker_id,
+                    settings.analysis_lease_seconds,
+                    settings.analysis_max_running_per_user
+                )
+            except Exception as e:
+                print(f"Worker slot {slot} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(settings.analysis_poll_seconds)
+                continue
+
+            try:
+                await self._run_job(job)
+            except Exception as e:
+                # e.g. mongo unreachable while recording the outcome, the lease expires and the job is claimed again
+                print(f"Worker slot {slot} could not finish analysis {job['_id']}: {e}")
+
+    async def _run_job(self, job):
+        job_id = job["_id"]
+
+        # a job that keeps losing its lease (e.g. it crashes the worker) is not retried forever
+        if job["attempts"] > job["max_attempts"]:
+            await self._give_up(job, job.get("last_error") or "Exceeded retry attempts")
+            return
+
+        lease_lost = asyncio.Event()
+        run = asyncio.create_task(run_analysis(job["resume_id"], job["user_id"]))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, run, lease_lost))
+
+        try:
+            await run
+
+        except asyncio.CancelledError:
+            if lease_lost.is_set():
+                print(f"Lost lease on analysis {job_id}, another worker owns it now")
+                return
+            # shutting down, hand the job back so it does not wait for the lease to expire
+            await asyncio.shield(db.analysis_jobs.release(job_id, self.worker_id))
+            raise
+
+        except Exception as e:
+            await self._handle_failure(job, e)
+
+        else:
+            await db.analysis_jobs.complete(job_id, self.worker_id)
+
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id, run: asyncio.Task, lease_lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(settings.analysis_heartbeat_seconds)
+            try:
+                still_owner = await db.analysis_jobs.heartbeat(job_id, self.worker_id, settings.analysis_lease_seconds)
+            except Exception as e:
+                # the lease is long enough to survive a missed heartbeat
+                print(f"Heartbeat failed for analysis {job_id}: {e}")
+                continue
+
+            if not still_owner:
+                lease_lost.set()
+                run.cancel()
+                return
+
+    async def _handle_failure(self, job, error: Exception):
+        print(f"ERROR in analysis {job['_id']} (attempt {job['attempts']}): {error}")
+
+        if job["attempts"] >= job["max_attempts"]:
+            await self._give_up(job, str(error))
+            return
+
+        delay = settings.analysis_retry_base_seconds * 2 ** (job["attempts"] - 1)
+        await db.analysis_jobs.retry(job["_id"], self.worker_id, delay, str(error))
+        await db.resumes.update_analysis(job["resume_id"], {"status": "pending"})
+
+    async def _give_up(self, job, error: str):
+        await db.analysis_jobs.fail(job["_id"], error)
+        # Save failure results so frontend stops spinning
+        await db.resumes.update_analysis(job["resume_id"], {"status": "failed", "error": error})
+
+
+async def main():
+    await db.connect()
+    await crawler_pool.start()
+    await job_fetcher.start()
+    if settings.prewarm_enabled:
+        job_board.add_listener(board_ingestor.on_snapshot)
+        board_ingestor.start()
+    await job_board.start()
+
+    worker = AnalysisWorker(settings.analysis_worker_concurrency)
+    await worker.start()
+
+    metrics_server = None
+    if settings.worker_metrics_port:
+        metrics_server = await metrics.serve("0.0.0.0", settings.worker_metrics_port)
+        print(f"Worker metrics on port {settings.worker_metrics_port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+    print("Shutting down analysis worker...")
+
+    await worker.stop()
+    if metrics_server is not None:
+        metrics_server.close()
+    await board_ingestor.stop()
+    await job_board.stop()
+    await job_fetcher.close()
+    await crawler_pool.close()
+    await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
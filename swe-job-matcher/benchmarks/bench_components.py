@@ -0,0 +1,110 @@
+"""
+Microbenchmarks for the per-request building blocks of an analysis, on fixtures.
+
+    python -m benchmarks.bench_components
+    python -m benchmarks.bench_components --rows 5000 --postings 500
+
+- get_github_jobs: cold (README fetch and parse from a local server), a 304
+  revalidation, and a read from the in-memory snapshot.
+- _clean_job_description and compaction on crawled-looking posting pages.
+- resume pdf text extraction (what read_pdf_plumber used to do) with both
+  backends in this process; bench_resume_extraction compares them in depth.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from benchmarks.fixtures import COMPANIES, ROLES, build_posting_markdown, load_resumes
+from benchmarks.stubs import JobBoardServer, serve
+
+# settings the app requires but these benchmarks never use
+for name in ("OPENAI_API_KEY", "MONGO_URI", "MONGO_DB_NAME", "CLERK_SECRET_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(name, "bench")
+
+from app.agents import tools
+from app.agents.compaction import compact_fields
+from app.config import settings
+from app.services.job_board import JobBoard
+from app.services.pdf_text import extract_text
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+async def measure_async(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def row(name: str, median: float, unit: str = "call"):
+    print(f"{name:<36} {median * 1000:>10.3f} ms/{unit}")
+
+
+async def bench_job_board(rows: int, repeat: int):
+    board_server = JobBoardServer(rows=rows)
+    async with serve(board_server.app()) as url:
+        board_server.build(url)
+
+        async def cold():
+            board = JobBoard(f"{url}/README.md", refresh_seconds=3600)
+            await board.get_jobs(limit=40)
+            await board.stop()
+
+        board = JobBoard(f"{url}/README.md", refresh_seconds=3600)
+        await board.refresh()
+        # get_github_jobs reads the shared board
+        tools.job_board._snapshot = board.snapshot
+
+        row(f"get_github_jobs cold ({rows} rows)", await measure_async(cold, repeat))
+        row("get_github_jobs 304 revalidation", await measure_async(board.refresh, repeat))
+        row("get_github_jobs from snapshot", await measure_async(lambda: tools.get_github_jobs(limit=40), repeat * 20))
+        await board.stop()
+
+
+def bench_cleaning(count: int, repeat: int):
+    pages = [
+        build_posting_markdown(COMPANIES[i % len(COMPANIES)], ROLES[i % len(ROLES)], seed=i)
+        for i in range(count)
+    ]
+    cleaned = [tools._clean_job_description(page) for page in pages]
+    size = sum(len(page) for page in pages) / count
+    print(f"\n{count} posting pages, {size / 1024:.1f} KiB each on average")
+
+    row("_clean_job_description", measure(lambda: [tools._clean_job_description(p) for p in pages], repeat) / count, "page")
+    budget = settings.job_description_token_budget
+    row(f"compact_fields ({budget} tokens)", measure(lambda: [compact_fields(c, budget) for c in cleaned], repeat) / count, "page")
+
+
+def bench_pdf(repeat: int):
+    resumes = load_resumes()
+    print(f"\n{len(resumes)} generated resumes")
+    for backend in ("pdfplumber", "pypdfium2"):
+        median = measure(lambda: [extract_text(data, 10, 100_000, backend) for _, data in resumes], repeat)
+        row(f"extract_text {backend}", median / len(resumes), "pdf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the generated README")
+    parser.add_argument("--postings", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(bench_job_board(args.rows, args.repeat))
+    bench_cleaning(args.postings, args.repeat)
+    bench_pdf(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+End to end load test: concurrent resume uploads through the FastAPI app,
+analysed by in-process workers, with every outside service replaced by a
+local stand-in (see benchmarks/stubs.py).
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --uploads 40 --concurrency 10 --llm-latency 1.0
+    python -m benchmarks.bench_pipeline --mongo-uri mongodb://localhost:27017 --workers 4
+
+Each simulated user uploads a generated resume, then polls /api/resume-status
+until the analysis completes. Reports upload and end to end latency
+percentiles, throughput, llm calls and crawls per analysis, and the average
+per-stage timings the analyses saved on their resumes.
+
+Needs a MongoDB it may write to. The benchmark database is dropped before
+and after the run.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, List
+import httpx
+from pymongo import AsyncMongoClient
+from benchmarks.fixtures import build_resume_pdf
+from benchmarks.stubs import FakeLLM, JobBoardServer, JWKSIssuer, serve
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def configure(args, llm_url: str, board_url: str, jwks_url: str):
+    # settings are read when `app` is first imported, so this runs before that
+    os.environ.update({
+        "MONGO_URI": args.mongo_uri,
+        "MONGO_DB_NAME": args.db,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{llm_url}/v1",
+        "CLERK_SECRET_KEY": "bench",
+        "TAVILY_API_KEY": "bench",
+        "JOB_BOARD_URL": f"{board_url}/README.md",
+        "CLERK_JWKS_URL": f"{jwks_url}/.well-known/jwks.json",
+        # the benchmark runs its own workers, and company research would call the real tavily
+        "ANALYSIS_EMBEDDED_WORKERS": "0",
+        "ANALYSIS_POLL_SECONDS": "0.1",
+        "RESEARCH_ENABLED": "false",
+        "MATCH_TOP_K": str(args.top_k),
+    })
+
+
+async def simulate_user(client: httpx.AsyncClient, issuer: JWKSIssuer, index: int, poll: float) -> Dict:
+    user_id = f"bench-user-{index}"
+    headers = {"Authorization": f"Bearer {issuer.token(user_id)}"}
+    pdf = build_resume_pdf(pages=1 + index % 2, seed=index)
+
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/upload-resume",
+        files={"file": (f"resume-{index}.pdf", pdf, "application/pdf")},
+        headers=headers,
+    )
+    uploaded = time.perf_counter()
+    if response.status_code != 200:
+        return {"status": f"upload {response.status_code}", "upload": uploaded - start, "total": None, "matches": 0}
+
+    while True:
+        await asyncio.sleep(poll)
+        status = (await client.get("/api/resume-status", headers=headers)).json()
+        if status.get("status") in ("completed", "failed"):
+            break
+
+    return {
+        "status": status["status"],
+        "upload": uploaded - start,
+        "total": time.perf_counter() - start,
+        "matches": len(status.get("matches", [])),
+    }
+
+
+async def stage_averages(collection, count: int) -> List[tuple]:
+    totals: Dict[str, float] = {}
+    async for resume in collection.find({"timings": {"$exists": True}}, projection=["timings"]):
+        for stage, entry in resume["timings"]["stages"].items():
+            totals[stage] = totals.get(stage, 0.0) + entry["seconds"]
+    return sorted(((stage, seconds / max(count, 1)) for stage, seconds in totals.items()), key=lambda item: -item[1])
+
+
+async def run(args):
+    llm = FakeLLM(latency=args.llm_latency, jitter=args.llm_jitter)
+    board = JobBoardServer(rows=args.rows, latency=args.crawl_latency)
+    issuer = JWKSIssuer()
+
+    async with AsyncExitStack() as stack:
+        llm_url = await stack.enter_async_context(serve(llm.app()))
+        board_url = await stack.enter_async_context(serve(board.app()))
+        jwks_url = await stack.enter_async_context(serve(issuer.app()))
+        board.build(board_url)
+        configure(args, llm_url, board_url, jwks_url)
+
+        from app.main import app as api
+        from app.agents.fetchers import job_fetcher
+        from app.worker import AnalysisWorker
+
+        mongo = AsyncMongoClient(args.mongo_uri)
+        await mongo.drop_database(args.db)
+
+        async with api.router.lifespan_context(api):
+            job_fetcher.register(board.fetcher())
+            worker = AnalysisWorker(args.workers)
+            await worker.start()
+
+            limiter = asyncio.Semaphore(args.concurrency)
+            transport = httpx.ASGITransport(app=api)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+                async def one(index: int):
+                    async with limiter:
+                        return await simulate_user(client, issuer, index, args.poll)
+
+                started = time.perf_counter()
+                results = await asyncio.gather(*(one(i) for i in range(args.uploads)))
+                wall = time.perf_counter() - started
+
+            await worker.stop()
+            stages = await stage_averages(mongo[args.db]["resumes"], args.uploads)
+
+        if not args.keep:
+            await mongo.drop_database(args.db)
+        await mongo.close()
+
+    completed = [r for r in results if r["status"] == "completed"]
+    failed = len(results) - len(completed)
+    uploads = percentiles([r["upload"] for r in results])
+    totals = percentiles([r["total"] for r in completed])
+    scored = sum(r["matches"] for r in completed)
+    per_analysis = max(len(completed), 1)
+
+    print(f"{args.uploads} uploads, {args.concurrency} concurrent users, {args.workers} worker slots, "
+          f"llm latency {args.llm_latency}s, README rows {args.rows}\n")
+    print(f"{'latency':<18} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}")
+    print(f"{'upload':<18} {uploads['p50']:>8.3f} {uploads['p95']:>8.3f} {uploads['p99']:>8.3f}")
+    print(f"{'upload -> done':<18} {totals['p50']:>8.3f} {totals['p95']:>8.3f} {totals['p99']:>8.3f}\n")
+    print(f"completed {len(completed)}, failed {failed}, wall {wall:.1f}s")
+    print(f"analyses/s {len(completed) / wall:.2f}, scored jobs/s {scored / wall:.2f}")
+    print(f"llm calls/analysis {llm.calls / per_analysis:.2f}, "
+          f"tokens/analysis {(llm.prompt_tokens + llm.completion_tokens) / per_analysis:.0f}")
+    print(f"crawls/analysis {board.crawls / per_analysis:.2f}, README fetches {board.readme_requests}, "
+          f"JWKS fetches {issuer.requests}\n")
+
+    if stages:
+        print(f"{'stage (mean per analysis)':<28} {'seconds':>8}")
+        for stage, seconds in stages:
+            print(f"{stage:<28} {seconds:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="swe_job_matcher_bench", help="dropped before and after the run")
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5, help="users uploading and polling at once")
+    parser.add_argument("--workers", type=int, default=2, help="analysis worker slots")
+    parser.add_argument("--top-k", type=int, default=6, help="jobs matched per analysis")
+    parser.add_argument("--rows", type=int, default=500, help="rows in the generated README")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--crawl-latency", type=float, default=0.05)
+    parser.add_argument("--poll", type=float, default=0.25, help="seconds between status polls")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares the streaming README parser against the old full BeautifulSoup parse.
+
+    python -m benchmarks.bench_readme_parser
+    python -m benchmarks.bench_readme_parser --readme path/to/saved/README.md
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from app.services.readme_parser import iter_jobs
+from benchmarks.fixtures import load_readme
+
+
+def bs4_parse(readme: str, limit: int):
+    # the previous get_github_jobs path: whole document tree, then iterate rows
+    soup = BeautifulSoup(readme, "html.parser")
+    rows = soup.find("table").find("tbody").find_all("tr")
+    jobs = []
+    for row in rows:
+        if len(jobs) >= limit:
+            break
+        cells = row.find_all("td")
+        if len(cells) < 4:
+            continue
+        raw_company = cells[0].get_text(strip=True)
+        if "↳" in raw_company or not raw_company:
+            continue
+        link_tag = cells[3].find("a")
+        jobs.append({
+            "company": raw_company,
+            "role": cells[1].get_text(strip=True),
+            "location": cells[2].get_text(strip=True),
+            "link": link_tag["href"] if link_tag else "No link",
+        })
+    return jobs
+
+
+def streaming_parse(readme: str, limit: int):
+    return [job.to_dict() for job in iter_jobs(readme, limit=limit)]
+
+
+def measure(fn, readme: str, limit: int, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(readme, limit)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    rows = len(fn(readme, limit))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return rows, statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readme", help="saved README.md, defaults to a generated fixture")
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the generated fixture")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    readme = load_readme(args.readme, rows=args.rows)
+    print(f"README: {len(readme) / 1024:.0f} KiB\n")
+    print(f"{'parser':<12} {'limit':>6} {'rows':>6} {'median ms':>10} {'peak KiB':>10}")
+
+    for limit in (3, 40, 10 ** 9):
+        for name, fn in (("bs4", bs4_parse), ("streaming", streaming_parse)):
+            rows, median, peak = measure(fn, readme, limit, args.repeat)
+            label = "all" if limit == 10 ** 9 else str(limit)
+            print(f"{name:<12} {label:>6} {rows:>6} {median * 1000:>10.2f} {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
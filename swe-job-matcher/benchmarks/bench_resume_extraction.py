@@ -0,0 +1,72 @@
+"""
+Compares the resume pdf text backends on latency and memory.
+
+    python -m benchmarks.bench_resume_extraction
+    python -m benchmarks.bench_resume_extraction --resumes path/to/pdfs/
+
+Each backend runs in its own fresh process, so the peak RSS column
+includes what pdfium and pdfminer allocate outside the Python heap.
+"""
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+from app.services.pdf_text import extract_text
+from benchmarks.fixtures import load_resumes
+
+MAX_PAGES = 10
+MAX_CHARS = 100_000
+
+
+def _run_backend(backend: str, resumes, repeat: int, results):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    chars = 0
+    used = {}
+    for _ in range(repeat):
+        for _, data in resumes:
+            start = time.perf_counter()
+            text, chosen = extract_text(data, MAX_PAGES, MAX_CHARS, backend)
+            timings.append(time.perf_counter() - start)
+            chars += len(text)
+            used[chosen] = used.get(chosen, 0) + 1
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((timings, chars // repeat, rss_after - rss_before, used))
+
+
+def measure(backend: str, resumes, repeat: int):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_backend, args=(backend, resumes, repeat, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", help="directory of pdfs, defaults to generated resumes")
+    parser.add_argument("--count", type=int, default=12, help="generated resumes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    resumes = load_resumes(args.resumes, count=args.count)
+    total_kib = sum(len(data) for _, data in resumes) / 1024
+    print(f"{len(resumes)} resumes, {total_kib:.0f} KiB\n")
+    print(f"{'backend':<12} {'median ms':>10} {'p95 ms':>8} {'chars':>8} {'RSS +KiB':>9}  used")
+
+    for backend in ("pdfplumber", "pypdfium2", "auto"):
+        timings, chars, rss_growth, used = measure(backend, resumes, args.repeat)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        used_label = ", ".join(f"{name}={count}" for name, count in sorted(used.items()))
+        print(
+            f"{backend:<12} {statistics.median(timings) * 1000:>10.2f} {p95 * 1000:>8.2f} "
+            f"{chars:>8} {rss_growth:>9}  {used_label}"
+        )
+
+
+if __name__ == "__main__":
+    main()
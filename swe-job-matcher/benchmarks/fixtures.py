@@ -0,0 +1,274 @@
+"""
+Deterministic stand-ins for the data the pipeline reads, so benchmarks run offline.
+Saved real copies can be passed to each benchmark instead.
+"""
+import html
+import random
+import re
+from pathlib import Path
+
+COMPANIES = [
+    "Stripe", "Datadog", "Ramp", "Figma", "Robinhood", "Cloudflare", "Palantir",
+    "Snowflake", "Databricks", "Notion", "Plaid", "Brex", "Airtable", "Discord",
+    "Roblox", "Scale AI", "Anduril", "Rippling", "Vercel", "Retool",
+]
+ROLES = [
+    "Software Engineer Intern", "Backend Engineering Intern", "Frontend Engineer Intern",
+    "Machine Learning Intern", "Infrastructure Engineer Intern", "Data Engineering Intern",
+]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Seattle, WA", "Austin, TX", "Remote in USA"]
+ATS_LINKS = [
+    "https://boards.greenhouse.io/{slug}/jobs/{id}?gh_jid={id}&utm_source=Simplify&ref=Simplify",
+    "https://jobs.lever.co/{slug}/{id}?utm_source=Simplify&ref=Simplify",
+    "https://jobs.ashbyhq.com/{slug}/{id}?utm_source=Simplify&ref=Simplify",
+    "https://{slug}.wd5.myworkdayjobs.com/en-US/careers/job/{id}?utm_source=Simplify&ref=Simplify",
+]
+
+README_HEADER = """# Summer 2026 Tech Internships by Pitt CSC & Simplify
+
+Use this repo to share and keep track of software, tech, CS, PM, quant internships for **Summer 2026**.
+
+[![Simplify](https://github.com/SimplifyJobs/Summer2026-Internships/blob/dev/.github/simplify.png)](https://simplify.jobs)
+
+## Software Engineering Internship Roles
+
+[Back to top](#summer-2026-tech-internships-by-pitt-csc--simplify)
+
+<table>
+<thead>
+<tr>
+<th>Company</th>
+<th>Role</th>
+<th>Location</th>
+<th>Application</th>
+<th>Age</th>
+</tr>
+</thead>
+<tbody>
+"""
+
+README_FOOTER = """</tbody>
+</table>
+
+## Product Management Internship Roles
+
+<table>
+<thead><tr><th>Company</th><th>Role</th><th>Location</th><th>Application</th><th>Age</th></tr></thead>
+<tbody>
+<tr><td>Other</td><td>APM Intern</td><td>NYC</td><td><a href="https://example.com">Apply</a></td><td>1d</td></tr>
+</tbody>
+</table>
+"""
+
+
+def _slug(company: str) -> str:
+    return company.lower().replace(" ", "")
+
+
+def job_link(rng: random.Random, company: str, links=ATS_LINKS) -> str:
+    template = rng.choice(links)
+    return template.format(slug=_slug(company), id=rng.randint(1000000, 9999999))
+
+
+def build_readme(rows: int = 2000, seed: int = 7, links=ATS_LINKS) -> str:
+    """
+    Builds a README in the SimplifyJobs layout, with a sub-listing ("↳") row
+    roughly every fourth row and multi-location <details> cells.
+    `links` are the application url templates, e.g. a local posting server.
+    """
+    rng = random.Random(seed)
+    parts = [README_HEADER]
+
+    for i in range(rows):
+        company = rng.choice(COMPANIES)
+        if i and rng.random() < 0.25:
+            company_cell = "↳"
+        else:
+            company_cell = (
+                f'<strong><a href="https://simplify.jobs/c/{_slug(company)}?utm_source=GHList">'
+                f"{company}</a></strong>"
+            )
+
+        if rng.random() < 0.2:
+            locations = rng.sample(LOCATIONS, 3)
+            location_cell = (
+                f"<details><summary><strong>{len(locations)} locations</strong></summary>"
+                + "<br>".join(locations) + "</details>"
+            )
+        else:
+            location_cell = rng.choice(LOCATIONS)
+
+        link = job_link(rng, company, links)
+        parts.append(
+            "<tr>\n"
+            f"<td>{company_cell}</td>\n"
+            f"<td>{rng.choice(ROLES)}</td>\n"
+            f"<td>{location_cell}</td>\n"
+            '<td><div align="center">'
+            f'<a href="{link}"><img src="https://i.imgur.com/fbjwDvo.png" width="118" alt="Apply"></a> '
+            f'<a href="https://simplify.jobs/p/{rng.getrandbits(64):x}?utm_source=GHList">'
+            '<img src="https://i.imgur.com/aVnQdox.png" width="30" alt="Simplify"></a>'
+            "</div></td>\n"
+            f"<td>{rng.randint(0, 60)}d</td>\n"
+            "</tr>\n"
+        )
+
+    parts.append(README_FOOTER)
+    return "".join(parts)
+
+
+def load_readme(path: str = None, rows: int = 2000) -> str:
+    if path:
+        return Path(path).read_text(encoding="utf-8")
+    return build_readme(rows=rows)
+
+
+PAGE_NOISE = [
+    "Skip to main content\n",
+    "Sign In | Create Account\n",
+    "Apply locations: San Francisco, CA; New York, NY\n",
+    "Follow Us on LinkedIn, X and Instagram\n",
+    "© 2026 {company}, Inc. All rights reserved.\n",
+]
+REQUIREMENTS = [
+    "Currently pursuing a BS or MS in Computer Science or a related field",
+    "Experience with {skill} through coursework, internships or personal projects",
+    "Familiarity with {skill} and {other} in production environments",
+    "{years}+ years of professional software engineering experience",
+    "Strong fundamentals in data structures, algorithms and system design",
+]
+RESPONSIBILITIES = [
+    "Ship features end to end with a mentor on the {team} team",
+    "Write well tested {skill} code that runs in production",
+    "Improve the reliability and latency of {team} services",
+    "Collaborate with designers and product managers on {team} roadmap items",
+]
+TEAMS = ["Payments", "Infrastructure", "Growth", "Data Platform", "Developer Experience", "Search"]
+
+
+def build_posting(company: str, role: str, seed: int = 7) -> dict:
+    """
+    A posting in the Greenhouse job board api shape (html escaped `content`),
+    with the usual about / responsibilities / requirements / benefits sections.
+    """
+    rng = random.Random(seed)
+    team = rng.choice(TEAMS)
+
+    def fill(template: str) -> str:
+        skill, other = rng.sample(SKILLS, 2)
+        return template.format(skill=skill, other=other, team=team, years=rng.randint(1, 5))
+
+    about = " ".join(
+        f"{company} builds software used by {rng.randint(2, 900)} thousand teams." for _ in range(rng.randint(3, 6))
+    )
+    sections = [
+        f"<h2>About {company}</h2><p>{about}</p>",
+        "<h2>What you'll do</h2><ul>" + "".join(f"<li>{fill(t)}</li>" for t in rng.sample(RESPONSIBILITIES, 3)) + "</ul>",
+        "<h2>What we're looking for</h2><ul>" + "".join(f"<li>{fill(t)}</li>" for t in rng.sample(REQUIREMENTS, 3)) + "</ul>",
+        f"<h2>Benefits</h2><p>Pay range ${rng.randint(35, 60)}-${rng.randint(61, 80)} per hour, housing stipend, "
+        "401(k) matching and a commuter allowance.</p>",
+    ]
+    return {
+        "title": role,
+        "location": {"name": rng.choice(LOCATIONS)},
+        "content": html.escape("".join(sections)),
+    }
+
+
+def build_posting_markdown(company: str, role: str, seed: int = 7) -> str:
+    """A posting page as the crawler returns it: navigation and footer noise around the text."""
+    rng = random.Random(seed)
+    posting = build_posting(company, role, seed)
+    body = re.sub(r"<h2>(.*?)</h2>", r"\n## \1\n", html.unescape(posting["content"]))
+    body = re.sub(r"<li>(.*?)</li>", r"* \1\n", body)
+    body = re.sub(r"<[^>]+>", "\n", body)
+    noise = [line.format(company=company) for line in PAGE_NOISE]
+    return "".join(noise[:2]) + f"# {role}\n{posting['location']['name']}\n" + body + "".join(rng.sample(noise[2:], 3))
+
+
+SKILLS = [
+    "Python", "TypeScript", "React", "Next.js", "FastAPI", "PostgreSQL", "MongoDB", "Docker",
+    "Kubernetes", "AWS", "Go", "Redis", "PyTorch", "GraphQL", "Tailwind", "Supabase", "Git",
+]
+BULLETS = [
+    "Built a {skill} service handling {n}k requests per day with p99 latency under 80 ms",
+    "Migrated the {skill} pipeline to async workers, cutting processing time by {n}%",
+    "Designed the {skill} schema and indexes for a dashboard used by {n} internal teams",
+    "Led a team of {n} students building a {skill} app for campus event discovery",
+    "Wrote integration tests in {skill} that raised coverage from 40% to {n}%",
+]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _resume_lines(rng: random.Random, count: int):
+    yield "JORDAN EXAMPLE | jordan@example.com | github.com/jexample"
+    for _ in range(count):
+        if rng.random() < 0.12:
+            yield ""
+            yield rng.choice(["EXPERIENCE", "PROJECTS", "EDUCATION", "SKILLS"])
+        else:
+            bullet = rng.choice(BULLETS).format(skill=rng.choice(SKILLS), n=rng.randint(3, 95))
+            yield f"- {bullet}"
+
+
+def build_resume_pdf(pages: int = 1, columns: int = 1, seed: int = 7) -> bytes:
+    """
+    Writes a small text-only pdf (Helvetica, no fonts embedded) that looks
+    like a resume. `columns=2` places text in two columns per page, the
+    layout that makes naive text extraction interleave lines.
+    """
+    rng = random.Random(seed)
+    lines_per_column = 46
+    column_width = 540 // columns
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for _ in range(pages):
+        ops = ["BT", "/F1 9 Tf", "11 TL"]
+        for column in range(columns):
+            ops.append(f"1 0 0 1 {36 + column * column_width} 756 Tm")
+            for line in _resume_lines(rng, lines_per_column):
+                # roughly the characters that fit the column at 9pt
+                ops.append(f"({_pdf_escape(line[:column_width // 5])}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def load_resumes(directory: str = None, count: int = 12):
+    """Saved pdfs from `directory`, or a generated mix of page counts and layouts."""
+    if directory:
+        return [(path.name, path.read_bytes()) for path in sorted(Path(directory).glob("*.pdf"))]
+    resumes = []
+    for i in range(count):
+        pages, columns = [(1, 1), (2, 1), (1, 2), (3, 2)][i % 4]
+        resumes.append((f"resume-{i}-{pages}p-{columns}col.pdf", build_resume_pdf(pages, columns, seed=i)))
+    return resumes
@@ -0,0 +1,218 @@
+"""
+Local stand-ins for the services an analysis talks to, served with aiohttp:
+
+- an OpenAI compatible chat completions endpoint with configurable latency,
+- the job board README and the postings it links to (Greenhouse api shape),
+- a JWKS issuer whose tokens the api accepts.
+
+Each server counts the requests it answers, so a benchmark can report llm
+calls and crawls per analysis. Nothing from `app` is imported at module level,
+the servers start before the app's settings are read.
+"""
+import asyncio
+import json
+import random
+import re
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict
+import jwt
+from aiohttp import web
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from benchmarks.fixtures import COMPANIES, ROLES, build_posting, build_readme
+
+JOB_IDS = re.compile(r"JOB \[(job-\d+)\]")
+
+
+@asynccontextmanager
+async def serve(app: web.Application, host: str = "127.0.0.1"):
+    """Runs `app` on a free port and yields its base url."""
+    sock = socket.socket()
+    sock.bind((host, 0))
+    port = sock.getsockname()[1]
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.SockSite(runner, sock).start()
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+class FakeLLM:
+    """
+    Answers chat completions with plausible structured output. The reply is
+    picked from the requested json schema (batch results, resume or job profile) or,
+    without one, is a single match result. Latency is `latency` seconds plus
+    up to `jitter` seconds, usage is estimated at four characters per token.
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._rng = random.Random(seed)
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=8 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        return app
+
+    def _match(self) -> Dict:
+        score = self._rng.randint(40, 95)
+        return {
+            "score": score,
+            "reason": f"Candidate matches Student level. Strongest match is Python, weakest area is scale ({score}).",
+            "evidence": ["Job requires Python -> Match: backend internship"],
+            "missing_skills": ["Kubernetes"],
+        }
+
+    def _reply(self, body: Dict, prompt: str) -> Dict:
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+        if schema is None and body.get("tools"):
+            schema = body["tools"][0]["function"]["name"]
+
+        if schema == "BatchMatchResult":
+            return {"results": [dict(self._match(), job_id=job_id) for job_id in JOB_IDS.findall(prompt)]}
+        if schema == "ResumeProfile":
+            return {
+                "seniority": "student",
+                "education": [{"school": "State University", "degree": "BS", "field": "Computer Science", "graduation": "2027"}],
+                "experiences": [{"title": "Software Engineer Intern", "organization": "Acme", "kind": "internship",
+                                 "highlights": ["Built a FastAPI service"]}],
+                "skills": [{"name": "Python", "evidence": "internship", "source": "Acme"},
+                           {"name": "React", "evidence": "project", "source": "Campus app"}],
+            }
+        if schema == "JobProfile":
+            return {
+                "title": "Software Engineer Intern",
+                "level": "intern",
+                "required_skills": self._rng.sample(["Python", "Java", "TypeScript", "React", "SQL", "Go"], 3),
+                "preferred_skills": ["Docker", "AWS"],
+                "min_years": None,
+                "education": "Pursuing a BS in Computer Science",
+                "location": "New York, NY",
+                "remote": "hybrid",
+                "responsibilities": ["Ship features with a mentor", "Write tested backend code"],
+            }
+        return self._match()
+
+    async def chat(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = "\n".join(str(message.get("content", "")) for message in body["messages"])
+        await asyncio.sleep(self.latency + self._rng.random() * self.jitter)
+
+        content = json.dumps(self._reply(body, prompt))
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+        message = {"role": "assistant", "content": content}
+        if body.get("tools") and not body.get("response_format"):
+            # function calling mode, the arguments carry the json
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": body["tools"][0]["function"]["name"], "arguments": content},
+            }]}
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+class JobBoardServer:
+    """
+    Serves a generated README whose application links point back at this
+    server, and the postings behind them in the Greenhouse job board api
+    shape. Every posting request counts as one crawl.
+    """
+
+    def __init__(self, rows: int = 500, latency: float = 0.05, seed: int = 7):
+        self.rows = rows
+        self.latency = latency
+        self.seed = seed
+        self.base_url = ""
+        self.readme = ""
+        self.readme_requests = 0
+        self.crawls = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/README.md", self.get_readme)
+        app.router.add_get("/v1/boards/{board}/jobs/{job_id}", self.get_posting)
+        return app
+
+    def build(self, base_url: str):
+        # links need the port, so the README is built once the server is up
+        self.base_url = base_url
+        self.readme = build_readme(rows=self.rows, seed=self.seed, links=[base_url + "/boards/{slug}/jobs/{id}"])
+
+    async def get_readme(self, request: web.Request) -> web.Response:
+        self.readme_requests += 1
+        etag = f'"{self.seed}-{self.rows}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(text=self.readme, headers={"ETag": etag}, content_type="text/plain")
+
+    async def get_posting(self, request: web.Request) -> web.Response:
+        self.crawls += 1
+        await asyncio.sleep(self.latency)
+        board, job_id = request.match_info["board"], request.match_info["job_id"]
+        company = next((c for c in COMPANIES if c.lower().replace(" ", "") == board), board.title())
+        seed = int(job_id)
+        return web.json_response(build_posting(company, ROLES[seed % len(ROLES)], seed=seed))
+
+    def fetcher(self):
+        """The Greenhouse api fetcher, pointed at this server instead of greenhouse.io."""
+        # imported here, the app reads its settings on import and those point at these servers
+        from app.agents.fetchers import GreenhouseFetcher
+        fetcher = GreenhouseFetcher()
+        fetcher.name = "local-board"
+        fetcher.pattern = re.compile(re.escape(self.base_url) + r"/boards/([^/?#]+)/jobs/(\d+)")
+        fetcher.api_base = self.base_url
+        return fetcher
+
+
+class JWKSIssuer:
+    """Signs RS256 tokens with a throwaway key and publishes it as a JWKS document."""
+
+    def __init__(self, kid: str = "bench-key"):
+        self.kid = kid
+        self.requests = 0
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/.well-known/jwks.json", self.get_jwks)
+        return app
+
+    async def get_jwks(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        jwk = json.loads(RSAAlgorithm.to_jwk(self._key.public_key()))
+        jwk.update({"kid": self.kid, "use": "sig", "alg": "RS256"})
+        return web.json_response({"keys": [jwk]}, headers={"Cache-Control": "public, max-age=3600"})
+
+    def token(self, user_id: str, ttl: int = 3600) -> str:
+        now = int(time.time())
+        return jwt.encode(
+            {"sub": user_id, "iat": now, "exp": now + ttl},
+            self._key,
+            algorithm="RS256",
+            headers={"kid": self.kid},
+        )
@@ -0,0 +1,174 @@
+"""
+Round trips through MongoCheckpointSaver against a real MongoDB.
+
+    MONGO_TEST_URI=mongodb://localhost:27017 python -m pytest tests
+
+Skipped when no server answers at MONGO_TEST_URI (default localhost).
+Every test uses a throwaway database that is dropped afterwards.
+"""
+import os
+import operator
+import unittest
+import uuid
+from typing import Annotated, List, TypedDict
+
+# settings the app requires but these tests never use
+for name in ("OPENAI_API_KEY", "MONGO_URI", "MONGO_DB_NAME", "CLERK_SECRET_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(name, "test")
+
+from langgraph.checkpoint.base import ERROR, empty_checkpoint
+from langgraph.graph import END, StateGraph
+from langgraph.types import Send
+from pymongo import AsyncMongoClient
+from app.agents.checkpoint import MongoCheckpointSaver
+from app.db import CheckpointRepository, db
+
+MONGO_TEST_URI = os.environ.get("MONGO_TEST_URI", "mongodb://localhost:27017")
+
+
+def _thread_config(thread_id: str, checkpoint_id: str = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+class FanOutState(TypedDict):
+    items: List[int]
+    done: Annotated[List[int], operator.add]
+
+
+class MongoCheckpointSaverTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = AsyncMongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+        try:
+            await self.client.admin.command("ping")
+        except Exception as e:
+            await self.client.close()
+            self.skipTest(f"no MongoDB at {MONGO_TEST_URI}: {e}")
+
+        self.database = self.client[f"checkpoint_test_{uuid.uuid4().hex[:8]}"]
+        self.previous_repository = db.checkpoints
+        db.checkpoints = CheckpointRepository(self.database["graph_checkpoints"], self.database["graph_writes"])
+        await db.checkpoints.ensure_indexes(3600)
+        self.saver = MongoCheckpointSaver()
+        self.thread_id = uuid.uuid4().hex
+
+    async def asyncTearDown(self):
+        db.checkpoints = self.previous_repository
+        await self.client.drop_database(self.database.name)
+        await self.client.close()
+
+    async def _put(self, parent_id: str = None, step: int = 0, source: str = "loop"):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"step": step}
+        config = await self.saver.aput(
+            _thread_config(self.thread_id, parent_id),
+            checkpoint,
+            {"source": source, "step": step},
+            {},
+        )
+        return checkpoint, config
+
+    async def test_put_then_get_tuple(self):
+        first, first_config = await self._put(step=0, source="input")
+        second, second_config = await self._put(first["id"], step=1)
+
+        latest = await self.saver.aget_tuple(_thread_config(self.thread_id))
+        self.assertEqual(latest.config["configurable"]["checkpoint_id"], second["id"])
+        self.assertEqual(latest.checkpoint["channel_values"], {"step": 1})
+        self.assertEqual(latest.metadata["step"], 1)
+        self.assertEqual(latest.parent_config, first_config)
+
+        earlier = await self.saver.aget_tuple(first_config)
+        self.assertEqual(earlier.checkpoint["id"], first["id"])
+        self.assertIsNone(earlier.parent_config)
+
+        self.assertIsNone(await self.saver.aget_tuple(_thread_config("missing")))
+
+    async def test_put_writes_keeps_the_first_regular_write(self):
+        checkpoint, config = await self._put()
+
+        await self.saver.aput_writes(config, [("matches", 1), ("scraped", "a")], "task-1")
+        # a retried task writes again, the first write wins
+        await self.saver.aput_writes(config, [("matches", 2), ("scraped", "b")], "task-1")
+        await self.saver.aput_writes(config, [("matches", 3)], "task-2")
+
+        pending = (await self.saver.aget_tuple(config)).pending_writes
+        self.assertEqual(pending, [("task-1", "matches", 1), ("task-1", "scraped", "a"), ("task-2", "matches", 3)])
+
+    async def test_put_writes_replaces_special_writes(self):
+        checkpoint, config = await self._put()
+
+        await self.saver.aput_writes(config, [(ERROR, "first failure")], "task-1")
+        await self.saver.aput_writes(config, [(ERROR, "second failure")], "task-1")
+
+        pending = (await self.saver.aget_tuple(config)).pending_writes
+        self.assertEqual(pending, [("task-1", ERROR, "second failure")])
+
+    async def test_list_newest_first_with_filter_limit_and_before(self):
+        first, _ = await self._put(step=0, source="input")
+        second, _ = await self._put(first["id"], step=1)
+        third, third_config = await self._put(second["id"], step=2)
+
+        listed = [item.checkpoint["id"] async for item in self.saver.alist(_thread_config(self.thread_id))]
+        self.assertEqual(listed, [third["id"], second["id"], first["id"]])
+
+        limited = [item.checkpoint["id"] async for item in self.saver.alist(_thread_config(self.thread_id), limit=2)]
+        self.assertEqual(limited, [third["id"], second["id"]])
+
+        filtered = [
+            item.checkpoint["id"]
+            async for item in self.saver.alist(_thread_config(self.thread_id), filter={"source": "loop"}, limit=1)
+        ]
+        self.assertEqual(filtered, [third["id"]])
+
+        before = [
+            item.checkpoint["id"]
+            async for item in self.saver.alist(_thread_config(self.thread_id), before=third_config)
+        ]
+        self.assertEqual(before, [second["id"], first["id"]])
+
+    async def test_delete_thread(self):
+        checkpoint, config = await self._put()
+        await self.saver.aput_writes(config, [("matches", 1)], "task-1")
+
+        await self.saver.adelete_thread(self.thread_id)
+
+        self.assertIsNone(await self.saver.aget_tuple(_thread_config(self.thread_id)))
+        self.assertEqual(await db.checkpoints.get_writes(self.thread_id, "", checkpoint["id"]), [])
+
+    async def test_interrupted_fan_out_resumes_without_redoing_finished_tasks(self):
+        runs = []
+
+        async def work(task: dict):
+            runs.append(task["item"])
+            if task["item"] == 2 and runs.count(2) == 1:
+                raise RuntimeError("crawl failed")
+            return {"done": [task["item"]]}
+
+        workflow = StateGraph(FanOutState)
+        workflow.add_node("start", lambda state: {})
+        workflow.add_node("work", work)
+        workflow.set_entry_point("start")
+        workflow.add_conditional_edges(
+            "start", lambda state: [Send("work", {"item": item}) for item in state["items"]], ["work"]
+        )
+        workflow.add_edge("work", END)
+        graph = workflow.compile(checkpointer=self.saver)
+        config = {"configurable": {"thread_id": self.thread_id}}
+
+        with self.assertRaises(RuntimeError):
+            await graph.ainvoke({"items": [1, 2, 3]}, config)
+
+        # the tasks that finished are recorded, only the failed one is left to run
+        self.assertEqual((await graph.aget_state(config)).next, ("work",))
+
+        final = await graph.ainvoke(None, config)
+        self.assertEqual(sorted(final["done"]), [1, 2, 3])
+        self.assertEqual(sorted(runs), [1, 2, 2, 3])
+        self.assertEqual((await graph.aget_state(config)).next, ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Key lookup, refetching and fallback of the JWKS cache.
+
+    python -m pytest tests/test_jwks.py
+
+The JWKS endpoint is stubbed like benchmarks/stubs.JWKSIssuer, served
+through an httpx mock transport instead of a local server.
+"""
+import json
+import os
+import time
+import unittest
+
+# settings the app requires but these tests never use
+for name in ("OPENAI_API_KEY", "MONGO_URI", "MONGO_DB_NAME", "CLERK_SECRET_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(name, "test")
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from app.services.jwks import JWKSCache
+
+JWKS_URL = "https://issuer.test/.well-known/jwks.json"
+MIN_REFETCH_SECONDS = 30
+
+
+class _Issuer:
+    """Publishes throwaway RSA keys as a JWKS document and counts the requests."""
+
+    def __init__(self, max_age: int = 3600):
+        self.max_age = max_age
+        self.requests = 0
+        self.fail = False
+        self.keys = {}
+        self.rotate("key-1")
+
+    def rotate(self, kid: str):
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def public_numbers(self, kid: str):
+        return self.keys[kid].public_key().public_numbers()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.fail:
+            return httpx.Response(503)
+        jwks = []
+        for kid, key in self.keys.items():
+            jwk = json.loads(RSAAlgorithm.to_jwk(key.public_key()))
+            jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+            jwks.append(jwk)
+        headers = {"Cache-Control": f"public, max-age={self.max_age}"} if self.max_age else {}
+        return httpx.Response(200, json={"keys": jwks}, headers=headers)
+
+
+class JWKSCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.issuer = _Issuer()
+        self.cache = JWKSCache(JWKS_URL, default_max_age=600, min_refetch_seconds=MIN_REFETCH_SECONDS)
+        self.cache._client = httpx.AsyncClient(transport=httpx.MockTransport(self.issuer.handle))
+
+    async def asyncTearDown(self):
+        await self.cache.stop()
+
+    def _wait_out_min_refetch(self):
+        self.cache._last_fetch -= MIN_REFETCH_SECONDS + 1
+
+    async def test_looks_up_keys_by_kid(self):
+        await self.cache.refresh()
+
+        key = await self.cache.get_key("key-1")
+        self.assertEqual(key.public_numbers(), self.issuer.public_numbers("key-1"))
+
+        # fresh keys are served from memory
+        await self.cache.get_key("key-1")
+        self.assertEqual(self.issuer.requests, 1)
+
+    async def test_reads_max_age_from_cache_control(self):
+        await self.cache.refresh()
+        self.assertAlmostEqual(self.cache._expires_at - time.monotonic(), 3600, delta=5)
+
+        self.issuer.max_age = None
+        await self.cache.refresh()
+        self.assertAlmostEqual(self.cache._expires_at - time.monotonic(), 600, delta=5)
+
+    async def test_unknown_kid_refetches_at_most_once_per_interval(self):
+        await self.cache.refresh()
+        self.issuer.rotate("key-2")
+
+        # fetched a moment ago, the new key is not looked for yet
+        with self.assertRaises(KeyError):
+            await self.cache.get_key("key-2")
+        self.assertEqual(self.issuer.requests, 1)
+
+        self._wait_out_min_refetch()
+        key = await self.cache.get_key("key-2")
+        self.assertEqual(key.public_numbers(), self.issuer.public_numbers("key-2"))
+        self.assertEqual(self.issuer.requests, 2)
+
+        # a kid the issuer never published does not refetch again right away
+        with self.assertRaises(KeyError):
+            await self.cache.get_key("missing")
+        self.assertEqual(self.issuer.requests, 2)
+
+    async def test_keeps_stale_keys_when_the_fetch_fails(self):
+        await self.cache.refresh()
+        self.cache._expires_at = 0.0
+        self._wait_out_min_refetch()
+        self.issuer.fail = True
+
+        key = await self.cache.get_key("key-1")
+        self.assertEqual(key.public_numbers(), self.issuer.public_numbers("key-1"))
+        self.assertEqual(self.issuer.requests, 2)
+
+        with self.assertRaises(KeyError):
+            await self.cache.get_key("key-2")
+
+
+if __name__ == "__main__":
+    unittest.main()
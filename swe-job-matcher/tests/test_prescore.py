@@ -0,0 +1,75 @@
+"""
+Hard rules of the local pre-scorer.
+
+    python -m pytest tests/test_prescore.py
+"""
+import unittest
+
+from app.agents.prescore import (
+    MIN_JOB_TECHS_FOR_MISMATCH,
+    SENIOR_JOB_SCORE,
+    STACK_MISMATCH_SCORE,
+    YEARS_GAP_SCORE,
+    job_level,
+    prescore,
+    required_years,
+)
+
+STUDENT = "SENIORITY: student\nSKILLS: python, react, sql"
+MID = "SENIORITY: mid\nSKILLS: python, react, sql"
+FIVE_TECHS = "You will work with Kotlin, Swift, Scala, Kafka and Terraform every day."
+
+
+class RequiredYearsTest(unittest.TestCase):
+    def test_reads_required_figures(self):
+        self.assertEqual(required_years("3+ years of experience with Python."), 3)
+        self.assertEqual(required_years("Requires 2-4 years of professional experience."), 2)
+        self.assertEqual(required_years("5 yrs of backend experience. 3 years of experience with SQL."), 3)
+        self.assertIsNone(required_years("New grads welcome."))
+
+    def test_skips_preferred_experience(self):
+        self.assertIsNone(required_years("3+ years of experience preferred. New grads welcome."))
+        self.assertIsNone(required_years("Nice to have: 4 years of experience with Go."))
+        self.assertIsNone(required_years("Bonus if you have 5 years of industry experience."))
+        self.assertEqual(required_years("5+ years preferred, 2 years of experience required."), 2)
+        self.assertEqual(required_years("2 years of experience required, 5+ years preferred."), 2)
+
+    def test_ignores_implausible_figures(self):
+        self.assertIsNone(required_years("0 years of experience needed."))
+        self.assertIsNone(required_years("Our team has 25 years of experience."))
+
+
+class PrescoreTest(unittest.TestCase):
+    def test_job_level_reads_the_title(self):
+        self.assertEqual(job_level("Senior Software Engineer"), "senior")
+        self.assertEqual(job_level("Staff Engineer, Platform"), "staff")
+        self.assertEqual(job_level("Software Engineering Intern"), "intern")
+        self.assertEqual(job_level("Software Engineer, New Grad"), "entry")
+        self.assertEqual(job_level("Software Engineer"), "unknown")
+
+    def test_early_candidate_on_senior_role_is_a_mismatch(self):
+        result = prescore("Senior Backend Engineer", "Build APIs in Python.", STUDENT)
+        self.assertEqual(result["score"], SENIOR_JOB_SCORE)
+        self.assertTrue(result["prescored"])
+
+        self.assertIsNone(prescore("Senior Backend Engineer", "Build APIs in Python.", MID))
+
+    def test_years_gap_skips_interns_and_preferred_experience(self):
+        description = "Build APIs in Python. 3+ years of experience required."
+        self.assertEqual(prescore("Software Engineer", description, STUDENT)["score"], YEARS_GAP_SCORE)
+        self.assertIsNone(prescore("Software Engineer Intern", description, STUDENT))
+        self.assertIsNone(prescore("Software Engineer", "Python. 3+ years of experience preferred.", STUDENT))
+
+    def test_stack_mismatch_needs_enough_job_technologies(self):
+        result = prescore("Software Engineer", FIVE_TECHS, MID)
+        self.assertEqual(result["score"], STACK_MISMATCH_SCORE)
+        self.assertEqual(len(result["missing_skills"]), MIN_JOB_TECHS_FOR_MISMATCH)
+
+        # one technology fewer is left to the llm
+        self.assertIsNone(prescore("Software Engineer", FIVE_TECHS.replace(" and Terraform", ""), MID))
+        # an overlap is left to the llm too
+        self.assertIsNone(prescore("Software Engineer", FIVE_TECHS + " Some Python.", MID))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Streaming parse of the job board README.
+
+    python -m pytest tests/test_readme_parser.py
+"""
+import os
+import unittest
+
+from app.services.readme_parser import iter_jobs
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "readme.md")
+
+
+def _readme() -> str:
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+class IterJobsTest(unittest.TestCase):
+    def test_parses_rows_of_the_first_table(self):
+        jobs = [job.to_dict() for job in iter_jobs(_readme())]
+
+        # the archived table after the first one is never read
+        self.assertEqual(jobs, [
+            {"company": "Acme", "role": "Software Engineer Intern", "location": "New York, NY",
+             "link": "https://acme.example/jobs/1"},
+            {"company": "Acme", "role": "Data Engineer Intern", "location": "Remote",
+             "link": "https://acme.example/jobs/2"},
+            {"company": "Globex", "role": "Backend Intern", "location": "Austin, TX", "link": "No link"},
+            {"company": "Globex", "role": "Frontend Intern", "location": "Seattle, WA",
+             "link": "https://globex.example/apply"},
+        ])
+
+    def test_sub_rows_inherit_the_company(self):
+        jobs = list(iter_jobs(_readme()))
+        self.assertEqual([job.company for job in jobs], ["Acme", "Acme", "Globex", "Globex"])
+        self.assertEqual(jobs[1].key, "Acme|Data Engineer Intern|https://acme.example/jobs/2")
+
+    def test_stops_at_the_end_of_the_first_table(self):
+        readme = _readme()
+        end = readme.index("</table>") + len("</table>")
+        fed = []
+
+        def chunks():
+            # the first table in one chunk, anything after it must never be requested
+            fed.append(readme[:end])
+            yield readme[:end]
+            fed.append(readme[end:])
+            yield readme[end:]
+
+        self.assertEqual(len(list(iter_jobs(chunks()))), 4)
+        self.assertEqual(len(fed), 1)
+
+    def test_small_chunks_parse_the_same(self):
+        # rows are freed between chunks, this must not disturb the rows still being parsed
+        readme = _readme()
+        chunks = (readme[i:i + 7] for i in range(0, len(readme), 7))
+        self.assertEqual(
+            [job.to_dict() for job in iter_jobs(chunks)],
+            [job.to_dict() for job in iter_jobs(readme)],
+        )
+
+    def test_limit_stops_early(self):
+        readme = _readme()
+        fed = []
+
+        def lines():
+            for line in readme.splitlines(keepends=True):
+                fed.append(line)
+                yield line
+
+        jobs = list(iter_jobs(lines(), limit=2))
+        self.assertEqual([job.role for job in jobs], ["Software Engineer Intern", "Data Engineer Intern"])
+        # parsing stopped right after the second row, the rest of the README was never read
+        self.assertNotIn("Globex", "".join(fed))
+
+        self.assertEqual(list(iter_jobs(readme, limit=0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Rate limit hints and the token budget of the llm scheduler.
+
+    python -m pytest tests/test_scheduler.py
+"""
+import asyncio
+import os
+import time
+import unittest
+
+# settings the app requires but these tests never use
+for name in ("OPENAI_API_KEY", "MONGO_URI", "MONGO_DB_NAME", "CLERK_SECRET_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(name, "test")
+
+from app.agents.scheduler import TokenBucket, parse_duration, retry_hint
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class _ApiError(Exception):
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.response = _Response(headers)
+
+
+class RetryHintTest(unittest.TestCase):
+    def test_retry_after_seconds(self):
+        self.assertEqual(retry_hint(_ApiError({"retry-after": "2"})), 2.0)
+
+    def test_retry_after_ms_wins(self):
+        self.assertEqual(retry_hint(_ApiError({"retry-after-ms": "250", "retry-after": "2"})), 0.25)
+
+    def test_ratelimit_reset_headers(self):
+        hint = retry_hint(_ApiError({"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "6m0s"}))
+        self.assertEqual(hint, 360.0)
+        self.assertEqual(retry_hint(_ApiError({"x-ratelimit-reset-tokens": "250ms"})), 0.25)
+
+    def test_unreadable_retry_after_falls_back_to_resets(self):
+        headers = {"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT", "x-ratelimit-reset-requests": "1.5s"}
+        self.assertEqual(retry_hint(_ApiError(headers)), 1.5)
+
+    def test_no_hint(self):
+        self.assertIsNone(retry_hint(_ApiError({})))
+        self.assertIsNone(retry_hint(_ApiError({"x-ratelimit-reset-tokens": "soon"})))
+        self.assertIsNone(retry_hint(RuntimeError("no response")))
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("1m30s"), 90.0)
+        self.assertEqual(parse_duration("1h"), 3600.0)
+        self.assertIsNone(parse_duration(None))
+
+
+class TokenBucketTest(unittest.IsolatedAsyncioTestCase):
+    async def test_settle_refunds_unused_tokens(self):
+        bucket = TokenBucket(6000)
+        reserved = await bucket.acquire(1000)
+        self.assertEqual(reserved, 1000)
+
+        bucket.settle(reserved, 400)
+        self.assertAlmostEqual(bucket.tokens, 5600, delta=5)
+
+    async def test_settle_refunds_a_failed_call(self):
+        bucket = TokenBucket(6000)
+        bucket.settle(await bucket.acquire(1000), 0)
+        self.assertAlmostEqual(bucket.tokens, 6000, delta=5)
+
+    async def test_settle_charges_usage_over_the_estimate(self):
+        bucket = TokenBucket(6000)
+        bucket.settle(await bucket.acquire(1000), 1500)
+        self.assertAlmostEqual(bucket.tokens, 4500, delta=5)
+
+    async def test_oversized_request_reserves_the_whole_budget(self):
+        bucket = TokenBucket(6000)
+        self.assertEqual(await bucket.acquire(10000), 6000)
+
+    async def test_waiters_sleep_outside_the_lock_in_arrival_order(self):
+        # 6000 per minute refills 100 tokens a second
+        bucket = TokenBucket(6000)
+        await bucket.acquire(6000)
+        order = []
+
+        async def take(name):
+            await bucket.acquire(5)
+            order.append(name)
+
+        waiters = [asyncio.create_task(take(name)) for name in ("first", "second")]
+        await asyncio.sleep(0.01)
+        self.assertFalse(bucket._lock.locked())
+
+        # settling while the others wait does not block on them
+        start = time.monotonic()
+        bucket.settle(0, 0)
+        self.assertLess(time.monotonic() - start, 0.01)
+
+        await asyncio.gather(*waiters)
+        self.assertEqual(order, ["first", "second"])
+
+    async def test_cancelled_waiter_gives_its_tokens_back(self):
+        bucket = TokenBucket(6000)
+        await bucket.acquire(6000)
+        waiter = asyncio.create_task(bucket.acquire(3000))
+        await asyncio.sleep(0.01)
+
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertGreaterEqual(bucket.tokens, 0)
+
+    async def test_pause_holds_every_caller(self):
+        bucket = TokenBucket(6000)
+        bucket.pause(0.1)
+        start = time.monotonic()
+        await bucket.acquire(1)
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == "__main__":
+    unittest.main()
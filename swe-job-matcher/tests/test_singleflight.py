@@ -0,0 +1,75 @@
+"""
+Collapsing of concurrent calls in SingleFlight.
+
+    python -m pytest tests/test_singleflight.py
+"""
+import asyncio
+import unittest
+
+from app.agents.singleflight import SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def _fetch(self, value="result"):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    async def test_concurrent_callers_share_one_call(self):
+        callers = [asyncio.create_task(self.flight.do("key", self._fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertTrue(self.flight.in_flight("key"))
+
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*callers), ["result"] * 5)
+        self.assertEqual(self.calls, 1)
+
+        # the key is released once the call finished, the next caller runs again
+        await asyncio.sleep(0)
+        self.assertFalse(self.flight.in_flight("key"))
+        self.assertEqual(await self.flight.do("key", self._fetch), "result")
+        self.assertEqual(self.calls, 2)
+
+    async def test_other_keys_run_on_their_own(self):
+        self.release.set()
+        results = await asyncio.gather(
+            self.flight.do("a", lambda: self._fetch("a")),
+            self.flight.do("b", lambda: self._fetch("b")),
+        )
+        self.assertEqual(results, ["a", "b"])
+        self.assertEqual(self.calls, 2)
+
+    async def test_error_reaches_every_waiter(self):
+        error = RuntimeError("crawl failed")
+        callers = [asyncio.create_task(self.flight.do("key", lambda: self._fetch(error))) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        self.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.calls, 1)
+
+    async def test_cancelled_waiter_does_not_cancel_the_shared_task(self):
+        first = asyncio.create_task(self.flight.do("key", self._fetch))
+        second = asyncio.create_task(self.flight.do("key", self._fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+        self.assertTrue(self.flight.in_flight("key"))
+        self.release.set()
+        self.assertEqual(await second, "result")
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()